@@ -2,12 +2,32 @@ from __future__ import annotations
 
 import asyncio
 import importlib
-from dataclasses import dataclass
-from typing import Any, Iterable, Sequence
+import math
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Sequence
 
-import httpx
+from mtci.config import (
+    BatchingConfig,
+    EndpointModelConfig,
+    HedgeConfig,
+    LocalModelConfig,
+    RetryConfig,
+)
 
-from mtci.config import EndpointModelConfig, LocalModelConfig
+if TYPE_CHECKING:
+    from concurrent.futures import ThreadPoolExecutor
+
+    import httpx
+
+# httpx is imported inside the endpoint code paths so that local-mode runs and
+# `mtci doctor` do not pay for the HTTP stack at startup.
 
 
 class ModelError(Exception):
@@ -18,6 +38,61 @@ class BaseModelAdapter:
     def predict(self, xs: Sequence[str]) -> list[float]:
         raise NotImplementedError
 
+    def predict_items(self, xs: Sequence[str]) -> list[float]:
+        """Predict independent items; callers accept any batch composition."""
+        return self.predict(xs)
+
+    def predict_batch(self, xs: Sequence[str]) -> list[float]:
+        """Predict ``xs`` as exactly one model call, for batch-sensitive checks."""
+        return self.predict(xs)
+
+    @contextmanager
+    def uncached(self) -> Iterator["BaseModelAdapter"]:
+        """Force fresh model calls, e.g. for retries and duplicate-sensitive MRs."""
+        yield self
+
+    @contextmanager
+    def unhedged(self) -> Iterator["BaseModelAdapter"]:
+        """Never duplicate requests, e.g. for MRs that compare repeated calls."""
+        yield self
+
+    def close(self) -> None:
+        """Release resources such as an in-process server."""
+
+
+def unwrap(model: Any) -> Any:
+    while isinstance(model, MemoizedAdapter):
+        model = model.inner
+    return model
+
+
+INSTRUMENTED_METHODS = ("predict", "predict_items", "predict_batch", "post_raw")
+
+
+def instrument_adapter(
+    adapter: BaseModelAdapter, wrap: Callable[[Callable], Callable]
+) -> Callable[[], None]:
+    """Wrap the adapter's prediction methods in place; returns an undo callable.
+
+    Methods already wrapped on the instance (e.g. by run metrics) are wrapped
+    again and put back on restore, so restores must run in reverse.
+    """
+    previous: dict[str, Any] = {}
+    for name in INSTRUMENTED_METHODS:
+        method = getattr(adapter, name, None)
+        if method is not None:
+            previous[name] = vars(adapter).get(name)
+            setattr(adapter, name, wrap(method))
+
+    def restore() -> None:
+        for name, method in previous.items():
+            if method is None:
+                vars(adapter).pop(name, None)
+            else:
+                setattr(adapter, name, method)
+
+    return restore
+
 
 @dataclass
 class LocalModelAdapter(BaseModelAdapter):
@@ -36,16 +111,271 @@ class LocalModelAdapter(BaseModelAdapter):
         raise ModelError("Local model is not callable and has no predict method")
 
 
+class PayloadTooLargeError(ModelError):
+    pass
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = 3
+    backoff_base_s: float = 0.1
+    backoff_max_s: float = 5.0
+    retry_statuses: frozenset[int] = frozenset({429, 502, 503, 504})
+
+    @classmethod
+    def from_config(cls, config: RetryConfig) -> "RetryPolicy":
+        return cls(
+            max_retries=config.max_retries,
+            backoff_base_s=config.backoff_base_s,
+            backoff_max_s=config.backoff_max_s,
+            retry_statuses=frozenset(config.retry_statuses),
+        )
+
+    def should_retry(self, attempt: int, response: httpx.Response | None) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        return response is None or response.status_code in self.retry_statuses
+
+    def delay(self, attempt: int, response: httpx.Response | None = None) -> float:
+        retry_after = _parse_retry_after(response)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max_s)
+        ceiling = min(self.backoff_max_s, self.backoff_base_s * (2**attempt))
+        # Full jitter keeps concurrent CI jobs from retrying in lockstep.
+        return random.uniform(0.0, ceiling)
+
+
+def _parse_retry_after(response: httpx.Response | None) -> float | None:
+    if response is None:
+        return None
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+@dataclass
+class AdaptiveBatcher:
+    size: int = 32
+    min_size: int = 1
+    max_size: int = 256
+    target_latency_s: float = 1.0
+    # Fixed batchers never grow, so request bodies do not depend on latency.
+    fixed: bool = False
+
+    @classmethod
+    def from_config(cls, config: BatchingConfig) -> "AdaptiveBatcher":
+        return cls(
+            size=config.initial_size,
+            min_size=config.min_size,
+            max_size=max(config.min_size, config.max_size),
+            target_latency_s=config.target_latency_s,
+        )
+
+    def can_shrink(self, chunk_size: int) -> bool:
+        return chunk_size > self.min_size
+
+    def shrink(self, chunk_size: int) -> None:
+        self.size = max(self.min_size, min(self.size, chunk_size) // 2)
+
+    def observe(self, chunk_size: int, latency_s: float) -> None:
+        # Only full batches tell us anything about headroom at the current size.
+        if self.fixed:
+            return
+        if chunk_size >= self.size and latency_s < self.target_latency_s / 2:
+            self.size = min(self.max_size, self.size * 2)
+
+
+@dataclass
+class HedgePolicy:
+    """Duplicate slow requests after a latency percentile of recent calls.
+
+    Hedges start once ``min_samples`` latencies are known and are capped at
+    ``max_extra_fraction`` of requests; ``hedge_wins`` counts duplicates that
+    answered first.
+    """
+
+    enabled: bool = False
+    percentile: float = 95.0
+    min_delay_s: float = 0.05
+    max_extra_fraction: float = 0.1
+    min_samples: int = 20
+    window: int = 200
+    requests: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    capped: int = 0
+    latencies: deque = field(default_factory=deque, repr=False)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @classmethod
+    def from_config(cls, config: HedgeConfig) -> "HedgePolicy":
+        return cls(
+            enabled=config.enabled,
+            percentile=config.percentile,
+            min_delay_s=config.min_delay_s,
+            max_extra_fraction=config.max_extra_fraction,
+            min_samples=config.min_samples,
+            window=config.window,
+        )
+
+    def delay(self) -> float | None:
+        with self.lock:
+            self.requests += 1
+            if len(self.latencies) < self.min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        rank = max(0, math.ceil(self.percentile / 100 * len(ordered)) - 1)
+        return max(self.min_delay_s, ordered[rank])
+
+    def acquire(self) -> bool:
+        with self.lock:
+            if self.hedges + 1 > self.max_extra_fraction * self.requests:
+                self.capped += 1
+                return False
+            self.hedges += 1
+            return True
+
+    def observe(self, latency_s: float, hedge_won: bool = False) -> None:
+        with self.lock:
+            self.latencies.append(latency_s)
+            while len(self.latencies) > self.window:
+                self.latencies.popleft()
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def stats(self) -> dict[str, int]:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "capped": self.capped,
+            }
+
+
+@dataclass
+class MemoizedAdapter(BaseModelAdapter):
+    """Reuses predictions for batches already seen, keyed by the whole batch.
+
+    Keying on the batch (not single texts) keeps batch-position effects visible
+    to relations such as batching invariance. Only meant for deterministic
+    local models.
+    """
+
+    inner: BaseModelAdapter
+    cache: dict[tuple[str, ...], list[float]] = field(default_factory=dict)
+    batches: dict[tuple[str, ...], list[float]] = field(default_factory=dict)
+    items: dict[str, float] = field(default_factory=dict)
+    hits: int = 0
+    misses: int = 0
+    bypass: bool = False
+
+    def __getattr__(self, name: str) -> Any:
+        # Forward endpoint-specific calls such as post_raw to the wrapped adapter.
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    @contextmanager
+    def uncached(self) -> Iterator["MemoizedAdapter"]:
+        previous, self.bypass = self.bypass, True
+        try:
+            yield self
+        finally:
+            self.bypass = previous
+
+    @contextmanager
+    def unhedged(self) -> Iterator["MemoizedAdapter"]:
+        with self.inner.unhedged():
+            yield self
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def predict(self, xs: Sequence[str]) -> list[float]:
+        if self.bypass:
+            return list(self.inner.predict(xs))
+        key = tuple(xs)
+        if key in self.cache:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.cache[key] = list(self.inner.predict(xs))
+        return list(self.cache[key])
+
+    def predict_batch(self, xs: Sequence[str]) -> list[float]:
+        # Kept apart from ``cache``: predict() results may have been split.
+        if self.bypass:
+            return list(self.inner.predict_batch(xs))
+        key = tuple(xs)
+        if key in self.batches:
+            self.hits += 1
+        else:
+            self.misses += 1
+            self.batches[key] = list(self.inner.predict_batch(xs))
+        return list(self.batches[key])
+
+    def predict_items(self, xs: Sequence[str]) -> list[float]:
+        if self.bypass:
+            return list(self.inner.predict(xs))
+        missing = list(dict.fromkeys(x for x in xs if x not in self.items))
+        self.hits += len(xs) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            self.items.update(zip(missing, self.inner.predict(missing)))
+        return [self.items[x] for x in xs]
+
+
 @dataclass
 class HTTPEndpointModel(BaseModelAdapter):
     base_url: str
     predict_path: str
     timeout_s: float
     transport: httpx.BaseTransport | None = None
+    retry: RetryPolicy = field(default_factory=RetryPolicy)
+    batcher: AdaptiveBatcher = field(default_factory=AdaptiveBatcher)
+    sleep: Callable[[float], None] = time.sleep
+    concurrency: int = 1
+    hedge: HedgePolicy = field(default_factory=HedgePolicy)
+    hedging_suspended: bool = False
+    _hedge_pool: ThreadPoolExecutor | None = field(default=None, init=False, repr=False)
+    _hedge_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
 
     @classmethod
     def from_config(cls, config: EndpointModelConfig) -> "HTTPEndpointModel":
-        return cls(config.base_url, config.predict_path, config.timeout_s)
+        transport = None
+        if config.app is not None:
+            from mtci.asgi import IN_PROCESS_BASE_URL, InProcessASGITransport
+
+            transport = InProcessASGITransport(load_entrypoint(config.app))
+        return cls(
+            config.base_url or IN_PROCESS_BASE_URL,
+            config.predict_path,
+            config.timeout_s,
+            transport=transport,
+            retry=RetryPolicy.from_config(config.retry),
+            batcher=AdaptiveBatcher.from_config(config.batching),
+            concurrency=config.concurrency,
+            hedge=HedgePolicy.from_config(config.hedge),
+        )
+
+    @property
+    def url(self) -> str:
+        return f"{self.base_url.rstrip('/')}{self.predict_path}"
+
+    def _is_async(self) -> bool:
+        return self.transport is not None and hasattr(self.transport, "__aenter__")
 
     def _run_async(self, coro: "asyncio.Future[Any]") -> Any:
         try:
@@ -54,49 +384,217 @@ class HTTPEndpointModel(BaseModelAdapter):
             return asyncio.run(coro)
         raise RuntimeError("Async transport requires an async call path")
 
-    async def _async_post(self, url: str, payload: dict[str, Any]) -> dict[str, Any]:
-        async with httpx.AsyncClient(timeout=self.timeout_s, transport=self.transport) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
-            return response.json()
+    def _check_response(self, response: httpx.Response) -> dict[str, Any]:
+        if response.status_code == 413:
+            raise PayloadTooLargeError("Endpoint rejected payload as too large (413)")
+        response.raise_for_status()
+        return response.json()
+
+    def _send(
+        self, retry_timeouts: bool = True, hedged: bool = False, **request: Any
+    ) -> dict[str, Any]:
+        import httpx
+
+        with httpx.Client(timeout=self.timeout_s, transport=self.transport) as client:
+            attempt = 0
+            while True:
+                try:
+                    if hedged:
+                        response = self._hedged_post(client, request)
+                    else:
+                        response = client.post(self.url, **request)
+                except httpx.TimeoutException:
+                    if not retry_timeouts or not self.retry.should_retry(attempt, None):
+                        raise
+                    response = None
+                except httpx.TransportError:
+                    if not self.retry.should_retry(attempt, None):
+                        raise
+                    response = None
+                if response is not None and not self.retry.should_retry(attempt, response):
+                    return self._check_response(response)
+                self.sleep(self.retry.delay(attempt, response))
+                attempt += 1
 
-    async def _async_post_raw(
-        self, url: str, raw_body: str, headers: dict[str, str]
+    async def _async_send(
+        self, retry_timeouts: bool = True, hedged: bool = False, **request: Any
     ) -> dict[str, Any]:
+        import httpx
+
         async with httpx.AsyncClient(timeout=self.timeout_s, transport=self.transport) as client:
-            response = await client.post(url, content=raw_body, headers=headers)
-            response.raise_for_status()
-            return response.json()
-
-    def _post_json(self, payload: dict[str, Any]) -> list[float]:
-        url = f"{self.base_url.rstrip('/')}{self.predict_path}"
-        if self.transport is not None and hasattr(self.transport, "__aenter__"):
-            data = self._run_async(self._async_post(url, payload))
+            attempt = 0
+            while True:
+                try:
+                    if hedged:
+                        response = await self._async_hedged_post(client, request)
+                    else:
+                        response = await client.post(self.url, **request)
+                except httpx.TimeoutException:
+                    if not retry_timeouts or not self.retry.should_retry(attempt, None):
+                        raise
+                    response = None
+                except httpx.TransportError:
+                    if not self.retry.should_retry(attempt, None):
+                        raise
+                    response = None
+                if response is not None and not self.retry.should_retry(attempt, response):
+                    return self._check_response(response)
+                await asyncio.sleep(self.retry.delay(attempt, response))
+                attempt += 1
+
+    def close(self) -> None:
+        with self._hedge_lock:
+            pool, self._hedge_pool = self._hedge_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        shutdown = getattr(self.transport, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+    @contextmanager
+    def unhedged(self) -> Iterator["HTTPEndpointModel"]:
+        previous, self.hedging_suspended = self.hedging_suspended, True
+        try:
+            yield self
+        finally:
+            self.hedging_suspended = previous
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with self._hedge_lock:
+            if self._hedge_pool is None:
+                # Each concurrent chunk may have a primary and a hedge in flight.
+                self._hedge_pool = ThreadPoolExecutor(
+                    2 * max(1, self.concurrency), thread_name_prefix="mtci-hedge"
+                )
+            return self._hedge_pool
+
+    def _hedged_post(self, client: httpx.Client, request: dict[str, Any]) -> httpx.Response:
+        """One attempt, duplicated once if it outlasts the hedge delay.
+
+        The first response wins whatever its status, so retries stay with the
+        caller's retry loop; the losing request is left to finish and ignored.
+        """
+        from concurrent.futures import FIRST_COMPLETED, wait
+
+        delay = self.hedge.delay()
+        start = time.perf_counter()
+        if delay is None:
+            response = client.post(self.url, **request)
+            self.hedge.observe(time.perf_counter() - start)
+            return response
+        pool = self._hedge_executor()
+        primary = pool.submit(client.post, self.url, **request)
+        pending = {primary}
+        done, _ = wait(pending, timeout=delay)
+        if not done and self.hedge.acquire():
+            pending.add(pool.submit(client.post, self.url, **request))
+        errors: list[BaseException] = []
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f is not primary):
+                error = future.exception()
+                if error is None:
+                    self.hedge.observe(time.perf_counter() - start, hedge_won=future is not primary)
+                    return future.result()
+                errors.append(error)
+        raise errors[0]
+
+    async def _async_hedged_post(
+        self, client: httpx.AsyncClient, request: dict[str, Any]
+    ) -> httpx.Response:
+        delay = self.hedge.delay()
+        start = time.perf_counter()
+        if delay is None:
+            response = await client.post(self.url, **request)
+            self.hedge.observe(time.perf_counter() - start)
+            return response
+        primary = asyncio.ensure_future(client.post(self.url, **request))
+        pending = {primary}
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done and self.hedge.acquire():
+            pending.add(asyncio.ensure_future(client.post(self.url, **request)))
+        errors: list[BaseException] = []
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t is not primary):
+                    error = task.exception()
+                    if error is None:
+                        self.hedge.observe(
+                            time.perf_counter() - start, hedge_won=task is not primary
+                        )
+                        return task.result()
+                    errors.append(error)
+            raise errors[0]
+        finally:
+            # The event loop ends with this call, so the loser is cancelled.
+            for task in pending:
+                task.cancel()
+
+    def _request(self, retry_timeouts: bool = True, **request: Any) -> list[float]:
+        hedged = self.hedge.enabled and not self.hedging_suspended
+        if self._is_async():
+            data = self._run_async(self._async_send(retry_timeouts, hedged, **request))
         else:
-            with httpx.Client(timeout=self.timeout_s, transport=self.transport) as client:
-                response = client.post(url, json=payload)
-                response.raise_for_status()
-                data = response.json()
+            data = self._send(retry_timeouts, hedged, **request)
         if "scores" not in data or not isinstance(data["scores"], Iterable):
             raise ModelError("Endpoint response missing 'scores' list")
         return [float(x) for x in data["scores"]]
 
+    def _post_json(self, payload: dict[str, Any], retry_timeouts: bool = True) -> list[float]:
+        return self._request(retry_timeouts, json=payload)
+
     def post_raw(self, raw_body: str, headers: dict[str, str] | None = None) -> list[float]:
-        url = f"{self.base_url.rstrip('/')}{self.predict_path}"
         headers = headers or {"content-type": "application/json"}
-        if self.transport is not None and hasattr(self.transport, "__aenter__"):
-            data = self._run_async(self._async_post_raw(url, raw_body, headers))
-        else:
-            with httpx.Client(timeout=self.timeout_s, transport=self.transport) as client:
-                response = client.post(url, content=raw_body, headers=headers)
-                response.raise_for_status()
-                data = response.json()
-        if "scores" not in data or not isinstance(data["scores"], Iterable):
-            raise ModelError("Endpoint response missing 'scores' list")
-        return [float(x) for x in data["scores"]]
+        return self._request(content=raw_body, headers=headers)
+
+    def predict_batch(self, xs: Sequence[str]) -> list[float]:
+        """Send ``xs`` as a single request, bypassing adaptive batching."""
+        return self._post_json({"inputs": list(xs)}, retry_timeouts=False)
 
     def predict(self, xs: Sequence[str]) -> list[float]:
-        return self._post_json({"inputs": list(xs)})
+        items = list(xs)
+        if not items:
+            return self._post_json({"inputs": items})
+        size = self.batcher.size
+        if self.concurrency > 1 and len(items) > size:
+            from concurrent.futures import ThreadPoolExecutor
+
+            chunks = [items[i : i + size] for i in range(0, len(items), size)]
+            with ThreadPoolExecutor(min(self.concurrency, len(chunks))) as pool:
+                parts = list(pool.map(self._predict_chunked, chunks))
+            return [score for part in parts for score in part]
+        return self._predict_chunked(items)
+
+    def _predict_chunked(self, items: list[str]) -> list[float]:
+        import httpx
+
+        scores: list[float] = []
+        start = 0
+        while start < len(items):
+            chunk = items[start : start + self.batcher.size]
+            shrinkable = self.batcher.can_shrink(len(chunk))
+            chunk_start = time.perf_counter()
+            try:
+                out = self._post_json({"inputs": chunk}, retry_timeouts=not shrinkable)
+            except (PayloadTooLargeError, httpx.TimeoutException):
+                if not shrinkable:
+                    raise
+                self.batcher.shrink(len(chunk))
+                continue
+            self.batcher.observe(len(chunk), time.perf_counter() - chunk_start)
+            scores.extend(out)
+            start += len(chunk)
+        return scores
+
+
+def entrypoint_module(entrypoint: str) -> str:
+    """Module name of a ``module:attr`` or ``module.attr`` entrypoint."""
+    if ":" in entrypoint:
+        return entrypoint.split(":", 1)[0]
+    return entrypoint.rsplit(".", 1)[0]
 
 
 def load_entrypoint(entrypoint: str, kwargs: dict[str, Any] | None = None) -> Any:
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from pathlib import Path
+from typing import Any
+
+from mtci.config import FailureCaptureConfig
+
+TEXT_FIELDS = ("original", "transformed")
+
+
+class BlobStore:
+    """Content-addressed store for full texts that were truncated in artifacts."""
+
+    def __init__(self, root: Path, compress: bool = False):
+        self.root = root
+        self.compress = compress
+
+    def put(self, text: str) -> str:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        suffix = ".txt.gz" if self.compress else ".txt"
+        path = self.root / digest[:2] / f"{digest}{suffix}"
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            data = text.encode("utf-8")
+            path.write_bytes(gzip.compress(data) if self.compress else data)
+        return digest
+
+
+def compact_failures(
+    failures: list[dict],
+    config: FailureCaptureConfig,
+    blobs: BlobStore | None = None,
+) -> tuple[list[dict], dict[str, Any]]:
+    """Deduplicate, rank by diff, keep the top-k and truncate long texts."""
+    total = len(failures)
+    if config.dedupe:
+        groups: dict[tuple, dict] = {}
+        for failure in failures:
+            key = tuple(failure.get(name) for name in TEXT_FIELDS)
+            if key in groups:
+                groups[key]["duplicate_indexes"].append(failure["index"])
+            else:
+                groups[key] = {**failure, "duplicate_indexes": []}
+        failures = list(groups.values())
+    unique = len(failures)
+    failures = sorted(failures, key=lambda f: -float(f.get("diff", 0.0)))
+    if config.top_k is not None:
+        failures = failures[: config.top_k]
+
+    compacted = []
+    for failure in failures:
+        failure = dict(failure)
+        for name in TEXT_FIELDS:
+            text = failure.get(name)
+            if text is None or len(text) <= config.max_text_chars:
+                continue
+            failure[name] = text[: config.max_text_chars] + "…"
+            failure[f"{name}_len"] = len(text)
+            if blobs is not None:
+                failure[f"{name}_sha256"] = blobs.put(text)
+        compacted.append(failure)
+
+    summary = {"total": total, "unique": unique, "kept": len(compacted)}
+    return compacted, summary
+
+
+def write_failures(failure_dir: Path, message: str, failures: list[dict], compress: bool) -> None:
+    failure_dir.mkdir(parents=True, exist_ok=True)
+    (failure_dir / "message.txt").write_text(message)
+    if compress:
+        payload = json.dumps(failures, separators=(",", ":")).encode("utf-8")
+        (failure_dir / "failures.json.gz").write_bytes(gzip.compress(payload))
+    else:
+        (failure_dir / "failures.json").write_text(json.dumps(failures, indent=2))
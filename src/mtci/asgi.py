@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from typing import Any
+
+import httpx
+
+IN_PROCESS_BASE_URL = "http://mtci.inprocess"
+
+# The body is handed over fully read (and decoded), so framing headers go.
+_FRAMING_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class InProcessASGITransport(httpx.BaseTransport):
+    """Synchronous transport that serves requests from an in-process ASGI app.
+
+    The app runs on one long-lived event loop in a daemon thread, with its
+    lifespan started once, so requests keep full HTTP semantics (routing,
+    validation, status codes) without uvicorn, sockets or a per-request event
+    loop. Being synchronous, it composes with retries, hedging, concurrency
+    and cassette recording like a network transport.
+    """
+
+    def __init__(self, app: Any, lifespan: bool = True) -> None:
+        self.app = app
+        self._inner = httpx.ASGITransport(app=app)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="mtci-asgi", daemon=True
+        )
+        self._thread.start()
+        self._lifespan_events: asyncio.Queue | None = None
+        self._lifespan_sent: asyncio.Queue | None = None
+        self._lifespan_task: asyncio.Future | None = None
+        if lifespan:
+            self._run(self._startup())
+
+    def _run(self, coro: Any) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _startup(self) -> None:
+        receive_queue: asyncio.Queue = asyncio.Queue()
+        sent: asyncio.Queue = asyncio.Queue()
+
+        async def receive() -> dict:
+            return await receive_queue.get()
+
+        async def send(message: dict) -> None:
+            await sent.put(message)
+
+        async def lifespan() -> None:
+            try:
+                await self.app({"type": "lifespan", "asgi": {"version": "3.0"}}, receive, send)
+            except Exception:
+                # Apps without lifespan support may raise on the unknown scope.
+                pass
+            await sent.put({"type": "lifespan.unsupported"})
+
+        self._lifespan_task = asyncio.ensure_future(lifespan())
+        await receive_queue.put({"type": "lifespan.startup"})
+        message = await sent.get()
+        if message["type"] == "lifespan.startup.failed":
+            raise RuntimeError(f"ASGI app failed to start: {message.get('message', '')}")
+        if message["type"] == "lifespan.startup.complete":
+            self._lifespan_events = receive_queue
+            self._lifespan_sent = sent
+
+    async def _shutdown(self) -> None:
+        if self._lifespan_events is not None and self._lifespan_sent is not None:
+            await self._lifespan_events.put({"type": "lifespan.shutdown"})
+            await self._lifespan_sent.get()
+            self._lifespan_events = None
+        if self._lifespan_task is not None:
+            await asyncio.wait([self._lifespan_task], timeout=1.0)
+
+    async def _call(self, request: httpx.Request) -> tuple[int, list, bytes]:
+        response = await self._inner.handle_async_request(request)
+        body = await response.aread()
+        return response.status_code, response.headers.multi_items(), body
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        status, headers, body = self._run(self._call(request))
+        return httpx.Response(
+            status,
+            headers=[(k, v) for k, v in headers if k.lower() not in _FRAMING_HEADERS],
+            content=body,
+            request=request,
+        )
+
+    def close(self) -> None:
+        # Clients are opened per request; the app lives until shutdown().
+        pass
+
+    def shutdown(self) -> None:
+        if not self._loop.is_running():
+            return
+        self._run(self._shutdown())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5.0)
+        self._loop.close()
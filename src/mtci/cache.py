@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+from mtci.adapters import BaseModelAdapter, MemoizedAdapter, build_adapter
+from mtci.config import Config, DatasetConfig, LocalModelConfig, ModelConfig, load_config
+from mtci.data import load_dataset_rows
+from mtci.state import MRStats, StateStore
+
+
+def _stamp(path: Path) -> Tuple[int, int] | None:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class RunCache:
+    """Configs, datasets, adapters and state kept resident between runs.
+
+    Files are re-read only when their mtime or size changes; adapters are
+    rebuilt only when the model section of the config changes.
+    """
+
+    def __init__(self, memoize_predictions: bool = False, memoize_endpoints: bool = False) -> None:
+        self.memoize_predictions = memoize_predictions
+        self.memoize_endpoints = memoize_endpoints
+        self._configs: Dict[Path, Tuple[Any, Config]] = {}
+        self._datasets: Dict[Tuple[Path, str, str], Tuple[Any, list[str], list[int] | None]] = {}
+        self._adapters: Dict[str, BaseModelAdapter] = {}
+        self._stores: Dict[Path, Tuple[Any, StateStore, Dict[str, MRStats]]] = {}
+
+    def config(self, path: str | Path) -> Config:
+        path = Path(path).resolve()
+        stamp = _stamp(path)
+        cached = self._configs.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, load_config(path))
+            self._configs[path] = cached
+        return cached[1]
+
+    def dataset(self, config: DatasetConfig) -> list[str]:
+        return self.dataset_rows(config)[0]
+
+    def dataset_rows(self, config: DatasetConfig) -> Tuple[list[str], list[int] | None]:
+        key = (Path(config.path).resolve(), config.jsonl_field, config.dedup.model_dump_json())
+        stamp = _stamp(key[0])
+        cached = self._datasets.get(key)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, *load_dataset_rows(config))
+            self._datasets[key] = cached
+        return cached[1], cached[2]
+
+    def adapter(self, config: ModelConfig) -> BaseModelAdapter:
+        key = json.dumps(config.model_dump(mode="json"), sort_keys=True)
+        if key not in self._adapters:
+            adapter = build_adapter(config)
+            local = isinstance(config, LocalModelConfig)
+            if self.memoize_predictions and (local or self.memoize_endpoints):
+                adapter = MemoizedAdapter(adapter)
+            self._adapters[key] = adapter
+        return self._adapters[key]
+
+    def drop_adapters(self) -> None:
+        for adapter in self._adapters.values():
+            adapter.close()
+        self._adapters.clear()
+
+    def state(self, root: Path) -> Tuple[StateStore, Dict[str, MRStats]]:
+        root = root.resolve()
+        cached = self._stores.get(root)
+        if cached is not None and cached[0] == _stamp(cached[1].path):
+            return cached[1], cached[2]
+        store = StateStore(root)
+        stats = store.load()
+        self._stores[root] = (_stamp(store.path), store, stats)
+        return store, stats
+
+    def state_saved(self, store: StateStore) -> None:
+        root = store.root.resolve()
+        if root in self._stores:
+            _, _, stats = self._stores[root]
+            self._stores[root] = (_stamp(store.path), store, stats)
+
+    def configs(self) -> list[Config]:
+        return [config for _, config in self._configs.values()]
+
+    def invalidate(self) -> None:
+        self._configs.clear()
+        self._datasets.clear()
+        self.drop_adapters()
+        self._stores.clear()
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from statistics import median
+from typing import Any, Callable, Sequence
+
+from mtci.adapters import BaseModelAdapter, HTTPEndpointModel, ModelError, unwrap
+from mtci.config import ModelConfig
+from mtci.state import STATE_DIR
+
+PERFORMANCE_FILE = "performance.json"
+
+Predict = Callable[[list[str]], list[float]]
+
+
+class CalibrationError(Exception):
+    pass
+
+
+def calibration_key(config: ModelConfig) -> str:
+    """Fingerprint of the model identity, ignoring the knobs calibration tunes."""
+    raw = json.dumps(
+        config.model_dump(mode="json", exclude={"batching", "concurrency", "retry"}),
+        sort_keys=True,
+    )
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+@dataclass
+class PerformanceProfile:
+    """Measured cost model for one model config.
+
+    Latency per call is fitted as ``latency_fixed_s + latency_per_item_s * n``;
+    ``best_concurrency`` is the smallest level reaching 90% of peak throughput.
+    """
+
+    fingerprint: str
+    measured_at: float
+    latency_fixed_s: float
+    latency_per_item_s: float
+    best_batch_size: int
+    best_concurrency: int = 1
+    items_per_s: float = 0.0
+    batch_points: list[list[float]] = field(default_factory=list)
+    concurrency_points: list[list[float]] = field(default_factory=list)
+
+    def latency(self, batch_size: int) -> float:
+        return self.latency_fixed_s + self.latency_per_item_s * batch_size
+
+    def predict_runtime(self, items: int) -> float:
+        """Predicted wall time to score ``items`` inputs at the tuned settings."""
+        if items <= 0:
+            return 0.0
+        calls = math.ceil(items / self.best_batch_size)
+        waves = math.ceil(calls / self.best_concurrency)
+        return waves * self.latency(min(items, self.best_batch_size))
+
+
+def fit_latency(points: Sequence[tuple[int, float]]) -> tuple[float, float]:
+    """Least-squares ``(fixed, per_item)`` fit of latency against batch size.
+
+    Also fits memory peaks against example counts (see ``MRStats.memory_model``).
+    """
+    if len(points) == 1:
+        size, latency = points[0]
+        return 0.0, latency / size
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var = sum((x - mean_x) ** 2 for x, _ in points)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in points) / var if var else 0.0
+    return max(0.0, mean_y - slope * mean_x), max(0.0, slope)
+
+
+def _timed(predict: Predict, batch: list[str], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        predict(batch)
+        timings.append(time.perf_counter() - start)
+    return median(timings)
+
+
+def _sized(texts: Sequence[str], size: int) -> list[str]:
+    return [texts[i % len(texts)] for i in range(size)]
+
+
+def calibrate(
+    predict: Predict,
+    texts: Sequence[str],
+    fingerprint: str,
+    max_batch: int = 256,
+    max_concurrency: int = 1,
+    repeats: int = 3,
+    target_latency_s: float | None = None,
+    on_error: tuple[type[BaseException], ...] = (),
+) -> PerformanceProfile:
+    """Probe ``predict`` with doubling batch sizes, then doubling concurrency.
+
+    Batch probing stops at ``max_batch``, at the first call exceeding
+    ``target_latency_s`` or at the first ``on_error`` exception. The chosen
+    batch size is the smallest whose fitted per-item cost is within 10% of the
+    best measured one.
+    """
+    if not texts:
+        raise CalibrationError("No inputs to calibrate with")
+    predict(_sized(texts, 1))  # warm-up
+
+    batch_points: list[tuple[int, float]] = []
+    size = 1
+    while size <= max_batch:
+        try:
+            latency = _timed(predict, _sized(texts, size), repeats)
+        except on_error:
+            break
+        batch_points.append((size, latency))
+        if target_latency_s is not None and latency > target_latency_s:
+            break
+        size *= 2
+    if not batch_points:
+        raise CalibrationError("Model failed on a single-input batch")
+
+    fixed, per_item = fit_latency(batch_points)
+    allowed = [
+        s for s, latency in batch_points if target_latency_s is None or latency <= target_latency_s
+    ] or [batch_points[0][0]]
+    best_cost = min(fixed / s + per_item for s in allowed)
+    best_batch = min(s for s in allowed if fixed / s + per_item <= best_cost * 1.1)
+
+    concurrency_points: list[tuple[int, float]] = []
+    level = 1
+    while level <= max_concurrency:
+        batch = _sized(texts, best_batch)
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(level) as pool:
+                list(pool.map(lambda _: predict(batch), range(level * repeats)))
+        except on_error:
+            break
+        elapsed = time.perf_counter() - start
+        concurrency_points.append((level, level * repeats * best_batch / elapsed))
+        if concurrency_points[-1][1] < 0.8 * max(t for _, t in concurrency_points):
+            break  # past saturation
+        level *= 2
+    peak = max((t for _, t in concurrency_points), default=0.0)
+    best_concurrency = min(
+        (lvl for lvl, t in concurrency_points if t >= 0.9 * peak), default=1
+    )
+
+    return PerformanceProfile(
+        fingerprint=fingerprint,
+        measured_at=time.time(),
+        latency_fixed_s=fixed,
+        latency_per_item_s=per_item,
+        best_batch_size=best_batch,
+        best_concurrency=best_concurrency,
+        items_per_s=peak,
+        batch_points=[list(p) for p in batch_points],
+        concurrency_points=[list(p) for p in concurrency_points],
+    )
+
+
+def calibrate_model(
+    model: BaseModelAdapter,
+    config: ModelConfig,
+    texts: Sequence[str],
+    max_batch: int | None = None,
+    max_concurrency: int = 16,
+    repeats: int = 3,
+) -> PerformanceProfile:
+    """Calibrate a built adapter; concurrency is only probed for endpoints."""
+    inner = unwrap(model)
+    if isinstance(inner, HTTPEndpointModel):
+        import httpx
+
+        return calibrate(
+            inner.predict_batch,
+            texts,
+            calibration_key(config),
+            max_batch=max_batch or inner.batcher.max_size,
+            max_concurrency=max_concurrency,
+            repeats=repeats,
+            target_latency_s=inner.batcher.target_latency_s,
+            on_error=(ModelError, httpx.HTTPError),
+        )
+    return calibrate(
+        model.predict,
+        texts,
+        calibration_key(config),
+        max_batch=max_batch or 256,
+        max_concurrency=1,
+        repeats=repeats,
+    )
+
+
+def _path(root: Path) -> Path:
+    return root / STATE_DIR / PERFORMANCE_FILE
+
+
+def save_performance(root: Path, profile: PerformanceProfile) -> Path:
+    path = _path(root)
+    data: dict[str, Any] = {}
+    if path.exists():
+        data = json.loads(path.read_text())
+    data.setdefault("models", {})[profile.fingerprint] = asdict(profile)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2))
+    return path
+
+
+def load_performance(root: Path, config: ModelConfig) -> PerformanceProfile | None:
+    path = _path(root)
+    if not path.exists():
+        return None
+    entry = json.loads(path.read_text()).get("models", {}).get(calibration_key(config))
+    return PerformanceProfile(**entry) if entry else None
+
+
+def apply_performance(
+    model: BaseModelAdapter, config: ModelConfig, profile: PerformanceProfile
+) -> None:
+    """Use calibrated batch size and concurrency unless the config pins them."""
+    inner = unwrap(model)
+    if not isinstance(inner, HTTPEndpointModel):
+        return
+    if "initial_size" not in config.batching.model_fields_set:
+        inner.batcher.size = max(
+            inner.batcher.min_size, min(inner.batcher.max_size, profile.best_batch_size)
+        )
+    if "concurrency" not in config.model_fields_set:
+        inner.concurrency = profile.best_concurrency
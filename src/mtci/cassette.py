@@ -0,0 +1,241 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict
+
+from mtci.adapters import BaseModelAdapter, HTTPEndpointModel, ModelError, unwrap
+
+if TYPE_CHECKING:
+    import httpx
+
+CASSETTE_MODES = ("record", "replay")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interactions (
+    key TEXT PRIMARY KEY,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL
+);
+"""
+
+# Recorded bodies are stored decoded, so framing headers no longer apply.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class CassetteMissError(ModelError):
+    pass
+
+
+def canonical_body(body: bytes) -> bytes:
+    """JSON bodies compare by value (key order, whitespace); others byte-wise."""
+    try:
+        value = json.loads(body)
+    except ValueError:
+        return body
+    return json.dumps(value, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    digest = hashlib.sha256(f"{method.upper()} {path}\n".encode("utf-8"))
+    digest.update(canonical_body(body))
+    return digest.hexdigest()
+
+
+@dataclass
+class Interaction:
+    method: str
+    path: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+
+
+class Cassette:
+    """Recorded endpoint responses in a small SQLite file.
+
+    The whole cassette is loaded into memory on open so replay lookups are
+    dict hits; new recordings are written by :meth:`save`.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.interactions: Dict[str, Interaction] = {}
+        self._new: Dict[str, Interaction] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if self.path.exists():
+            self._load()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _load(self) -> None:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, method, path, status, headers, body FROM interactions"
+            ).fetchall()
+        finally:
+            conn.close()
+        for key, method, path, status, headers, body in rows:
+            self.interactions[key] = Interaction(
+                method, path, status, json.loads(headers), zlib.decompress(body)
+            )
+
+    def lookup(self, key: str) -> Interaction | None:
+        with self._lock:
+            found = self.interactions.get(key)
+            if found is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return found
+
+    def add(self, key: str, interaction: Interaction) -> None:
+        with self._lock:
+            self.interactions[key] = interaction
+            self._new[key] = interaction
+
+    def save(self) -> None:
+        with self._lock:
+            pending, self._new = self._new, {}
+        if not pending:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO interactions VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            key,
+                            item.method,
+                            item.path,
+                            item.status,
+                            json.dumps(item.headers),
+                            zlib.compress(item.body),
+                        )
+                        for key, item in pending.items()
+                    ],
+                )
+        finally:
+            conn.close()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "interactions": len(self.interactions),
+                "recorded": len(self._new),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _key_for(request: "httpx.Request") -> str:
+    return request_key(request.method, request.url.raw_path.decode("ascii"), request.read())
+
+
+def _response(interaction: Interaction, request: "httpx.Request") -> "httpx.Response":
+    import httpx
+
+    return httpx.Response(
+        interaction.status,
+        headers=interaction.headers,
+        content=interaction.body,
+        request=request,
+    )
+
+
+def replay_transport(cassette: Cassette) -> "httpx.BaseTransport":
+    """Transport answering only from ``cassette``; unknown requests raise."""
+    import httpx
+
+    class ReplayTransport(httpx.BaseTransport):
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            interaction = cassette.lookup(_key_for(request))
+            if interaction is None:
+                raise CassetteMissError(
+                    f"No recorded response for {request.method} {request.url.path} in "
+                    f"{cassette.path}; re-record with --record"
+                )
+            return _response(interaction, request)
+
+    return ReplayTransport()
+
+
+def recording_transport(
+    cassette: Cassette, inner: "httpx.BaseTransport | None" = None
+) -> "httpx.BaseTransport":
+    """Transport forwarding to ``inner`` and recording every response."""
+    import httpx
+
+    inner = inner or httpx.HTTPTransport()
+
+    class RecordingTransport(httpx.BaseTransport):
+        def handle_request(self, request: httpx.Request) -> httpx.Response:
+            key = _key_for(request)
+            response = inner.handle_request(request)
+            body = response.read()
+            response.close()
+            interaction = Interaction(
+                request.method,
+                request.url.path,
+                response.status_code,
+                {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS},
+                body,
+            )
+            cassette.add(key, interaction)
+            return _response(interaction, request)
+
+        def close(self) -> None:
+            # Clients are opened per request; keep the wrapped transport alive.
+            pass
+
+    return RecordingTransport()
+
+
+def attach_cassette(
+    model: BaseModelAdapter, path: str | Path, mode: str, batch_size: int | None = None
+) -> tuple[Cassette, Callable[[], None]]:
+    """Route an endpoint adapter through a cassette; returns a restore hook.
+
+    Interactions are keyed by request body, so the adapter's batch size is
+    pinned to ``batch_size`` (default: its current size) until restore;
+    otherwise latency-driven growth would split replayed inputs differently.
+    """
+    if mode not in CASSETTE_MODES:
+        raise ValueError(f"Cassette mode must be one of: {', '.join(CASSETTE_MODES)}")
+    endpoint = unwrap(model)
+    if not isinstance(endpoint, HTTPEndpointModel):
+        raise ValueError("Record/replay requires an endpoint model")
+    cassette = Cassette(path)
+    previous = endpoint.transport
+    previous_batcher = endpoint.batcher
+    endpoint.batcher = replace(
+        previous_batcher,
+        size=previous_batcher.size if batch_size is None else batch_size,
+        fixed=True,
+    )
+    if mode == "replay":
+        endpoint.transport = replay_transport(cassette)
+    else:
+        endpoint.transport = recording_transport(cassette, previous)
+
+    def restore() -> None:
+        endpoint.transport = previous
+        endpoint.batcher = previous_batcher
+
+    return cassette, restore
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path, PurePosixPath
+from typing import List
+
+
+class ChangeDetectionError(Exception):
+    pass
+
+
+def _git_diff(args: List[str], root: str | Path) -> List[str]:
+    try:
+        proc = subprocess.run(
+            ["git", "diff", "--name-only", *args],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError as exc:
+        raise ChangeDetectionError(f"git not available: {exc}") from exc
+    if proc.returncode != 0:
+        raise ChangeDetectionError(f"git diff {' '.join(args)} failed: {proc.stderr.strip()}")
+    return [line.strip() for line in proc.stdout.splitlines() if line.strip()]
+
+
+def changed_paths(base_ref: str, root: str | Path = ".") -> List[str]:
+    """Files changed since the merge base with ``base_ref``, plus uncommitted edits.
+
+    Diffing from the merge base (``base_ref...HEAD``) ignores commits that
+    landed on ``base_ref`` after the branch point.
+    """
+    committed = _git_diff([f"{base_ref}...HEAD"], root)
+    uncommitted = _git_diff(["HEAD"], root)
+    return sorted(set(committed) | set(uncommitted))
+
+
+def path_keys(path: str) -> List[str]:
+    """The file itself plus its directory, so history generalizes to siblings."""
+    parent = PurePosixPath(path).parent
+    keys = [path]
+    if str(parent) != ".":
+        keys.append(f"{parent}/")
+    return keys
@@ -1,61 +1,281 @@
 from __future__ import annotations
 
-import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import TYPE_CHECKING, Iterator, Optional
 
-import httpx
 import typer
-import uvicorn
 
-from mtci.config import ConfigError, load_config
-from mtci.execution import run_profile
-from mtci.server import create_app
+if TYPE_CHECKING:
+    from mtci.config import Config
+
+# Command dependencies (pydantic, httpx, FastAPI, uvicorn, sqlite) are imported
+# inside each command so that cold start only pays for what the command uses.
 
 app = typer.Typer(add_completion=False)
 
 
+def _load_config_or_exit(path: str) -> "Config":
+    from mtci.config import ConfigError, load_config
+
+    try:
+        return load_config(path)
+    except ConfigError as exc:
+        typer.secho(str(exc), fg=typer.colors.RED)
+        raise typer.Exit(code=2)
+
+
 @app.command()
 def run(
     config: str = typer.Option("mtci.yml", "--config"),
     profile: str = typer.Option("pr-fast", "--profile"),
     out: str = typer.Option("mtci_artifacts", "--out"),
+    changed_since: Optional[str] = typer.Option(
+        None, "--changed-since", help="Git ref to diff against for change-aware selection."
+    ),
+    no_daemon: bool = typer.Option(False, "--no-daemon", help="Never delegate to mtci daemon."),
+    watch: bool = typer.Option(
+        False, "--watch", help="Re-run affected MRs when model, data or MR code changes."
+    ),
+    profile_mrs: Optional[str] = typer.Option(
+        None, "--profile-mrs", help="Profile each MR: 'cprofile' or 'sample'."
+    ),
+    record: Optional[str] = typer.Option(
+        None, "--record", help="Record endpoint responses to this cassette file."
+    ),
+    replay: Optional[str] = typer.Option(
+        None, "--replay", help="Answer endpoint requests from this cassette file only."
+    ),
 ):
     """Run metamorphic testing under a profile."""
+    cassette_path, cassette_mode = None, "replay"
+    if record or replay:
+        if record and replay:
+            typer.secho("--record and --replay are mutually exclusive", fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+        if replay and not Path(replay).exists():
+            typer.secho(f"Cassette not found: {replay}", fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+        cassette_path, cassette_mode = (record, "record") if record else (replay, "replay")
+        if _load_config_or_exit(config).model.mode != "endpoint":
+            typer.secho("--record/--replay require an endpoint model", fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+
+    changed = None
+    if changed_since:
+        from mtci.changes import ChangeDetectionError, changed_paths
+
+        try:
+            changed = changed_paths(changed_since)
+        except ChangeDetectionError as exc:
+            typer.secho(str(exc), fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+
+    if profile_mrs is not None:
+        from mtci.profiling import PROFILE_MODES
+
+        if profile_mrs not in PROFILE_MODES:
+            typer.secho(
+                f"--profile-mrs must be one of: {', '.join(PROFILE_MODES)}", fg=typer.colors.RED
+            )
+            raise typer.Exit(code=2)
+
+    profile_names = [name.strip() for name in profile.split(",") if name.strip()]
+    if len(profile_names) > 1:
+        if watch or profile_mrs is not None:
+            typer.secho(
+                "--watch and --profile-mrs take a single profile", fg=typer.colors.RED
+            )
+            raise typer.Exit(code=2)
+        cfg = _load_config_or_exit(config)
+        from mtci.execution import run_profiles
+
+        try:
+            with _cassette_misses_exit(cassette_path):
+                exit_code, out_dirs = run_profiles(
+                    cfg,
+                    profile_names,
+                    out,
+                    changed=changed,
+                    cassette_path=cassette_path,
+                    cassette_mode=cassette_mode,
+                )
+        except ValueError as exc:
+            typer.secho(str(exc), fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+        for name, out_dir in zip(profile_names, out_dirs):
+            typer.echo(f"Artifacts ({name}): {out_dir}")
+        raise typer.Exit(code=exit_code)
+
+    if watch:
+        if cassette_path is not None:
+            typer.secho("--watch does not support --record/--replay", fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+        _watch(config, profile, out)
+        return
+
+    if not no_daemon and profile_mrs is None and cassette_path is None:
+        from mtci.daemon import delegate
+
+        response = delegate(
+            Path.cwd(),
+            {
+                "cmd": "run",
+                "config": str(Path(config).resolve()),
+                "profile": profile,
+                "out": str(Path(out).resolve()),
+                "changed": changed,
+            },
+        )
+        if response is not None:
+            if not response.get("ok"):
+                typer.secho(f"Daemon run failed: {response.get('error')}", fg=typer.colors.RED)
+                raise typer.Exit(code=2)
+            typer.echo(f"Artifacts: {response['out_dir']}")
+            raise typer.Exit(code=response["exit_code"])
+
+    cfg = _load_config_or_exit(config)
+
+    from mtci.execution import run_profile
+
+    with _cassette_misses_exit(cassette_path):
+        exit_code, out_dir = run_profile(
+            cfg,
+            profile,
+            out,
+            changed=changed,
+            profile_mrs=profile_mrs,
+            cassette_path=cassette_path,
+            cassette_mode=cassette_mode,
+        )
+    typer.echo(f"Artifacts: {out_dir}")
+    raise typer.Exit(code=exit_code)
+
+
+@contextmanager
+def _cassette_misses_exit(cassette_path: str | None) -> Iterator[None]:
+    """Turn a replay miss into exit code 2 with the re-record hint."""
+    if cassette_path is None:
+        yield
+        return
+    from mtci.cassette import CassetteMissError
+
     try:
-        cfg = load_config(config)
-    except ConfigError as exc:
+        yield
+    except CassetteMissError as exc:
         typer.secho(str(exc), fg=typer.colors.RED)
         raise typer.Exit(code=2)
 
-    exit_code, out_dir = run_profile(cfg, profile, out)
-    typer.echo(f"Artifacts: {out_dir}")
-    raise typer.Exit(code=exit_code)
+
+def _watch(config: str, profile: str, out: str) -> None:
+    _load_config_or_exit(config)
+    from mtci.watch import WatchCycle, Watcher
+
+    def report(cycle: WatchCycle) -> None:
+        scope = ", ".join(cycle.mrs) if cycle.mrs is not None else "all MRs"
+        color = typer.colors.GREEN if cycle.exit_code == 0 else typer.colors.RED
+        typer.secho(
+            f"[watch] {scope}: exit {cycle.exit_code} in {cycle.elapsed_s:.3f}s -> {cycle.out_dir}",
+            fg=color,
+        )
+
+    def error(exc: Exception) -> None:
+        typer.secho(f"[watch] {type(exc).__name__}: {exc}", fg=typer.colors.RED)
+
+    watcher = Watcher(Path(config), profile, Path(out))
+    try:
+        watcher.loop(report, on_error=error)
+    except KeyboardInterrupt:
+        typer.echo("[watch] stopped")
 
 
 @app.command()
 def serve(
     host: str = typer.Option("127.0.0.1", "--host"),
     port: int = typer.Option(8000, "--port"),
+    backend: Optional[str] = typer.Option(
+        None, "--backend", help="HF serving backend: 'pipeline' (default) or 'bucketed'."
+    ),
+    runtime: Optional[str] = typer.Option(
+        None, "--runtime", help="Bucketed runtime: 'torch' (default) or 'onnx'."
+    ),
+    quantize: bool = typer.Option(False, "--quantize", help="Dynamic int8 quantization (bucketed)."),
 ):
     """Start a local FastAPI inference server."""
-    uvicorn.run(create_app(), host=host, port=port, log_level="info")
+    from mtci.models.bucketed import RUNTIMES
+
+    if backend not in {None, "pipeline", "bucketed"}:
+        typer.secho(f"Unknown backend: {backend}", fg=typer.colors.RED)
+        raise typer.Exit(code=2)
+    if runtime is not None and runtime not in RUNTIMES:
+        typer.secho(
+            f"Unknown runtime: {runtime} (expected one of {', '.join(RUNTIMES)})",
+            fg=typer.colors.RED,
+        )
+        raise typer.Exit(code=2)
+    effective_backend = backend or os.getenv("MTCI_SERVE_BACKEND", "pipeline")
+    if (runtime is not None or quantize) and effective_backend != "bucketed":
+        typer.secho("--runtime and --quantize require --backend bucketed", fg=typer.colors.RED)
+        raise typer.Exit(code=2)
+
+    import uvicorn
+
+    from mtci.server import create_app
+
+    server_app = create_app(backend=backend, runtime=runtime, quantize=quantize)
+    uvicorn.run(server_app, host=host, port=port, log_level="info")
 
 
 @app.command()
-def doctor(config: str = typer.Option("mtci.yml", "--config")):
-    """Validate config and endpoint connectivity."""
+def daemon(
+    stop: bool = typer.Option(False, "--stop", help="Stop the daemon for this directory."),
+    reload: bool = typer.Option(False, "--reload", help="Drop resident models and data."),
+):
+    """Keep models, datasets and state resident and serve `mtci run` requests."""
+    from mtci.daemon import DaemonError, MTCIDaemon, request, socket_path
+
+    root = Path.cwd()
+    if stop or reload:
+        try:
+            request(root, {"cmd": "shutdown" if stop else "reload"}, timeout=5.0)
+        except (OSError, DaemonError) as exc:
+            typer.secho(f"No daemon reachable: {exc}", fg=typer.colors.RED)
+            raise typer.Exit(code=2)
+        typer.echo("Daemon stopped" if stop else "Daemon cache cleared")
+        return
+    typer.echo(f"mtci daemon listening on {socket_path(root)}")
     try:
-        cfg = load_config(config)
-    except ConfigError as exc:
+        MTCIDaemon(root).serve_forever()
+    except DaemonError as exc:
         typer.secho(str(exc), fg=typer.colors.RED)
         raise typer.Exit(code=2)
 
+
+@app.command()
+def doctor(
+    config: str = typer.Option("mtci.yml", "--config"),
+    calibrate: bool = typer.Option(
+        False, "--calibrate", help="Measure the model and save a performance profile."
+    ),
+    max_batch: Optional[int] = typer.Option(None, "--max-batch"),
+    max_concurrency: int = typer.Option(16, "--max-concurrency"),
+    repeats: int = typer.Option(3, "--repeats"),
+):
+    """Validate config and endpoint connectivity."""
+    cfg = _load_config_or_exit(config)
+
     if cfg.model.mode == "endpoint":
-        base_url = cfg.model.base_url.rstrip("/")
+        import httpx
+
+        from mtci.adapters import build_adapter
+
+        endpoint = build_adapter(cfg.model)
+        base_url = endpoint.base_url.rstrip("/")
         health_url = f"{base_url}/health"
         predict_url = f"{base_url}{cfg.model.predict_path}"
         try:
-            with httpx.Client(timeout=cfg.model.timeout_s) as client:
+            with httpx.Client(timeout=cfg.model.timeout_s, transport=endpoint.transport) as client:
                 health = client.get(health_url)
                 health.raise_for_status()
                 response = client.post(predict_url, json={"inputs": ["hello"]})
@@ -67,6 +287,107 @@ def doctor(config: str = typer.Option("mtci.yml", "--config")):
         if "scores" not in data:
             typer.secho("Endpoint response missing 'scores'", fg=typer.colors.RED)
             raise typer.Exit(code=2)
+        endpoint.close()
         typer.echo("Endpoint connectivity: ok")
 
     typer.echo("Config validation: ok")
+    if calibrate:
+        _calibrate(cfg, max_batch, max_concurrency, repeats)
+
+
+def _calibrate(cfg: "Config", max_batch: Optional[int], max_concurrency: int, repeats: int) -> None:
+    from itertools import islice
+
+    from mtci.adapters import build_adapter
+    from mtci.calibration import CalibrationError, calibrate_model, save_performance
+    from mtci.data import DatasetError, iter_jsonl
+
+    try:
+        texts = list(islice(iter_jsonl(cfg.dataset.path, cfg.dataset.jsonl_field), 256))
+    except DatasetError:
+        texts = []
+    model = build_adapter(cfg.model)
+    try:
+        perf = calibrate_model(
+            model,
+            cfg.model,
+            texts or ["hello"],
+            max_batch=max_batch,
+            max_concurrency=max_concurrency,
+            repeats=repeats,
+        )
+    except CalibrationError as exc:
+        typer.secho(f"Calibration failed: {exc}", fg=typer.colors.RED)
+        raise typer.Exit(code=2)
+    finally:
+        model.close()
+    for size, latency in perf.batch_points:
+        typer.echo(f"batch={int(size):<5} latency={latency * 1000:.1f}ms")
+    for level, throughput in perf.concurrency_points:
+        typer.echo(f"concurrency={int(level):<3} throughput={throughput:.1f} items/s")
+    typer.echo(
+        f"Fit: {perf.latency_fixed_s * 1000:.2f}ms + {perf.latency_per_item_s * 1000:.3f}ms/item; "
+        f"batch_size={perf.best_batch_size} concurrency={perf.best_concurrency}"
+    )
+    typer.echo(f"Performance profile: {save_performance(Path.cwd(), perf)}")
+
+
+@app.command()
+def report(out_dir: str = typer.Argument(..., help="Run artifacts directory.")):
+    """Rebuild report.json from a run's events.jsonl (e.g. after a timeout)."""
+    from mtci.reporting import EVENTS_FILE, assemble_report
+
+    path = Path(out_dir)
+    if not (path / EVENTS_FILE).exists():
+        typer.secho(f"No {EVENTS_FILE} in {path}", fg=typer.colors.RED)
+        raise typer.Exit(code=2)
+    typer.echo(f"Report: {assemble_report(path)}")
+
+
+@app.command()
+def history(
+    profile: Optional[str] = typer.Option(None, "--profile"),
+    mr: Optional[str] = typer.Option(None, "--mr", help="Show recent runs of one MR."),
+    limit: int = typer.Option(20, "--limit"),
+    compact: bool = typer.Option(False, "--compact", help="Apply retention and vacuum."),
+    max_runs: Optional[int] = typer.Option(
+        None, "--max-runs", help="Runs to keep when compacting (default: history.max_runs)."
+    ),
+    config: str = typer.Option("mtci.yml", "--config"),
+):
+    """Show per-MR run history from .mtci/history.sqlite3."""
+    from mtci.history import HistoryStore
+
+    if compact:
+        if max_runs is None:
+            max_runs = _load_config_or_exit(config).history.max_runs
+        removed = HistoryStore(Path.cwd(), max_runs=max_runs).compact()
+        typer.echo(f"Removed {removed} runs")
+        return
+    store = HistoryStore(Path.cwd())
+    if mr:
+        records = store.runs_for(mr, limit=limit)
+        if not records:
+            typer.echo(f"No history for {mr}")
+            return
+        for rec in records:
+            typer.echo(
+                f"{rec.run_key:<32} {rec.profile:<14} {rec.status:<8} "
+                f"{rec.runtime_s:8.3f}s attempts={rec.attempts} examples={rec.examples} "
+                f"model={rec.model_fingerprint}"
+            )
+        return
+    summaries = store.summary(profile=profile, recent=limit)
+    if not summaries:
+        typer.echo("No history recorded")
+        return
+    typer.echo(
+        f"{'mr':<28} {'runs':>5} {'fail':>5} {'flaky':>5} {'skip':>5} "
+        f"{'mean_s':>8} {'recent_s':>8} {'max_s':>8}"
+    )
+    for item in summaries:
+        typer.echo(
+            f"{item.mr:<28} {item.runs:>5} {item.fails:>5} {item.flaky:>5} {item.skipped:>5} "
+            f"{item.mean_runtime_s:>8.3f} {item.recent_mean_runtime_s:>8.3f} "
+            f"{item.max_runtime_s:>8.3f}"
+        )
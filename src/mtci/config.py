@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Literal, Optional
 
 import yaml
 from pydantic import BaseModel, ConfigDict, Field, ValidationError
-from pydantic.functional_validators import field_validator
+from pydantic.functional_validators import field_validator, model_validator
 
 
 class ConfigError(Exception):
@@ -22,6 +22,37 @@ class Tolerance(StrictBaseModel):
     rtol: float = 0.01
 
 
+class FlakeConfig(StrictBaseModel):
+    samples: int = Field(0, ge=0)
+    batch_size: int = Field(4, gt=0)
+    confidence: float = Field(0.95, gt=0, lt=1)
+    min_rate: float = Field(0.2, gt=0, le=1)
+    quarantine_known_flaky: bool = False
+
+
+class FailureCaptureConfig(StrictBaseModel):
+    top_k: Optional[int] = Field(100, gt=0)
+    max_text_chars: int = Field(1000, gt=0)
+    dedupe: bool = True
+    store_blobs: bool = True
+    compress: bool = False
+
+
+class ExampleSelectionConfig(StrictBaseModel):
+    strategy: Literal["first", "prioritized"] = "first"
+    pool_size: int = Field(200, gt=0)
+    diversity: float = Field(0.5, ge=0, le=1)
+
+
+class MemoryConfig(StrictBaseModel):
+    track: bool = False
+    budget_mb: Optional[float] = Field(None, gt=0)
+
+    @property
+    def enabled(self) -> bool:
+        return self.track or self.budget_mb is not None
+
+
 class Profile(StrictBaseModel):
     budget_seconds: float = Field(..., gt=0)
     max_examples: int = Field(20, gt=0)
@@ -30,11 +61,34 @@ class Profile(StrictBaseModel):
     tolerance: Tolerance = Tolerance()
     mrs: List[str]
     junit_flaky_as_failure: bool = True
+    flake: FlakeConfig = FlakeConfig()
+    unimpacted_budget_fraction: float = Field(1.0, gt=0, le=1)
+    fused_batch_size: int = Field(64, gt=0)
+    failure_capture: FailureCaptureConfig = FailureCaptureConfig()
+    fail_fast: bool = False
+    max_failures: Optional[int] = Field(None, gt=0)
+    example_selection: ExampleSelectionConfig = ExampleSelectionConfig()
+    memory: MemoryConfig = MemoryConfig()
+
+
+class DedupConfig(StrictBaseModel):
+    enabled: bool = False
+    threshold: float = Field(0.8, gt=0, le=1)
+    num_perm: int = Field(64, gt=0)
+    bands: int = Field(16, gt=0)
+    shingle_size: int = Field(5, gt=0)
+
+    @model_validator(mode="after")
+    def check_bands(self) -> "DedupConfig":
+        if self.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        return self
 
 
 class DatasetConfig(StrictBaseModel):
     path: str
     jsonl_field: str
+    dedup: DedupConfig = DedupConfig()
 
 
 class LocalModelConfig(StrictBaseModel):
@@ -43,20 +97,70 @@ class LocalModelConfig(StrictBaseModel):
     kwargs: Dict[str, Any] = Field(default_factory=dict)
 
 
+class RetryConfig(StrictBaseModel):
+    max_retries: int = Field(3, ge=0)
+    backoff_base_s: float = Field(0.1, ge=0)
+    backoff_max_s: float = Field(5.0, ge=0)
+    retry_statuses: List[int] = Field(default_factory=lambda: [429, 502, 503, 504])
+
+
+class BatchingConfig(StrictBaseModel):
+    initial_size: int = Field(32, gt=0)
+    min_size: int = Field(1, gt=0)
+    max_size: int = Field(256, gt=0)
+    target_latency_s: float = Field(1.0, gt=0)
+
+
+class HedgeConfig(StrictBaseModel):
+    enabled: bool = False
+    percentile: float = Field(95.0, gt=0, lt=100)
+    min_delay_s: float = Field(0.05, ge=0)
+    max_extra_fraction: float = Field(0.1, gt=0, le=1)
+    min_samples: int = Field(20, gt=0)
+    window: int = Field(200, gt=0)
+
+
 class EndpointModelConfig(StrictBaseModel):
     mode: Literal["endpoint"]
-    base_url: str
+    base_url: Optional[str] = None
+    # ASGI app (or factory) entrypoint served in-process instead of over HTTP.
+    app: Optional[str] = None
     predict_path: str = "/predict"
     timeout_s: float = 10.0
+    concurrency: int = Field(1, gt=0)
+    retry: RetryConfig = RetryConfig()
+    batching: BatchingConfig = BatchingConfig()
+    hedge: HedgeConfig = HedgeConfig()
+
+    @model_validator(mode="after")
+    def check_target(self) -> "EndpointModelConfig":
+        if self.base_url is None and self.app is None:
+            raise ValueError("endpoint model needs base_url or app")
+        return self
 
 
 ModelConfig = LocalModelConfig | EndpointModelConfig
 
 
+class MetricsConfig(StrictBaseModel):
+    enabled: bool = False
+    file: Optional[str] = "live_metrics.json"
+    interval_s: float = Field(1.0, gt=0)
+    port: Optional[int] = Field(None, ge=0)
+    host: str = "127.0.0.1"
+
+
+class HistoryConfig(StrictBaseModel):
+    enabled: bool = True
+    max_runs: int = Field(500, gt=0)
+
+
 class Config(StrictBaseModel):
     profiles: Dict[str, Profile]
     dataset: DatasetConfig
     model: ModelConfig = Field(discriminator="mode")
+    history: HistoryConfig = HistoryConfig()
+    metrics: MetricsConfig = MetricsConfig()
 
     @field_validator("profiles")
     @classmethod
@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable
+
+from mtci.state import STATE_DIR
+
+if TYPE_CHECKING:
+    from mtci.config import Config
+
+SOCKET_FILE = "daemon.sock"
+
+
+class DaemonError(Exception):
+    pass
+
+
+def socket_path(root: Path) -> Path:
+    return root / STATE_DIR / SOCKET_FILE
+
+
+def _send(path: Path, payload: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as stream:
+            line = stream.readline()
+    if not line:
+        raise DaemonError("Daemon closed the connection without a response")
+    return json.loads(line)
+
+
+def request(root: Path, payload: dict[str, Any], timeout: float | None = None) -> dict[str, Any]:
+    return _send(socket_path(root), payload, timeout)
+
+
+def delegate(root: Path, payload: dict[str, Any]) -> dict[str, Any] | None:
+    """Send ``payload`` to a daemon serving ``root``; ``None`` if none is listening."""
+    path = socket_path(root)
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    try:
+        _send(path, {"cmd": "ping"}, timeout=1.0)
+    except (OSError, DaemonError):
+        return None
+    return _send(path, payload)
+
+
+def _reload(modules: Iterable[str]) -> None:
+    for name in sorted(set(modules)):
+        if name in sys.modules:
+            importlib.reload(sys.modules[name])
+
+
+def _mr_modules(config: "Config", profile: str | None = None) -> set[str]:
+    from mtci.adapters import entrypoint_module
+
+    if profile is None:
+        profiles = list(config.profiles.values())
+    else:
+        profiles = [config.profiles[profile]] if profile in config.profiles else []
+    return {entrypoint_module(entry) for item in profiles for entry in item.mrs}
+
+
+def _model_modules(config: "Config") -> set[str]:
+    from mtci.adapters import entrypoint_module
+
+    entrypoint = getattr(config.model, "entrypoint", None) or getattr(config.model, "app", None)
+    return {entrypoint_module(entrypoint)} if entrypoint else set()
+
+
+class MTCIDaemon:
+    """Serves run requests for one project root over a Unix socket.
+
+    Requests are handled one at a time; configs, datasets, adapters and state
+    stay resident in a :class:`~mtci.cache.RunCache` between runs. MR modules
+    are reloaded before every run so module-level state does not leak from one
+    run into the next; ``reload`` also reloads model modules.
+    """
+
+    def __init__(self, root: Path, path: Path | None = None):
+        from mtci.cache import RunCache
+
+        self.root = root.resolve()
+        self.path = path or socket_path(self.root)
+        self.cache = RunCache()
+        self._stopped = False
+
+    def handle(self, payload: dict[str, Any]) -> dict[str, Any]:
+        cmd = payload.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "pid": os.getpid(), "root": str(self.root)}
+        if cmd == "shutdown":
+            self._stopped = True
+            return {"ok": True}
+        if cmd == "reload":
+            modules: set[str] = set()
+            for config in self.cache.configs():
+                modules |= _model_modules(config) | _mr_modules(config)
+            _reload(modules)
+            self.cache.invalidate()
+            return {"ok": True}
+        if cmd == "run":
+            from mtci.execution import run_profile
+
+            config = self.cache.config(payload["config"])
+            _reload(_mr_modules(config, payload["profile"]))
+            exit_code, out_dir = run_profile(
+                config,
+                payload["profile"],
+                payload["out"],
+                changed=payload.get("changed"),
+                cache=self.cache,
+            )
+            return {"ok": True, "exit_code": exit_code, "out_dir": str(out_dir)}
+        return {"ok": False, "error": f"Unknown command: {cmd}"}
+
+    def _serve_connection(self, conn: socket.socket) -> None:
+        with conn.makefile("rb") as stream:
+            line = stream.readline()
+        if not line:
+            return
+        try:
+            response = self.handle(json.loads(line))
+        except Exception as exc:
+            response = {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        conn.sendall(json.dumps(response).encode("utf-8") + b"\n")
+
+    def serve_forever(self) -> None:
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonError("mtci daemon requires Unix domain sockets")
+        os.chdir(self.root)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.bind(str(self.path))
+            sock.listen()
+            try:
+                while not self._stopped:
+                    conn, _ = sock.accept()
+                    with conn:
+                        self._serve_connection(conn)
+            finally:
+                self.path.unlink(missing_ok=True)
@@ -2,28 +2,55 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Iterator, List, Tuple
+
+if TYPE_CHECKING:
+    from mtci.config import DatasetConfig
 
 
 class DatasetError(Exception):
     pass
 
 
-def load_jsonl(path: str | Path, field: str) -> List[str]:
+def iter_jsonl(path: str | Path, field: str) -> Iterator[str]:
+    """Yield ``field`` from each non-blank line without reading the whole file."""
     path = Path(path)
     if not path.exists():
         raise DatasetError(f"Dataset not found: {path}")
-    values: List[str] = []
-    for idx, line in enumerate(path.read_text().splitlines()):
-        if not line.strip():
-            continue
-        try:
-            data = json.loads(line)
-        except json.JSONDecodeError as exc:
-            raise DatasetError(f"Invalid JSONL at line {idx + 1}: {exc}") from exc
-        if field not in data:
-            raise DatasetError(f"Missing field '{field}' at line {idx + 1}")
-        values.append(str(data[field]))
+    with path.open(encoding="utf-8") as handle:
+        for idx, line in enumerate(handle):
+            if not line.strip():
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise DatasetError(f"Invalid JSONL at line {idx + 1}: {exc}") from exc
+            if field not in data:
+                raise DatasetError(f"Missing field '{field}' at line {idx + 1}")
+            yield str(data[field])
+
+
+def load_jsonl(path: str | Path, field: str) -> List[str]:
+    values = list(iter_jsonl(path, field))
     if not values:
         raise DatasetError("Dataset is empty")
     return values
+
+
+def load_dataset_rows(config: DatasetConfig) -> Tuple[List[str], List[int] | None]:
+    """Load the dataset plus each value's row in the source file.
+
+    Rows are None when every row is kept, i.e. value ``i`` is row ``i``.
+    """
+    if not config.dedup.enabled:
+        return load_jsonl(config.path, config.jsonl_field), None
+    from mtci.dedup import load_deduplicated
+
+    values, index = load_deduplicated(config.path, config.jsonl_field, config.dedup)
+    if not values:
+        raise DatasetError("Dataset is empty")
+    return values, index.representatives
+
+
+def load_dataset(config: DatasetConfig) -> List[str]:
+    return load_dataset_rows(config)[0]
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from array import array
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterable
+
+from mtci.config import DedupConfig
+from mtci.data import DatasetError, iter_jsonl
+
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".dedup.json"
+
+
+@dataclass
+class DedupIndex:
+    """Cluster assignment for one dataset version.
+
+    ``assignment[row]`` is the row index of the cluster representative (the
+    first row seen in the cluster); ``representatives`` lists them in order.
+    """
+
+    rows: int
+    representatives: list[int]
+    assignment: list[int]
+    exact_duplicates: int
+    near_duplicates: int
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def minhash(text: str, num_perm: int, shingle_size: int) -> array:
+    """One-permutation MinHash over character shingles.
+
+    Each shingle is hashed once and kept as the minimum of one of ``num_perm``
+    bins, so cost is linear in the text length rather than in
+    ``len(text) * num_perm``. Empty bins borrow from the next filled bin
+    (rotation densification) so short texts still yield full signatures.
+    """
+    if len(text) <= shingle_size:
+        shingles = {text}
+    else:
+        shingles = {text[i : i + shingle_size] for i in range(len(text) - shingle_size + 1)}
+    bins: list[int | None] = [None] * num_perm
+    for shingle in shingles:
+        value = zlib.crc32(shingle.encode("utf-8"))
+        slot = value % num_perm
+        current = bins[slot]
+        if current is None or value < current:
+            bins[slot] = value
+    signature = array("I", [0] * num_perm)
+    for slot in range(num_perm):
+        step = 0
+        while bins[(slot + step) % num_perm] is None:
+            step += 1
+        signature[slot] = (bins[(slot + step) % num_perm] + step * 0x9E3779B1) & 0xFFFFFFFF
+    return signature
+
+
+def similarity(left: array, right: array) -> float:
+    return sum(a == b for a, b in zip(left, right)) / len(left)
+
+
+def deduplicate(texts: Iterable[str], config: DedupConfig) -> tuple[list[str], DedupIndex]:
+    """Cluster ``texts`` in one streaming pass and keep one text per cluster.
+
+    Exact duplicates (after case and whitespace normalization) are matched by
+    hash; near duplicates by MinHash banding (LSH) and confirmed when the
+    estimated Jaccard similarity reaches ``threshold``. Only representatives'
+    signatures are held in memory.
+    """
+    rows_per_band = config.num_perm // config.bands
+    exact: dict[bytes, int] = {}
+    signatures: dict[int, array] = {}
+    tables: list[dict[int, list[int]]] = [{} for _ in range(config.bands)]
+    kept: list[str] = []
+    representatives: list[int] = []
+    assignment: list[int] = []
+    exact_duplicates = near_duplicates = 0
+
+    for row, text in enumerate(texts):
+        normalized = _normalize(text)
+        key = hashlib.blake2b(normalized.encode("utf-8"), digest_size=8).digest()
+        if key in exact:
+            assignment.append(exact[key])
+            exact_duplicates += 1
+            continue
+        signature = minhash(normalized, config.num_perm, config.shingle_size)
+        bands = [
+            hash(signature[b * rows_per_band : (b + 1) * rows_per_band].tobytes())
+            for b in range(config.bands)
+        ]
+        match = None
+        checked: set[int] = set()
+        for table, band in zip(tables, bands):
+            for candidate in table.get(band, ()):
+                if candidate in checked:
+                    continue
+                checked.add(candidate)
+                if similarity(signature, signatures[candidate]) >= config.threshold:
+                    match = candidate
+                    break
+            if match is not None:
+                break
+        if match is not None:
+            exact[key] = match
+            assignment.append(match)
+            near_duplicates += 1
+            continue
+        exact[key] = row
+        signatures[row] = signature
+        for table, band in zip(tables, bands):
+            table.setdefault(band, []).append(row)
+        representatives.append(row)
+        assignment.append(row)
+        kept.append(text)
+
+    index = DedupIndex(
+        rows=len(assignment),
+        representatives=representatives,
+        assignment=assignment,
+        exact_duplicates=exact_duplicates,
+        near_duplicates=near_duplicates,
+    )
+    return kept, index
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_path(path: str | Path) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + CACHE_SUFFIX)
+
+
+def _cache_params(field: str, config: DedupConfig) -> dict:
+    return {
+        "version": CACHE_VERSION,
+        "field": field,
+        **config.model_dump(exclude={"enabled"}),
+    }
+
+
+def load_deduplicated(
+    path: str | Path, field: str, config: DedupConfig
+) -> tuple[list[str], DedupIndex]:
+    """Load one representative per cluster, reusing the cached assignment.
+
+    The assignment is cached next to the dataset as ``<name>.dedup.json`` and
+    reused while the file's content digest and the dedup settings match.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise DatasetError(f"Dataset not found: {path}")
+    digest = file_digest(path)
+    params = _cache_params(field, config)
+    target = cache_path(path)
+    if target.exists():
+        try:
+            cached = json.loads(target.read_text())
+        except (OSError, json.JSONDecodeError):
+            cached = {}
+        if cached.get("digest") == digest and cached.get("params") == params:
+            index = DedupIndex(**cached["index"])
+            keep = set(index.representatives)
+            values = [text for row, text in enumerate(iter_jsonl(path, field)) if row in keep]
+            return values, index
+
+    values, index = deduplicate(iter_jsonl(path, field), config)
+    payload = {"digest": digest, "params": params, "index": asdict(index)}
+    try:
+        target.write_text(json.dumps(payload))
+    except OSError:
+        # Read-only dataset locations just skip the cache.
+        pass
+    return values, index
@@ -1,18 +1,28 @@
 from __future__ import annotations
 
-import json
 import time
-from dataclasses import asdict, dataclass
+from contextlib import ExitStack, nullcontext
+from dataclasses import asdict, dataclass, field, replace
 from pathlib import Path
-from typing import Any, Iterable
-
-from mtci.adapters import BaseModelAdapter, HTTPEndpointModel, build_adapter
-from mtci.config import Config, Profile
-from mtci.data import load_jsonl
+from typing import TYPE_CHECKING, Any, Iterable
+
+from mtci.adapters import BaseModelAdapter, HTTPEndpointModel, build_adapter, unwrap
+from mtci.artifacts import BlobStore, compact_failures, write_failures
+from mtci.calibration import apply_performance, load_performance
+from mtci.changes import path_keys
+from mtci.config import Config, EndpointModelConfig, Profile
+from mtci.data import load_dataset_rows
+from mtci.flake import estimate_flakes
 from mtci.mrs.base import BaseMR, MRResult
-from mtci.reporting import write_junit, write_report
+from mtci.mrs.declarative import DeclarativeMR, fuse_predictions
+from mtci.mrs.transforms import TransformStore
+from mtci.prioritization import prioritize_examples
+from mtci.reporting import ReportStream
 from mtci.selection import SelectionMetadata, select_mrs
-from mtci.state import MRStats, StateStore
+from mtci.state import MEMORY_PROBE_AFTER, MRStats, StateStore, example_key
+
+if TYPE_CHECKING:
+    from mtci.cache import RunCache
 
 
 class MRLoadError(Exception):
@@ -27,6 +37,15 @@ class MRRunResult:
     runtime_s: float
     message: str
     failures: list[dict]
+    flaky_examples: list[int] = field(default_factory=list)
+    examples_retried: int = 0
+    flake_estimates: list[dict] = field(default_factory=list)
+    examples_evaluated: int = 0
+    failure_capture: dict | None = None
+    profile: dict | None = None
+    cut_short: bool = False
+    prioritized_examples: list[int] | None = None
+    memory: dict | None = None
 
 
 def load_mr(entrypoint: str) -> BaseMR:
@@ -50,145 +69,672 @@ def load_mr(entrypoint: str) -> BaseMR:
 def _filter_mrs(mrs: Iterable[BaseMR], model: BaseModelAdapter) -> list[BaseMR]:
     filtered = []
     for mr in mrs:
-        if mr.requires_endpoint and not isinstance(model, HTTPEndpointModel):
+        if mr.requires_endpoint and not isinstance(unwrap(model), HTTPEndpointModel):
             continue
         filtered.append(mr)
     return filtered
 
 
+def _new_run_dir(out_root: Path, name: str) -> Path:
+    """Create a fresh artifacts directory; runs started in the same second get a suffix."""
+    out_root.mkdir(parents=True, exist_ok=True)
+    candidate = out_root / name
+    suffix = 1
+    while True:
+        try:
+            candidate.mkdir()
+            return candidate
+        except FileExistsError:
+            suffix += 1
+            candidate = out_root / f"{name}-{suffix}"
+
+
 def _serialize_failures(failures: list) -> list[dict]:
     return [asdict(failure) for failure in failures]
 
 
-def run_profile(config: Config, profile_name: str, out_root: str | Path) -> tuple[int, Path]:
+def _run_subset(
+    mr: BaseMR,
+    model: BaseModelAdapter,
+    data: list[str],
+    indexes: list[int],
+    profile: Profile,
+) -> MRResult:
+    subset = [data[i] for i in indexes]
+    result = mr.run(model, subset, len(subset), profile.tolerance)
+    failures = [
+        replace(failure, index=indexes[failure.index])
+        for failure in result.failures
+        if 0 <= failure.index < len(indexes)
+    ]
+    return MRResult(result.name, result.passed, result.message, failures)
+
+
+def _memory_allowance(
+    entry: MRStats, budget_bytes: float | None, max_examples: int
+) -> int | None:
+    """Examples an MR may evaluate under the memory budget.
+
+    None without a budget or history and 0 when the MR must be skipped; after
+    ``MEMORY_PROBE_AFTER`` refusals it is probed with one example so a stale
+    estimate can recover.
+    """
+    if not budget_bytes:
+        return None
+    allowed = entry.memory_allowance(budget_bytes, max_examples)
+    if allowed == 0 and entry.memory_refusals >= MEMORY_PROBE_AFTER:
+        return 1
+    return allowed
+
+
+def _source_row(rows: list[int] | None, index: int) -> int:
+    """Map an index into the loaded dataset to its row in the source file."""
+    if rows is None or not 0 <= index < len(rows):
+        return index
+    return rows[index]
+
+
+def _failing_indexes(result: MRResult) -> list[int]:
+    return sorted({failure.index for failure in result.failures})
+
+
+def _record_outcomes(
+    stats: MRStats,
+    data: list[str],
+    rows: list[int] | None,
+    indexes: list[int],
+    result: MRResult,
+    retried: bool,
+) -> None:
+    failing = {index for index in _failing_indexes(result) if index >= 0}
+    if not result.passed and not failing:
+        # The MR failed without pointing at examples; nothing can be attributed.
+        return
+    if result.cut_short and failing:
+        # Examples after the last failure were never evaluated.
+        position = {index: pos for pos, index in enumerate(indexes)}
+        indexes = indexes[: max(position.get(i, -1) for i in failing) + 1]
+    for index in indexes:
+        failed = index in failing
+        stats.record_example(
+            example_key(data[index]),
+            1,
+            int(failed),
+            flaky=retried and not failed,
+            index=_source_row(rows, index),
+        )
+
+
+def run_profile(
+    config: Config,
+    profile_name: str,
+    out_root: str | Path,
+    changed: list[str] | None = None,
+    cache: RunCache | None = None,
+    only_mrs: set[str] | None = None,
+    profile_mrs: str | None = None,
+    cassette_path: str | Path | None = None,
+    cassette_mode: str = "replay",
+    persist: bool = True,
+) -> tuple[int, Path]:
+    # ``persist=False`` keeps MR stats in memory only and skips run history,
+    # for partial runs (e.g. watch cycles) that must not skew selection.
     if profile_name not in config.profiles:
         raise ValueError(f"Profile not found: {profile_name}")
     profile: Profile = config.profiles[profile_name]
-    data = load_jsonl(config.dataset.path, config.dataset.jsonl_field)
-    model = build_adapter(config.model)
-
-    mr_instances = [load_mr(entry) for entry in profile.mrs]
-    mr_instances = _filter_mrs(mr_instances, model)
-
-    store = StateStore(Path.cwd())
-    stats = store.load()
+    if cache is not None:
+        data, rows = cache.dataset_rows(config.dataset)
+        model = cache.adapter(config.model)
+    else:
+        data, rows = load_dataset_rows(config.dataset)
+        model = build_adapter(config.model)
 
-    selection = select_mrs(
-        [mr.name for mr in mr_instances],
-        stats,
-        profile.budget_seconds,
-    )
+    with ExitStack() as cleanup:
+        if cache is None:
+            cleanup.callback(model.close)
 
-    mr_by_name = {mr.name: mr for mr in mr_instances}
-    selected_mrs = [mr_by_name[item.name] for item in selection if item.name in mr_by_name]
+        mr_instances = [load_mr(entry) for entry in profile.mrs]
+        mr_instances = _filter_mrs(mr_instances, model)
+        if only_mrs is not None:
+            mr_instances = [mr for mr in mr_instances if mr.name in only_mrs]
 
-    timestamp = time.strftime("%Y%m%d-%H%M%S")
-    out_dir = Path(out_root) / f"{profile_name}-{timestamp}"
-    out_dir.mkdir(parents=True, exist_ok=True)
+        if cache is not None:
+            store, stats = cache.state(Path.cwd())
+        else:
+            store = StateStore(Path.cwd())
+            stats = store.load()
+
+        change_keys: list[str] = []
+        impact = None
+        if changed is not None:
+            change_keys = [key for path in changed for key in path_keys(path)]
+            impact = {
+                mr.name: (stats.get(mr.name) or MRStats()).impact(change_keys)
+                for mr in mr_instances
+            }
 
-    results: list[MRRunResult] = []
-    total_retries = 0
-    flaky_count = 0
+        performance = load_performance(Path.cwd(), config.model)
+        default_runtime = 1.0
+        fused_batch_size = profile.fused_batch_size
+        if performance is not None:
+            # Most MRs score every example plus one transformed copy.
+            default_runtime = performance.predict_runtime(2 * profile.max_examples)
+            # Cassettes key requests by body, so they keep the configured batch sizes.
+            if cassette_path is None:
+                apply_performance(model, config.model, performance)
+                if "fused_batch_size" not in profile.model_fields_set:
+                    fused_batch_size = performance.best_batch_size
+
+        selection = select_mrs(
+            [mr.name for mr in mr_instances],
+            stats,
+            profile.budget_seconds,
+            default_runtime=default_runtime,
+            impact=impact,
+            unimpacted_budget_fraction=profile.unimpacted_budget_fraction,
+        )
 
-    start_time = time.perf_counter()
+        mr_by_name = {mr.name: mr for mr in mr_instances}
+        selected_mrs = [mr_by_name[item.name] for item in selection if item.name in mr_by_name]
+
+        started_at = time.time()
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        out_dir = _new_run_dir(Path(out_root), f"{profile_name}-{timestamp}")
+
+        profiler = None
+        if profile_mrs:
+            from mtci.profiling import MRProfiler
+
+            profiler = MRProfiler(profile_mrs, out_dir)
+            cleanup.callback(profiler.close)
+
+        metrics = None
+        if config.metrics.enabled:
+            from mtci.metrics import MetricsExporter, RunMetrics
+
+            metrics = RunMetrics(profile_name, profile.budget_seconds)
+            metrics.mr_pending([mr.name for mr in selected_mrs])
+            cleanup.callback(metrics.instrument(model))
+            exporter = MetricsExporter(
+                metrics,
+                out_dir / config.metrics.file if config.metrics.file else None,
+                interval_s=config.metrics.interval_s,
+                port=config.metrics.port,
+                host=config.metrics.host,
+            )
+            exporter.start()
+            cleanup.callback(exporter.stop)
+
+        cassette = None
+        if cassette_path is not None:
+            from mtci.cassette import attach_cassette
+
+            batch_size = None
+            if isinstance(config.model, EndpointModelConfig):
+                batch_size = config.model.batching.initial_size
+            cassette, restore_transport = attach_cassette(
+                model, cassette_path, cassette_mode, batch_size=batch_size
+            )
+            # Keep what was recorded even if the run fails part-way.
+            cleanup.callback(restore_transport)
+            cleanup.callback(cassette.save)
+
+        tracker = None
+        memory_budget = None
+        refused_by_memory: list[str] = []
+        downsized_by_memory: dict[str, int] = {}
+        if profile.memory.enabled:
+            from mtci.memory import MemoryTracker
+
+            tracker = MemoryTracker()
+            tracker.start()
+            cleanup.callback(tracker.stop)
+            cleanup.callback(tracker.instrument(model))
+            if profile.memory.budget_mb is not None:
+                memory_budget = profile.memory.budget_mb * 1024 * 1024
+
+        endpoint = unwrap(model)
+        hedge_before = None
+        if isinstance(endpoint, HTTPEndpointModel) and endpoint.hedge.enabled:
+            hedge_before = endpoint.hedge.stats()
+
+        start_time = time.perf_counter()
+
+        transform_store = TransformStore(Path.cwd())
+        for mr in selected_mrs:
+            mr.transform_store = transform_store
+            mr.max_failures = profile.max_failures
+
+        # Declarative MRs share one deduplicated, batched set of first-attempt
+        # predictions; retries and flake sampling always query the model again.
+        # Fusion waits for the first declarative MR that actually runs and its
+        # cost is split across the MRs it was planned for.
+        fused_plan = None
+        fused_share: dict[str, float] = {}
+
+        capture = profile.failure_capture
+        blobs = BlobStore(out_dir / "blobs", capture.compress) if capture.store_blobs else None
+        stream = ReportStream(out_dir, profile.junit_flaky_as_failure)
+        cleanup.callback(stream.abort)
+        stream.start(
+            {
+                "profile": profile_name,
+                "budget_seconds": profile.budget_seconds,
+                "max_examples": profile.max_examples,
+                "memory_budget_mb": profile.memory.budget_mb,
+                "changed_paths": changed,
+                "performance": {
+                    "best_batch_size": performance.best_batch_size,
+                    "best_concurrency": performance.best_concurrency,
+                    "default_runtime_s": default_runtime,
+                }
+                if performance is not None
+                else None,
+                "selected_mrs": [
+                    {
+                        "name": item.name,
+                        "score": item.score,
+                        "predicted_runtime_s": item.predicted_runtime_s,
+                        "reason": item.reason,
+                        "impact": item.impact,
+                    }
+                    for item in selection
+                ],
+            }
+        )
 
-    for mr in selected_mrs:
-        elapsed = time.perf_counter() - start_time
-        if elapsed >= profile.budget_seconds:
-            results.append(
-                MRRunResult(
-                    name=mr.name,
-                    status="skipped",
-                    attempts=0,
-                    runtime_s=0.0,
-                    message="budget exceeded",
-                    failures=[],
+        # Results are streamed to disk as they finish; only slim copies without
+        # failure payloads stay in memory.
+        results: list[MRRunResult] = []
+        total_retries = 0
+        flaky_count = 0
+
+        def record(result: MRRunResult) -> None:
+            stream.result(asdict(result))
+            results.append(replace(result, failures=[], flake_estimates=[]))
+            if metrics is not None:
+                metrics.mr_finished(
+                    result.name, result.status, result.runtime_s, result.examples_evaluated
                 )
-            )
-            continue
 
-        attempts = 0
-        failures: list[dict] = []
-        status = "fail"
-        message = ""
-        runtime_s = 0.0
-
-        for attempt in range(profile.retries_on_fail + 1):
-            attempts += 1
-            attempt_start = time.perf_counter()
-            result: MRResult = mr.run(model, data, profile.max_examples, profile.tolerance)
-            runtime_s = time.perf_counter() - attempt_start
-            if result.passed:
-                status = "pass" if attempt == 0 else "flaky"
+        def example_order(mr: BaseMR, entry: MRStats, max_examples: int) -> list[int]:
+            if mr.per_example and profile.example_selection.strategy == "prioritized":
+                return prioritize_examples(
+                    data, entry, max_examples, profile.example_selection, rows
+                )
+            return list(range(min(len(data), max_examples)))
+
+        decided_by: str | None = None
+
+        for position, mr in enumerate(selected_mrs):
+            if profile.fail_fast and decided_by is not None:
+                record(
+                    MRRunResult(
+                        name=mr.name,
+                        status="skipped",
+                        attempts=0,
+                        runtime_s=0.0,
+                        message=f"fail-fast: verdict decided by {decided_by}",
+                        failures=[],
+                        cut_short=True,
+                    )
+                )
+                continue
+
+            elapsed = time.perf_counter() - start_time
+            if elapsed >= profile.budget_seconds:
+                record(
+                    MRRunResult(
+                        name=mr.name,
+                        status="skipped",
+                        attempts=0,
+                        runtime_s=0.0,
+                        message="budget exceeded",
+                        failures=[],
+                    )
+                )
+                continue
+
+            stats_entry = stats.get(mr.name) or MRStats()
+            max_examples = profile.max_examples
+            allowed = _memory_allowance(stats_entry, memory_budget, max_examples)
+            if allowed == 0:
+                stats_entry.memory_refusals += 1
+                stats[mr.name] = stats_entry
+                refused_by_memory.append(mr.name)
+                predicted = stats_entry.predicted_memory(1) or 0.0
+                record(
+                    MRRunResult(
+                        name=mr.name,
+                        status="skipped",
+                        attempts=0,
+                        runtime_s=0.0,
+                        message=(
+                            f"memory budget: predicted {predicted / 2**20:.1f} MB for one "
+                            f"example exceeds {profile.memory.budget_mb} MB"
+                        ),
+                        failures=[],
+                    )
+                )
+                continue
+            if allowed is not None:
+                stats_entry.memory_refusals = 0
+                if allowed < max_examples:
+                    max_examples = allowed
+                    downsized_by_memory[mr.name] = allowed
+
+            prioritized = mr.per_example and profile.example_selection.strategy == "prioritized"
+            order = example_order(mr, stats_entry, max_examples)
+
+            if metrics is not None:
+                metrics.mr_started(mr.name)
+            if profiler is not None:
+                profiler.start(mr.name)
+            if tracker is not None:
+                tracker.mr_start()
+
+            if isinstance(mr, DeclarativeMR) and fused_plan is None:
+                # Plan each MR on the examples it will evaluate, not the first
+                # rows, and leave out MRs the memory budget will refuse.
+                planned = [(mr, [data[i] for i in order])]
+                limits = [allowed] if allowed is not None else []
+                for other in selected_mrs[position + 1 :]:
+                    if not isinstance(other, DeclarativeMR):
+                        continue
+                    other_stats = stats.get(other.name) or MRStats()
+                    other_allowed = _memory_allowance(
+                        other_stats, memory_budget, profile.max_examples
+                    )
+                    if other_allowed == 0:
+                        continue
+                    if other_allowed is not None:
+                        limits.append(other_allowed)
+                    other_order = example_order(
+                        other,
+                        other_stats,
+                        profile.max_examples if other_allowed is None else other_allowed,
+                    )
+                    planned.append((other, [data[i] for i in other_order]))
+                # A fused call sends no more inputs (source and transformed per
+                # example) than the most memory-constrained MR would on its own.
+                batch_size = min([fused_batch_size, *(2 * limit for limit in limits)])
+                shared, fused_plan = fuse_predictions(model, planned, batch_size)
+                for other, _ in planned:
+                    other.shared_predictions = shared
+                    fused_share[other.name] = fused_plan.runtime_s / len(planned)
+
+            attempts = 0
+            failures: list[dict] = []
+            status = "fail"
+            message = ""
+            runtime_s = 0.0
+            first_failing: list[int] = []
+            pending: list[int] = []
+            examples_retried = 0
+            examples_evaluated = 0
+            flake_estimates: list[dict] = []
+            use_flake_engine = profile.flake.samples > 0 and mr.per_example
+            cut_short = False
+
+            for attempt in range(profile.retries_on_fail + 1):
+                attempts += 1
+                attempt_start = time.perf_counter()
+                fresh = attempt > 0 or not mr.cacheable_predictions
+                with (
+                    model.uncached() if fresh else nullcontext(),
+                    nullcontext() if mr.hedgeable else model.unhedged(),
+                ):
+                    if pending:
+                        examples_retried += len(pending)
+                        examples_evaluated += len(pending)
+                        with mr.uncapped():
+                            result = _run_subset(mr, model, data, pending, profile)
+                    elif prioritized:
+                        examples_evaluated += len(order)
+                        result = _run_subset(mr, model, data, order, profile)
+                    else:
+                        examples_evaluated += len(order)
+                        result = mr.run(model, data, max_examples, profile.tolerance)
+                runtime_s = time.perf_counter() - attempt_start
+                if prioritized:
+                    _record_outcomes(
+                        stats_entry, data, rows, pending or order, result, retried=bool(pending)
+                    )
+                if isinstance(mr, DeclarativeMR):
+                    mr.shared_predictions = None
+                cut_short = cut_short or result.cut_short
+                if result.passed:
+                    status = "pass" if attempt == 0 else "flaky"
+                    message = result.message
+                    failures = _serialize_failures(result.failures)
+                    break
                 message = result.message
                 failures = _serialize_failures(result.failures)
-                break
-            message = result.message
-            failures = _serialize_failures(result.failures)
-            if attempt < profile.retries_on_fail:
-                total_retries += 1
-        else:
-            status = "fail"
-
-        if status == "flaky":
-            flaky_count += 1
-
-        results.append(
-            MRRunResult(
-                name=mr.name,
-                status=status,
-                attempts=attempts,
-                runtime_s=runtime_s,
-                message=message,
-                failures=failures,
+                if mr.per_example:
+                    pending = _failing_indexes(result)
+                    if attempt == 0:
+                        first_failing = list(pending)
+                if use_flake_engine and pending:
+                    break
+                if attempt < profile.retries_on_fail:
+                    total_retries += 1
+            else:
+                status = "fail"
+
+            if use_flake_engine and status == "fail" and pending:
+                quarantined = set()
+                if profile.flake.quarantine_known_flaky:
+                    quarantined = {
+                        i for i in pending if stats_entry.known_flaky(example_key(data[i]))
+                    }
+                engine_start = time.perf_counter()
+                with model.uncached(), nullcontext() if mr.hedgeable else model.unhedged():
+                    estimates, batches = estimate_flakes(
+                        mr,
+                        model,
+                        data,
+                        pending,
+                        profile.tolerance,
+                        profile.flake,
+                        deadline=start_time + profile.budget_seconds,
+                        quarantined=quarantined,
+                    )
+                runtime_s += time.perf_counter() - engine_start
+                attempts += batches
+                total_retries += batches
+                hard = set()
+                for estimate in estimates:
+                    if estimate.status == "fail":
+                        hard.add(estimate.index)
+                    if estimate.status != "quarantined":
+                        examples_evaluated += estimate.samples - 1
+                        # Prioritized runs already recorded the first attempt.
+                        recorded = 1 if prioritized else 0
+                        stats_entry.record_example(
+                            example_key(data[estimate.index]),
+                            estimate.samples - recorded,
+                            estimate.failures - recorded,
+                            flaky=estimate.status == "flaky",
+                            index=_source_row(rows, estimate.index),
+                        )
+                    flake_estimates.append(
+                        {**asdict(estimate), "failure_rate": estimate.failure_rate}
+                    )
+                failures = [failure for failure in failures if failure["index"] in hard]
+                status = "fail" if hard else "flaky"
+                message = f"{len(hard)} failing, {len(estimates) - len(hard)} flaky examples"
+
+            runtime_s += fused_share.pop(mr.name, 0.0)
+            mr_profile = profiler.stop(mr.name) if profiler is not None else None
+            mr_memory = None
+            if tracker is not None:
+                mr_memory = tracker.mr_stop()
+                if max_examples < profile.max_examples:
+                    mr_memory["max_examples"] = max_examples
+                if order:
+                    stats_entry.record_memory(mr_memory["peak_bytes"], len(order))
+
+            still_failing = {failure["index"] for failure in failures}
+            flaky_examples = [i for i in first_failing if i not in still_failing]
+            if rows is not None:
+                # Report rows of the source file, which stay put when dedup
+                # drops rows elsewhere.
+                failures = [{**f, "index": _source_row(rows, f["index"])} for f in failures]
+                flaky_examples = [_source_row(rows, i) for i in flaky_examples]
+                flake_estimates = [
+                    {**e, "index": _source_row(rows, e["index"])} for e in flake_estimates
+                ]
+
+            if status == "flaky":
+                flaky_count += 1
+            if decided_by is None and (
+                status == "fail" or (status == "flaky" and profile.fail_on_flake)
+            ):
+                decided_by = mr.name
+
+            failure_capture = None
+            if failures:
+                failures, failure_capture = compact_failures(failures, capture, blobs)
+
+            record(
+                MRRunResult(
+                    name=mr.name,
+                    status=status,
+                    attempts=attempts,
+                    runtime_s=runtime_s,
+                    message=message,
+                    failures=failures,
+                    flaky_examples=flaky_examples,
+                    examples_retried=examples_retried,
+                    flake_estimates=flake_estimates,
+                    examples_evaluated=examples_evaluated,
+                    failure_capture=failure_capture,
+                    profile=mr_profile,
+                    cut_short=cut_short,
+                    prioritized_examples=[_source_row(rows, i) for i in order]
+                    if prioritized
+                    else None,
+                    memory=mr_memory,
+                )
             )
-        )
 
-        stats_entry = stats.get(mr.name) or MRStats()
-        stats_entry.runs += 1
-        if status == "fail":
-            stats_entry.fails += 1
-        if status == "flaky":
-            stats_entry.flaky_count += 1
-        stats_entry.update_runtime(runtime_s)
-        stats[mr.name] = stats_entry
-
-        failure_dir = out_dir / "failures" / mr.name
-        if status in {"fail", "flaky"}:
-            failure_dir.mkdir(parents=True, exist_ok=True)
-            (failure_dir / "message.txt").write_text(message)
-            (failure_dir / "failures.json").write_text(json.dumps(failures, indent=2))
-
-    store.save()
-
-    report = {
-        "profile": profile_name,
-        "budget_seconds": profile.budget_seconds,
-        "max_examples": profile.max_examples,
-        "selected_mrs": [
+            stats_entry.runs += 1
+            if status == "fail":
+                stats_entry.fails += 1
+            if status == "flaky":
+                stats_entry.flaky_count += 1
+            stats_entry.update_runtime(runtime_s)
+            if changed is not None:
+                stats_entry.record_paths(change_keys, status in {"fail", "flaky"})
+            stats[mr.name] = stats_entry
+
+            if status in {"fail", "flaky"}:
+                write_failures(out_dir / "failures" / mr.name, message, failures, capture.compress)
+
+        if persist:
+            store.save()
+            if cache is not None:
+                cache.state_saved(store)
+        transform_store.flush()
+
+        stream.finish(
             {
-                "name": item.name,
-                "score": item.score,
-                "predicted_runtime_s": item.predicted_runtime_s,
-                "reason": item.reason,
+                "fused_plan": asdict(fused_plan) if fused_plan is not None else None,
+                "fail_fast": {
+                    "enabled": profile.fail_fast,
+                    "decided_by": decided_by,
+                    "cut_short": [r.name for r in results if r.cut_short],
+                },
+                "memory": {
+                    "budget_mb": profile.memory.budget_mb,
+                    "refused": refused_by_memory,
+                    "downsized": downsized_by_memory,
+                }
+                if tracker is not None
+                else None,
+                "cassette": {"mode": cassette_mode, "path": str(cassette.path), **cassette.stats()}
+                if cassette is not None
+                else None,
+                "hedging": {
+                    key: value - hedge_before[key] for key, value in endpoint.hedge.stats().items()
+                }
+                if hedge_before is not None
+                else None,
+                "flake_summary": {
+                    "total_retries": total_retries,
+                    "flaky_count": flaky_count,
+                    "fail_on_flake": profile.fail_on_flake,
+                },
             }
-            for item in selection
-        ],
-        "results": [asdict(result) for result in results],
-        "flake_summary": {
-            "total_retries": total_retries,
-            "flaky_count": flaky_count,
-            "fail_on_flake": profile.fail_on_flake,
-        },
-    }
-
-    write_report(out_dir, report)
-    write_junit(out_dir, [asdict(result) for result in results], profile.junit_flaky_as_failure)
+        )
 
-    exit_code = 0
-    if any(r.status == "fail" for r in results):
-        exit_code = 1
-    elif profile.fail_on_flake and any(r.status == "flaky" for r in results):
-        exit_code = 1
+        exit_code = 0
+        if any(r.status == "fail" for r in results):
+            exit_code = 1
+        elif profile.fail_on_flake and any(r.status == "flaky" for r in results):
+            exit_code = 1
+
+        if persist and config.history.enabled:
+            from mtci.history import HistoryStore, MRRecord, model_fingerprint
+
+            HistoryStore(Path.cwd(), max_runs=config.history.max_runs).record_run(
+                run_key=out_dir.name,
+                profile=profile_name,
+                fingerprint=model_fingerprint(config.model),
+                exit_code=exit_code,
+                records=[
+                    MRRecord(r.name, r.status, r.runtime_s, r.attempts, r.examples_evaluated)
+                    for r in results
+                ],
+                changed_paths=changed,
+                started_at=started_at,
+            )
 
-    return exit_code, out_dir
+        return exit_code, out_dir
+
+
+def run_profiles(
+    config: Config,
+    profile_names: list[str],
+    out_root: str | Path,
+    changed: list[str] | None = None,
+    cache: RunCache | None = None,
+    cassette_path: str | Path | None = None,
+    cassette_mode: str = "replay",
+) -> tuple[int, list[Path]]:
+    """Run several profiles in one pass, sharing data, adapter and predictions.
+
+    Profiles run largest ``max_examples`` first so smaller profiles are served
+    from memoized predictions rather than from one joint plan over all
+    profiles; that way fused cost stays charged to the MRs of the profile
+    that paid it. Each keeps its own budget, report and JUnit; retries and
+    duplicate-sensitive MRs still query the model.
+    """
+    from mtci.cache import RunCache
+
+    missing = [name for name in profile_names if name not in config.profiles]
+    if missing:
+        raise ValueError(f"Profile not found: {', '.join(missing)}")
+    owns_cache = cache is None
+    if cache is None:
+        cache = RunCache(memoize_predictions=True, memoize_endpoints=True)
+    ordered = sorted(profile_names, key=lambda name: -config.profiles[name].max_examples)
+    exit_code = 0
+    out_dirs: dict[str, Path] = {}
+    try:
+        for name in ordered:
+            code, out_dir = run_profile(
+                config,
+                name,
+                out_root,
+                changed=changed,
+                cache=cache,
+                cassette_path=cassette_path,
+                cassette_mode=cassette_mode,
+            )
+            exit_code = max(exit_code, code)
+            out_dirs[name] = out_dir
+    finally:
+        if owns_cache:
+            cache.drop_adapters()
+    return exit_code, [out_dirs[name] for name in profile_names]
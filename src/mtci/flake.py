@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Sequence
+
+from mtci.config import FlakeConfig, Tolerance
+from mtci.mrs.base import BaseMR
+
+
+@dataclass
+class FlakeEstimate:
+    index: int
+    samples: int
+    failures: int
+    status: str
+    ci_low: float
+    ci_high: float
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.samples if self.samples else 0.0
+
+
+def wilson_interval(failures: int, samples: int, confidence: float) -> tuple[float, float]:
+    if samples == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(1 - (1 - confidence) / 2)
+    p = failures / samples
+    denom = 1 + z * z / samples
+    centre = (p + z * z / (2 * samples)) / denom
+    margin = z * math.sqrt(p * (1 - p) / samples + z * z / (4 * samples * samples)) / denom
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+def required_samples(min_pass_rate: float, confidence: float) -> int:
+    """Consecutive failures needed to rule out a pass rate >= min_pass_rate."""
+    if min_pass_rate >= 1.0:
+        return 1
+    return max(1, math.ceil(math.log(1 - confidence) / math.log(1 - min_pass_rate)))
+
+
+def _sample_batch(
+    mr: BaseMR,
+    model,
+    data: Sequence[str],
+    positions: list[int],
+    tolerance: Tolerance,
+) -> list[bool]:
+    subset = [data[i] for i in positions]
+    with mr.sampled():
+        result = mr.run(model, subset, len(subset), tolerance)
+    failed = {failure.index for failure in result.failures}
+    return [pos in failed for pos in range(len(positions))]
+
+
+def estimate_flakes(
+    mr: BaseMR,
+    model,
+    data: Sequence[str],
+    indexes: Sequence[int],
+    tolerance: Tolerance,
+    config: FlakeConfig,
+    deadline: float,
+    quarantined: set[int] | None = None,
+) -> tuple[list[FlakeEstimate], int]:
+    """Repeat failing examples to estimate their failure rates.
+
+    Every index is assumed to have failed once already. Each example is sampled
+    until it has enough evaluations to rule out a pass rate of
+    ``config.min_rate`` (capped at ``config.samples``) or until ``deadline``.
+    Flaky examples keep being sampled after their first pass so their rate and
+    interval are not biased towards failure. An example is flaky if any
+    evaluation passed and a hard failure otherwise.
+    Returns the estimates and the number of batches run.
+    """
+    quarantined = quarantined or set()
+    needed = min(config.samples, required_samples(config.min_rate, config.confidence))
+    counts = {i: [1, 1] for i in indexes if i not in quarantined}
+    batches = 0
+
+    def undecided() -> list[int]:
+        return [i for i, (n, _) in counts.items() if n < needed]
+
+    pending = undecided()
+    while pending and time.perf_counter() < deadline:
+        positions: list[int] = []
+        for i in pending:
+            n = counts[i][0]
+            positions.extend([i] * min(config.batch_size, needed - n))
+        outcomes = _sample_batch(mr, model, data, positions, tolerance)
+        batches += 1
+        for i, failed in zip(positions, outcomes):
+            counts[i][0] += 1
+            counts[i][1] += int(failed)
+        pending = undecided()
+
+    estimates: list[FlakeEstimate] = []
+    for i in indexes:
+        if i in quarantined:
+            estimates.append(FlakeEstimate(i, 1, 1, "quarantined", 0.0, 1.0))
+            continue
+        n, f = counts[i]
+        low, high = wilson_interval(f, n, config.confidence)
+        estimates.append(FlakeEstimate(i, n, f, "flaky" if f < n else "fail", low, high))
+    return estimates, batches
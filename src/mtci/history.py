@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List
+
+from mtci.config import EndpointModelConfig, LocalModelConfig
+from mtci.state import STATE_DIR
+
+HISTORY_FILE = "history.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_key TEXT NOT NULL,
+    profile TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    model_fingerprint TEXT NOT NULL,
+    exit_code INTEGER NOT NULL,
+    changed_paths TEXT
+);
+CREATE TABLE IF NOT EXISTS mr_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    mr TEXT NOT NULL,
+    status TEXT NOT NULL,
+    runtime_s REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    examples INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_mr_results_mr ON mr_results (mr, run_id);
+CREATE INDEX IF NOT EXISTS idx_runs_profile ON runs (profile, id);
+"""
+
+
+@dataclass
+class MRRecord:
+    mr: str
+    status: str
+    runtime_s: float
+    attempts: int
+    examples: int
+
+
+@dataclass
+class MRSummary:
+    mr: str
+    runs: int
+    fails: int
+    flaky: int
+    skipped: int
+    mean_runtime_s: float
+    max_runtime_s: float
+    recent_mean_runtime_s: float
+
+
+@dataclass
+class RunRecord:
+    run_key: str
+    profile: str
+    started_at: float
+    model_fingerprint: str
+    mr: str
+    status: str
+    runtime_s: float
+    attempts: int
+    examples: int
+
+
+def model_fingerprint(config: LocalModelConfig | EndpointModelConfig) -> str:
+    raw = json.dumps(config.model_dump(mode="json"), sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:12]
+
+
+class HistoryStore:
+    """Per-run, per-MR records kept in SQLite next to ``state.json``.
+
+    The database is only opened when a run is recorded or queried, so it adds
+    nothing to ``run_profile`` startup.
+    """
+
+    def __init__(self, root: Path, max_runs: int = 500):
+        self.path = root / STATE_DIR / HISTORY_FILE
+        self.max_runs = max_runs
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def record_run(
+        self,
+        run_key: str,
+        profile: str,
+        fingerprint: str,
+        exit_code: int,
+        records: Iterable[MRRecord],
+        changed_paths: List[str] | None = None,
+        started_at: float | None = None,
+    ) -> None:
+        conn = self._connect()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    "INSERT INTO runs (run_key, profile, started_at, model_fingerprint,"
+                    " exit_code, changed_paths) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        run_key,
+                        profile,
+                        started_at if started_at is not None else time.time(),
+                        fingerprint,
+                        exit_code,
+                        json.dumps(changed_paths) if changed_paths is not None else None,
+                    ),
+                )
+                run_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO mr_results VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (run_id, r.mr, r.status, r.runtime_s, r.attempts, r.examples)
+                        for r in records
+                    ],
+                )
+            self._compact(conn)
+        finally:
+            conn.close()
+
+    def _compact(self, conn: sqlite3.Connection) -> int:
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM runs WHERE id <= ("
+                " SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?)",
+                (self.max_runs,),
+            )
+        return cursor.rowcount
+
+    def compact(self) -> int:
+        conn = self._connect()
+        try:
+            removed = self._compact(conn)
+            conn.execute("VACUUM")
+            return removed
+        finally:
+            conn.close()
+
+    def summary(self, profile: str | None = None, recent: int = 10) -> List[MRSummary]:
+        if not self.path.exists():
+            return []
+        where = "WHERE r.profile = ?" if profile else ""
+        params: tuple = (profile,) if profile else ()
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f"""
+                SELECT m.mr,
+                       COUNT(*),
+                       SUM(m.status = 'fail'),
+                       SUM(m.status = 'flaky'),
+                       SUM(m.status = 'skipped'),
+                       AVG(CASE WHEN m.status != 'skipped' THEN m.runtime_s END),
+                       MAX(m.runtime_s)
+                FROM mr_results m JOIN runs r ON r.id = m.run_id
+                {where}
+                GROUP BY m.mr
+                ORDER BY m.mr
+                """,
+                params,
+            ).fetchall()
+            summaries = []
+            for mr, runs, fails, flaky, skipped, mean_rt, max_rt in rows:
+                recent_mean = conn.execute(
+                    f"""
+                    SELECT AVG(runtime_s) FROM (
+                        SELECT m.runtime_s FROM mr_results m JOIN runs r ON r.id = m.run_id
+                        WHERE m.mr = ? AND m.status != 'skipped'
+                        {"AND r.profile = ?" if profile else ""}
+                        ORDER BY m.run_id DESC LIMIT ?
+                    )
+                    """,
+                    (mr, *params, recent),
+                ).fetchone()[0]
+                summaries.append(
+                    MRSummary(
+                        mr=mr,
+                        runs=runs,
+                        fails=fails or 0,
+                        flaky=flaky or 0,
+                        skipped=skipped or 0,
+                        mean_runtime_s=mean_rt or 0.0,
+                        max_runtime_s=max_rt or 0.0,
+                        recent_mean_runtime_s=recent_mean or 0.0,
+                    )
+                )
+            return summaries
+        finally:
+            conn.close()
+
+    def runs_for(self, mr: str, limit: int = 20) -> List[RunRecord]:
+        if not self.path.exists():
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                """
+                SELECT r.run_key, r.profile, r.started_at, r.model_fingerprint,
+                       m.mr, m.status, m.runtime_s, m.attempts, m.examples
+                FROM mr_results m JOIN runs r ON r.id = m.run_id
+                WHERE m.mr = ?
+                ORDER BY m.run_id DESC LIMIT ?
+                """,
+                (mr, limit),
+            ).fetchall()
+            return [RunRecord(*row) for row in rows]
+        finally:
+            conn.close()
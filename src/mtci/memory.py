@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import os
+import threading
+import tracemalloc
+from functools import wraps
+from typing import Any, Callable, Dict
+
+from mtci.adapters import instrument_adapter
+
+
+def rss_bytes() -> int | None:
+    """Current resident set size, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as handle:
+            resident = int(handle.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return resident * os.sysconf("SC_PAGE_SIZE")
+
+
+def _delta(after: int | None, before: int | None) -> int | None:
+    if after is None or before is None:
+        return None
+    return after - before
+
+
+class MemoryTracker:
+    """Per-MR tracemalloc peak and RSS delta, split out for adapter calls.
+
+    tracemalloc has a single global peak, so adapter calls fold the peak seen
+    so far into ``_carry`` before resetting it; the MR peak is the maximum of
+    both relative to the traced size when the MR started.
+    """
+
+    def __init__(self) -> None:
+        self._started_tracing = False
+        self._depth = threading.local()
+        self._baseline = 0
+        self._carry = 0
+        self._rss_start: int | None = None
+        self.adapter_peak = 0
+        self.adapter_rss: int | None = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self) -> None:
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def mr_start(self) -> None:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        self._baseline = current
+        self._carry = current
+        self._rss_start = rss_bytes()
+        self.adapter_peak = 0
+        self.adapter_rss = None
+
+    def mr_stop(self) -> Dict[str, int | None]:
+        _, peak = tracemalloc.get_traced_memory()
+        return {
+            "peak_bytes": max(self._carry, peak) - self._baseline,
+            "rss_delta_bytes": _delta(rss_bytes(), self._rss_start),
+            "adapter_peak_bytes": self.adapter_peak,
+            "adapter_rss_delta_bytes": self.adapter_rss,
+        }
+
+    def _wrap(self, method: Callable) -> Callable:
+        @wraps(method)
+        def call(*args, **kwargs):
+            if getattr(self._depth, "value", 0) or not tracemalloc.is_tracing():
+                return method(*args, **kwargs)
+            self._depth.value = 1
+            current, peak = tracemalloc.get_traced_memory()
+            self._carry = max(self._carry, peak)
+            tracemalloc.reset_peak()
+            rss_before = rss_bytes()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._depth.value = 0
+                _, peak = tracemalloc.get_traced_memory()
+                self._carry = max(self._carry, peak)
+                self.adapter_peak = max(self.adapter_peak, peak - current)
+                rss = _delta(rss_bytes(), rss_before)
+                if rss is not None:
+                    self.adapter_rss = max(self.adapter_rss or 0, rss)
+
+        return call
+
+    def instrument(self, adapter: Any) -> Callable[[], None]:
+        """Track the adapter's prediction calls; returns an undo callable."""
+        return instrument_adapter(adapter, self._wrap)
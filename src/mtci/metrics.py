@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import deque
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+from mtci.adapters import instrument_adapter
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(q * (len(sorted_values) - 1))))
+    return sorted_values[rank]
+
+
+class RunMetrics:
+    """Thread-safe live counters for one run, exported as JSON or Prometheus text."""
+
+    def __init__(self, profile: str, budget_seconds: float, window: int = 1000):
+        self.profile = profile
+        self.budget_seconds = budget_seconds
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._latencies: deque[float] = deque(maxlen=window)
+        self._depth = threading.local()
+        self.examples = 0
+        self.inputs = 0
+        self.requests = 0
+        self.in_flight = 0
+        self.current_mr: str | None = None
+        self.mrs: Dict[str, Dict[str, Any]] = {}
+
+    def mr_pending(self, names: list[str]) -> None:
+        with self._lock:
+            for name in names:
+                self.mrs.setdefault(name, {"status": "pending", "runtime_s": 0.0})
+
+    def mr_started(self, name: str) -> None:
+        with self._lock:
+            self.current_mr = name
+            self.mrs[name] = {"status": "running", "runtime_s": 0.0}
+
+    def mr_finished(self, name: str, status: str, runtime_s: float, examples: int = 0) -> None:
+        with self._lock:
+            if self.current_mr == name:
+                self.current_mr = None
+            self.examples += examples
+            self.mrs[name] = {"status": status, "runtime_s": runtime_s}
+
+    def _wrap(self, method: Callable) -> Callable:
+        @wraps(method)
+        def call(xs, *args, **kwargs):
+            # Only the outermost call counts, e.g. predict_items -> predict.
+            depth = getattr(self._depth, "value", 0)
+            if depth:
+                return method(xs, *args, **kwargs)
+            self._depth.value = 1
+            with self._lock:
+                self.in_flight += 1
+            start = time.perf_counter()
+            try:
+                return method(xs, *args, **kwargs)
+            finally:
+                self._depth.value = 0
+                latency = time.perf_counter() - start
+                with self._lock:
+                    self.in_flight -= 1
+                    self.requests += 1
+                    self.inputs += len(xs) if isinstance(xs, (list, tuple)) else 1
+                    self._latencies.append(latency)
+
+        return call
+
+    def instrument(self, adapter: Any) -> Callable[[], None]:
+        """Time the adapter's prediction calls; returns an undo callable."""
+        return instrument_adapter(adapter, self._wrap)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = time.perf_counter() - self.started
+            latencies = sorted(self._latencies)
+            return {
+                "profile": self.profile,
+                "elapsed_s": elapsed,
+                "remaining_budget_s": max(0.0, self.budget_seconds - elapsed),
+                "examples_evaluated": self.examples,
+                "examples_per_s": self.examples / elapsed if elapsed > 0 else 0.0,
+                "inputs_predicted": self.inputs,
+                "inputs_per_s": self.inputs / elapsed if elapsed > 0 else 0.0,
+                "requests_total": self.requests,
+                "in_flight": self.in_flight,
+                "latency_s": {
+                    "p50": _percentile(latencies, 0.50),
+                    "p90": _percentile(latencies, 0.90),
+                    "p99": _percentile(latencies, 0.99),
+                },
+                "current_mr": self.current_mr,
+                "mrs": {name: dict(info) for name, info in self.mrs.items()},
+            }
+
+    def prometheus(self) -> str:
+        snap = self.snapshot()
+        label = f'profile="{snap["profile"]}"'
+        lines = [
+            f"mtci_elapsed_seconds{{{label}}} {snap['elapsed_s']:.6f}",
+            f"mtci_remaining_budget_seconds{{{label}}} {snap['remaining_budget_s']:.6f}",
+            f"mtci_examples_evaluated_total{{{label}}} {snap['examples_evaluated']}",
+            f"mtci_examples_per_second{{{label}}} {snap['examples_per_s']:.6f}",
+            f"mtci_inputs_predicted_total{{{label}}} {snap['inputs_predicted']}",
+            f"mtci_inputs_per_second{{{label}}} {snap['inputs_per_s']:.6f}",
+            f"mtci_requests_total{{{label}}} {snap['requests_total']}",
+            f"mtci_requests_in_flight{{{label}}} {snap['in_flight']}",
+        ]
+        for q, value in snap["latency_s"].items():
+            quantile = int(q[1:]) / 100
+            lines.append(f'mtci_request_latency_seconds{{{label},quantile="{quantile}"}} {value:.6f}')
+        for name, info in snap["mrs"].items():
+            lines.append(
+                f'mtci_mr_runtime_seconds{{{label},mr="{name}",status="{info["status"]}"}} '
+                f'{info["runtime_s"]:.6f}'
+            )
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Flushes snapshots to a JSON file and optionally serves ``/metrics``."""
+
+    def __init__(
+        self,
+        metrics: RunMetrics,
+        path: Path | None,
+        interval_s: float = 1.0,
+        port: int | None = None,
+        host: str = "127.0.0.1",
+    ):
+        self.metrics = metrics
+        self.path = path
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._server: ThreadingHTTPServer | None = None
+        if port is not None:
+            self._server = ThreadingHTTPServer((host, port), self._handler())
+
+    @property
+    def port(self) -> int | None:
+        return self._server.server_address[1] if self._server is not None else None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.rstrip("/") == "/metrics":
+                    body = metrics.prometheus().encode("utf-8")
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path.rstrip("/") == "/metrics.json":
+                    body = json.dumps(metrics.snapshot()).encode("utf-8")
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def flush(self) -> None:
+        if self.path is None:
+            return
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.metrics.snapshot(), indent=2))
+        tmp.replace(self.path)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self.flush()
+
+    def start(self) -> None:
+        if self._server is not None:
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        self.flush()
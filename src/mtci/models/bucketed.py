@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+Tokenize = Callable[[list[str]], list[list[int]]]
+Forward = Callable[[list[list[int]], list[list[int]]], list[float]]
+
+DEFAULT_BUCKETS = (16, 32, 64, 128, 256, 512)
+DEFAULT_HF_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
+RUNTIMES = ("torch", "onnx")
+
+
+class BucketedClassifier:
+    """Length-bucketed batch inference for a sequence classifier.
+
+    Inputs are tokenized once (and cached), sorted by token length and padded
+    only up to the smallest bucket that fits, so each forward pass sees one of
+    a few fixed ``(rows, bucket)`` shapes instead of padding a whole batch to
+    its longest member. Scores are returned in the original order.
+    """
+
+    def __init__(
+        self,
+        tokenize: Tokenize,
+        forward: Forward,
+        pad_id: int = 0,
+        buckets: Sequence[int] = DEFAULT_BUCKETS,
+        batch_size: int = 32,
+        cache_size: int = 10_000,
+    ) -> None:
+        self.tokenize = tokenize
+        self.forward = forward
+        self.pad_id = pad_id
+        self.buckets = sorted(buckets)
+        self.batch_size = batch_size
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, list[int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.forward_s = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def _token_ids(self, xs: Sequence[str]) -> list[list[int]]:
+        known: dict[str, list[int]] = {}
+        with self._lock:
+            for x in xs:
+                ids = self._cache.get(x)
+                if ids is not None:
+                    self._cache.move_to_end(x)
+                    known[x] = ids
+            missing = list(dict.fromkeys(x for x in xs if x not in known))
+            self.cache_hits += sum(1 for x in xs if x in known)
+            self.cache_misses += len(missing)
+        if missing:
+            for text, ids in zip(missing, self.tokenize(missing)):
+                known[text] = list(ids[: self.buckets[-1]])
+            with self._lock:
+                for text in missing:
+                    self._cache[text] = known[text]
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return [known[x] for x in xs]
+
+    def _bucket(self, length: int) -> int:
+        for bucket in self.buckets:
+            if length <= bucket:
+                return bucket
+        return self.buckets[-1]
+
+    def predict(self, xs: Sequence[str]) -> list[float]:
+        items = list(xs)
+        ids = self._token_ids(items)
+        order = sorted(range(len(items)), key=lambda i: len(ids[i]))
+        scores = [0.0] * len(items)
+        groups: dict[int, list[int]] = {}
+        for i in order:
+            groups.setdefault(self._bucket(len(ids[i])), []).append(i)
+        for bucket, members in groups.items():
+            for start in range(0, len(members), self.batch_size):
+                chunk = members[start : start + self.batch_size]
+                input_ids = [ids[i] + [self.pad_id] * (bucket - len(ids[i])) for i in chunk]
+                mask = [[1] * len(ids[i]) + [0] * (bucket - len(ids[i])) for i in chunk]
+                began = time.perf_counter()
+                out = self.forward(input_ids, mask)
+                elapsed = time.perf_counter() - began
+                for i, score in zip(chunk, out):
+                    scores[i] = float(score)
+                with self._lock:
+                    self.forward_s += elapsed
+                    self.tokens += sum(len(ids[i]) for i in chunk)
+                    self.padded_tokens += bucket * len(chunk)
+        return scores
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "tokens": self.tokens,
+                "padded_tokens": self.padded_tokens,
+                "padding_ratio": 1 - self.tokens / self.padded_tokens if self.padded_tokens else 0.0,
+                "forward_s": self.forward_s,
+                "tokens_per_s": self.tokens / self.forward_s if self.forward_s else 0.0,
+                "tokenize_cache_hits": self.cache_hits,
+                "tokenize_cache_misses": self.cache_misses,
+            }
+
+
+def _positive_index(id2label: dict[int, str]) -> int:
+    for index, label in id2label.items():
+        if "POS" in str(label).upper():
+            return int(index)
+    return max(int(index) for index in id2label)
+
+
+def _export_dir(model_name: str, quantize: bool) -> Path:
+    slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model_name)
+    return Path(".mtci") / "onnx" / (f"{slug}-int8" if quantize else slug)
+
+
+def _onnx_model(model_name: str, quantize: bool) -> Any:
+    from optimum.onnxruntime import ORTModelForSequenceClassification
+
+    target = _export_dir(model_name, quantize)
+    file_name = "model_quantized.onnx" if quantize else "model.onnx"
+    if not (target / file_name).exists():
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(target)
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            quantize_dynamic(
+                str(target / "model.onnx"), str(target / file_name), weight_type=QuantType.QInt8
+            )
+    return ORTModelForSequenceClassification.from_pretrained(target, file_name=file_name)
+
+
+def load_hf_bucketed(
+    model_name: str = DEFAULT_HF_MODEL,
+    runtime: str = "torch",
+    quantize: bool = False,
+    buckets: Sequence[int] = DEFAULT_BUCKETS,
+    batch_size: int = 32,
+) -> BucketedClassifier:
+    """Build a bucketed CPU classifier from a Hugging Face checkpoint.
+
+    ``runtime="onnx"`` exports the model once to ``.mtci/onnx/`` (requires
+    ``optimum[onnxruntime]``); ``quantize`` applies dynamic int8 quantization
+    of the linear layers (torch) or weights (ONNX).
+    """
+    if runtime not in RUNTIMES:
+        raise ValueError(f"Unknown runtime {runtime!r}; expected one of {', '.join(RUNTIMES)}")
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    max_length = min(max(buckets), tokenizer.model_max_length)
+    buckets = [b for b in buckets if b < max_length] + [max_length]
+
+    if runtime == "onnx":
+        model = _onnx_model(model_name, quantize)
+    else:
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    positive = _positive_index(model.config.id2label)
+
+    def tokenize(texts: list[str]) -> list[list[int]]:
+        return tokenizer(texts, truncation=True, max_length=max_length)["input_ids"]
+
+    def forward(input_ids: list[list[int]], attention_mask: list[list[int]]) -> list[float]:
+        with torch.inference_mode():
+            logits = model(
+                input_ids=torch.tensor(input_ids), attention_mask=torch.tensor(attention_mask)
+            ).logits
+            return torch.softmax(logits, dim=-1)[:, positive].tolist()
+
+    return BucketedClassifier(
+        tokenize,
+        forward,
+        pad_id=tokenizer.pad_token_id or 0,
+        buckets=buckets,
+        batch_size=batch_size,
+    )
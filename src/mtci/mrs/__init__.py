@@ -1,7 +1,13 @@
-from mtci.mrs.batching import BatchingInvarianceMR
-from mtci.mrs.idempotence import IdempotenceMR
-from mtci.mrs.serialization import SerializationInvarianceMR
-from mtci.mrs.whitespace import WhitespaceInvarianceMR
+from __future__ import annotations
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from mtci.mrs.batching import BatchingInvarianceMR
+    from mtci.mrs.idempotence import IdempotenceMR
+    from mtci.mrs.serialization import SerializationInvarianceMR
+    from mtci.mrs.whitespace import WhitespaceInvarianceMR
 
 __all__ = [
     "BatchingInvarianceMR",
@@ -9,3 +15,17 @@ __all__ = [
     "IdempotenceMR",
     "WhitespaceInvarianceMR",
 ]
+
+# Loading one MR by entrypoint should not import every other MR module.
+_LAZY = {
+    "BatchingInvarianceMR": "mtci.mrs.batching",
+    "IdempotenceMR": "mtci.mrs.idempotence",
+    "SerializationInvarianceMR": "mtci.mrs.serialization",
+    "WhitespaceInvarianceMR": "mtci.mrs.whitespace",
+}
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY:
+        return getattr(importlib.import_module(_LAZY[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
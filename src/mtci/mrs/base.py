@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Sequence
+from typing import TYPE_CHECKING, Iterator, Sequence
 
 from mtci.config import Tolerance
 
+if TYPE_CHECKING:
+    from mtci.mrs.transforms import Transformation, TransformStore
+
 
 @dataclass
 class MRFailure:
@@ -22,12 +26,70 @@ class MRResult:
     passed: bool
     message: str
     failures: list[MRFailure]
+    cut_short: bool = False
 
 
 class BaseMR:
     name: str = "base"
     description: str = ""
     requires_endpoint: bool = False
+    # Per-example MRs can be retried on just the failing inputs; set False for
+    # relations whose verdict depends on more than one example at a time.
+    per_example: bool = True
+    # False for relations that compare repeated identical calls; the executor
+    # then bypasses any prediction memoization for this MR.
+    cacheable_predictions: bool = True
+    # False when duplicate in-flight requests would distort the relation; the
+    # executor then disables endpoint request hedging for this MR.
+    hedgeable: bool = True
+    # Set by the executor from the profile; MRs stop after this many mismatches.
+    max_failures: int | None = None
+    # Set by the executor so transformations are reused across runs and retries.
+    transform_store: TransformStore | None = None
+    # True while the flake engine sends repeated copies of an input; every copy
+    # must then reach the model instead of reusing another copy's prediction.
+    sampling: bool = False
+
+    def apply_transform(
+        self, transformation: Transformation, inputs: Sequence[str]
+    ) -> list[str]:
+        if self.transform_store is None:
+            return transformation.transform(inputs)
+        return self.transform_store.apply(transformation, inputs)
+
+    @contextmanager
+    def uncapped(self) -> Iterator["BaseMR"]:
+        """Lift ``max_failures`` so every input is evaluated.
+
+        Retries and flake sampling read unreported inputs as passes, so a cut
+        would turn hard failures into flakes.
+        """
+        previous, self.max_failures = self.max_failures, None
+        try:
+            yield self
+        finally:
+            self.max_failures = previous
+
+    @contextmanager
+    def sampled(self) -> Iterator["BaseMR"]:
+        """Evaluate every input and every repeated copy, for flake sampling."""
+        previous, self.sampling = self.sampling, True
+        try:
+            with self.uncapped():
+                yield self
+        finally:
+            self.sampling = previous
+
+    def reached_max_failures(self, failures: Sequence[MRFailure]) -> bool:
+        return self.max_failures is not None and len(failures) >= self.max_failures
+
+    def result(self, failures: list[MRFailure]) -> MRResult:
+        passed = len(failures) == 0
+        cut_short = self.reached_max_failures(failures)
+        message = "pass" if passed else f"{len(failures)} mismatches"
+        if cut_short:
+            message += f" (stopped at max_failures={self.max_failures})"
+        return MRResult(self.name, passed, message, failures, cut_short)
 
     def run(
         self,
@@ -8,6 +8,7 @@ from mtci.mrs.base import BaseMR, MRFailure, MRResult, within_tolerance
 class BatchingInvarianceMR(BaseMR):
     name = "batching_invariance"
     description = "Single-item predictions should match their batch position"
+    per_example = False  # each check pairs an example with its neighbour
 
     def run(self, model, inputs: Sequence[str], max_examples: int, tolerance):
         failures: list[MRFailure] = []
@@ -17,8 +18,9 @@ class BatchingInvarianceMR(BaseMR):
         for i in range(n - 1):
             x = inputs[i]
             y = inputs[i + 1]
-            single = model.predict([x])[0]
-            batch = model.predict([x, y])[0]
+            # predict_batch: adaptive batching must not split the pair apart.
+            single = model.predict_batch([x])[0]
+            batch = model.predict_batch([x, y])[0]
             if not within_tolerance(single, batch, tolerance):
                 failures.append(
                     MRFailure(
@@ -30,6 +32,6 @@ class BatchingInvarianceMR(BaseMR):
                         diff=abs(single - batch),
                     )
                 )
-        passed = len(failures) == 0
-        message = "pass" if passed else f"{len(failures)} mismatches"
-        return MRResult(self.name, passed, message, failures)
+                if self.reached_max_failures(failures):
+                    break
+        return self.result(failures)
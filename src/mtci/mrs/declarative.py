@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Sequence
+
+from mtci.config import Tolerance
+from mtci.mrs.base import BaseMR, MRFailure, within_tolerance
+from mtci.mrs.transforms import Transformation
+
+
+def _predict_items(model, texts: list[str]) -> list[float]:
+    predict = getattr(model, "predict_items", None) or model.predict
+    return list(predict(texts))
+
+
+def _invariant(source: float, transformed: float, tol: Tolerance) -> bool:
+    return within_tolerance(source, transformed, tol)
+
+
+def _non_decreasing(source: float, transformed: float, tol: Tolerance) -> bool:
+    return transformed >= source - (tol.atol + tol.rtol * abs(source))
+
+
+def _non_increasing(source: float, transformed: float, tol: Tolerance) -> bool:
+    return transformed <= source + (tol.atol + tol.rtol * abs(source))
+
+
+RELATIONS: Dict[str, Callable[[float, float, Tolerance], bool]] = {
+    "invariant": _invariant,
+    "non_decreasing": _non_decreasing,
+    "non_increasing": _non_increasing,
+}
+
+
+class DeclarativeMR(BaseMR):
+    """An MR described by its sources, transformation and expected relation.
+
+    Subclasses set ``transformation`` and ``relation`` (a key of
+    :data:`RELATIONS`) and optionally ``tolerance`` to override the profile's.
+    The executor can plan several declarative MRs together and hand each one
+    ``shared_predictions`` so identical inputs are only predicted once.
+    """
+
+    transformation: Transformation
+    relation: str = "invariant"
+    tolerance: Tolerance | None = None
+    shared_predictions: Dict[str, float] | None = None
+
+    def sources(self, inputs: Sequence[str], max_examples: int) -> list[str]:
+        return list(inputs[: min(len(inputs), max_examples)])
+
+    def plan(self, inputs: Sequence[str], max_examples: int) -> list[tuple[str, str]]:
+        sources = self.sources(inputs, max_examples)
+        return list(zip(sources, self.apply_transform(self.transformation, sources)))
+
+    def _predictions(self, model, texts: list[str]) -> list[float]:
+        if self.sampling:
+            # Flake samples repeat inputs on purpose; each copy is one sample.
+            return _predict_items(model, texts)
+        shared = self.shared_predictions or {}
+        missing = list(dict.fromkeys(t for t in texts if t not in shared))
+        predictions = dict(shared)
+        if missing:
+            predictions.update(zip(missing, _predict_items(model, missing)))
+        return [predictions[t] for t in texts]
+
+    def run(self, model, inputs: Sequence[str], max_examples: int, tolerance: Tolerance):
+        tol = self.tolerance or tolerance
+        check = RELATIONS[self.relation]
+        pairs = self.plan(inputs, max_examples)
+        outputs = self._predictions(model, [t for pair in pairs for t in pair])
+        failures: list[MRFailure] = []
+        for i, (source, transformed) in enumerate(pairs):
+            out_a = outputs[2 * i]
+            out_b = outputs[2 * i + 1]
+            if not check(out_a, out_b, tol):
+                failures.append(
+                    MRFailure(
+                        index=i,
+                        original=source,
+                        transformed=transformed,
+                        output_original=out_a,
+                        output_transformed=out_b,
+                        diff=abs(out_a - out_b),
+                    )
+                )
+                if self.reached_max_failures(failures):
+                    break
+        return self.result(failures)
+
+
+@dataclass
+class FusedPlan:
+    mrs: list[str]
+    requested_inputs: int
+    unique_inputs: int
+    requests: int
+    runtime_s: float
+
+
+def fuse_predictions(
+    model,
+    plans: Sequence[tuple[DeclarativeMR, Sequence[str]]],
+    batch_size: int = 64,
+) -> tuple[Dict[str, float], FusedPlan]:
+    """Predict the union of every MR's inputs once, in as few calls as possible.
+
+    ``plans`` pairs each MR with the source examples it will evaluate.
+    """
+    start = time.perf_counter()
+    requested: list[str] = []
+    for mr, sources in plans:
+        for pair in mr.plan(sources, len(sources)):
+            requested.extend(pair)
+    unique = list(dict.fromkeys(requested))
+    predictions: Dict[str, float] = {}
+    requests = 0
+    for offset in range(0, len(unique), batch_size):
+        chunk = unique[offset : offset + batch_size]
+        predictions.update(zip(chunk, _predict_items(model, chunk)))
+        requests += 1
+    plan = FusedPlan(
+        mrs=[mr.name for mr, _ in plans],
+        requested_inputs=len(requested),
+        unique_inputs=len(unique),
+        requests=requests,
+        runtime_s=time.perf_counter() - start,
+    )
+    return predictions, plan
@@ -18,6 +18,7 @@ class FlakeDemoMR(BaseMR):
     """
     name = "flake_demo"
     description = "Intentionally flaky MR for testing flake-aware gating."
+    per_example = False
 
     def run(
         self,
@@ -9,6 +9,8 @@ class IdempotenceMR(BaseMR):
     name = "idempotence"
     description = "Same request should yield same response"
     requires_endpoint = True
+    cacheable_predictions = False
+    hedgeable = False
 
     def run(self, model, inputs: Sequence[str], max_examples: int, tolerance):
         failures: list[MRFailure] = []
@@ -30,6 +32,6 @@ class IdempotenceMR(BaseMR):
                         diff=abs(a - b),
                     )
                 )
-        passed = len(failures) == 0
-        message = "pass" if passed else f"{len(failures)} mismatches"
-        return MRResult(self.name, passed, message, failures)
+                if self.reached_max_failures(failures):
+                    break
+        return self.result(failures)
@@ -3,7 +3,7 @@ from __future__ import annotations
 import json
 from typing import Sequence
 
-from mtci.adapters import HTTPEndpointModel
+from mtci.adapters import HTTPEndpointModel, unwrap
 from mtci.mrs.base import BaseMR, MRFailure, MRResult, within_tolerance
 
 
@@ -13,7 +13,7 @@ class SerializationInvarianceMR(BaseMR):
     requires_endpoint = True
 
     def run(self, model, inputs: Sequence[str], max_examples: int, tolerance):
-        if not isinstance(model, HTTPEndpointModel):
+        if not isinstance(unwrap(model), HTTPEndpointModel):
             return MRResult(self.name, True, "endpoint-only MR", [])
         failures: list[MRFailure] = []
         n = min(len(inputs), max_examples)
@@ -35,6 +35,6 @@ class SerializationInvarianceMR(BaseMR):
                         diff=abs(out_a - out_b),
                     )
                 )
-        passed = len(failures) == 0
-        message = "pass" if passed else f"{len(failures)} mismatches"
-        return MRResult(self.name, passed, message, failures)
+                if self.reached_max_failures(failures):
+                    break
+        return self.result(failures)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Sequence
+
+from mtci.state import STATE_DIR, example_key
+
+TRANSFORM_DIR = "transforms"
+
+
+class Transformation:
+    """A batchable input transformation whose outputs can be cached.
+
+    Outputs are cached per input text under :attr:`key`. Bump ``version`` when
+    the behaviour changes; without one, the key follows the source of
+    :meth:`transform`, so edits invalidate the cache automatically.
+    """
+
+    name: str = "transformation"
+    version: str = ""
+
+    def transform(self, inputs: Sequence[str]) -> list[str]:
+        raise NotImplementedError
+
+    def _fingerprint(self) -> str:
+        try:
+            source = inspect.getsource(type(self))
+        except (OSError, TypeError):
+            source = type(self).__qualname__
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}-{self.version or self._fingerprint()}"
+
+
+class FunctionTransformation(Transformation):
+    def __init__(self, name: str, fn: Callable[[str], str], version: str = ""):
+        self.name = name
+        self.fn = fn
+        self.version = version
+
+    def transform(self, inputs: Sequence[str]) -> list[str]:
+        return [self.fn(text) for text in inputs]
+
+    def _fingerprint(self) -> str:
+        try:
+            source = inspect.getsource(self.fn)
+        except (OSError, TypeError):
+            source = getattr(self.fn, "__qualname__", repr(self.fn))
+        return hashlib.sha1(source.encode("utf-8")).hexdigest()[:12]
+
+
+class TransformStore:
+    """Content-addressed transformation outputs persisted under ``.mtci/transforms``."""
+
+    def __init__(self, root: Path):
+        self.dir = root / STATE_DIR / TRANSFORM_DIR
+        self._shards: Dict[str, Dict[str, str]] = {}
+        self._dirty: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> Path:
+        return self.dir / f"{key}.json"
+
+    def _shard(self, key: str) -> Dict[str, str]:
+        if key not in self._shards:
+            path = self._path(key)
+            self._shards[key] = json.loads(path.read_text()) if path.exists() else {}
+        return self._shards[key]
+
+    def apply(self, transformation: Transformation, inputs: Sequence[str]) -> list[str]:
+        key = transformation.key
+        shard = self._shard(key)
+        keys = [example_key(text) for text in inputs]
+        missing: Dict[str, str] = {}
+        for text, text_key in zip(inputs, keys):
+            if text_key not in shard and text_key not in missing:
+                missing[text_key] = text
+        self.hits += len(inputs) - len(missing)
+        self.misses += len(missing)
+        if missing:
+            outputs = transformation.transform(list(missing.values()))
+            shard.update(zip(missing.keys(), outputs))
+            self._dirty.add(key)
+        return [shard[text_key] for text_key in keys]
+
+    def flush(self) -> None:
+        if not self._dirty:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        for key in self._dirty:
+            path = self._path(key)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self._shards[key]))
+            tmp.replace(path)
+        self._dirty.clear()
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+from typing import Sequence
+
+from mtci.config import ExampleSelectionConfig
+from mtci.state import MRStats, example_key
+
+UNSEEN_PRIORITY = 0.5
+
+
+def _signature(text: str) -> tuple[int, str]:
+    words = text.split()
+    return len(text).bit_length(), words[0].lower() if words else ""
+
+
+def prioritize_examples(
+    data: Sequence[str],
+    stats: MRStats,
+    max_examples: int,
+    config: ExampleSelectionConfig,
+    rows: Sequence[int] | None = None,
+) -> list[int]:
+    """Pick the ``max_examples`` most informative dataset indexes for one MR.
+
+    Candidates are the first ``pool_size`` rows plus every row the MR has seen
+    before (located via its last known index and verified by hash). Seen rows
+    score by smoothed failure rate with a flake bonus; unseen rows get a
+    neutral prior so coverage rotates across runs. A greedy pass then
+    discounts rows whose length bucket and leading word were already picked.
+    ``rows`` maps indexes to source-file rows when deduplication dropped some;
+    known indexes are stored as source rows.
+    """
+    limit = min(len(data), max_examples)
+    if limit <= 0:
+        return []
+    candidates = set(range(min(len(data), max(config.pool_size, limit))))
+    position = {row: pos for pos, row in enumerate(rows)} if rows is not None else None
+    for key, entry in stats.examples.items():
+        index = entry.last_index
+        if position is not None:
+            index = position.get(index, -1)
+        if 0 <= index < len(data) and index not in candidates and example_key(data[index]) == key:
+            candidates.add(index)
+
+    scored = []
+    for index in sorted(candidates):
+        entry = stats.examples.get(example_key(data[index]))
+        priority = UNSEEN_PRIORITY if entry is None else entry.priority
+        scored.append((priority, index))
+    scored.sort(key=lambda item: (-item[0], item[1]))
+
+    chosen: list[int] = []
+    picked: dict[tuple[int, str], int] = {}
+    remaining = scored
+    while remaining and len(chosen) < limit:
+        best_pos = 0
+        best_score = -1.0
+        for pos, (priority, index) in enumerate(remaining):
+            # Scores are sorted, so nothing later can beat an undiscounted hit.
+            if priority <= best_score:
+                break
+            count = picked.get(_signature(data[index]), 0)
+            score = priority * (1.0 - config.diversity) ** count
+            if score > best_score:
+                best_pos, best_score = pos, score
+        _, index = remaining.pop(best_pos)
+        chosen.append(index)
+        signature = _signature(data[index])
+        picked[signature] = picked.get(signature, 0) + 1
+    return chosen
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+PROFILE_MODES = ("cprofile", "sample")
+
+
+class ProfilingError(Exception):
+    pass
+
+
+def _frame_label(code) -> str:
+    return f"{Path(code.co_filename).name}:{code.co_name}"
+
+
+class _Sampler:
+    """Samples one thread's stack at a fixed interval into collapsed stacks."""
+
+    def __init__(self, thread_id: int, interval_s: float):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="mtci-sampler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if labels:
+                self.stacks[";".join(reversed(labels))] += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+
+class MRProfiler:
+    """Profiles each MR's execution and writes per-MR artifacts.
+
+    ``cprofile`` writes ``profiles/<mr>.pstats``; ``sample`` writes
+    ``profiles/<mr>.collapsed`` (flamegraph.pl / speedscope input). Both return
+    a top-N hot-function summary for ``report.json``.
+    """
+
+    def __init__(self, mode: str, out_dir: Path, top_n: int = 10, interval_s: float = 0.002):
+        if mode not in PROFILE_MODES:
+            raise ProfilingError(f"Unknown profile mode {mode!r}; use one of {PROFILE_MODES}")
+        self.mode = mode
+        self.dir = out_dir / "profiles"
+        self.top_n = top_n
+        self.interval_s = interval_s
+        self._active: Any = None
+
+    def start(self, name: str) -> None:
+        if self.mode == "cprofile":
+            self._active = cProfile.Profile()
+            self._active.enable()
+        else:
+            self._active = _Sampler(threading.get_ident(), self.interval_s)
+            self._active.start()
+
+    def stop(self, name: str) -> Dict[str, Any]:
+        active, self._active = self._active, None
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if self.mode == "cprofile":
+            active.disable()
+            path = self.dir / f"{name}.pstats"
+            active.dump_stats(path)
+            return {"mode": self.mode, "file": str(path), "top": self._top_cprofile(path)}
+        active.stop()
+        path = self.dir / f"{name}.collapsed"
+        path.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in sorted(active.stacks.items()))
+        )
+        return {
+            "mode": self.mode,
+            "file": str(path),
+            "samples": sum(active.stacks.values()),
+            "top": self._top_samples(active.stacks),
+        }
+
+    def close(self) -> None:
+        """Stop a profiler left running by a failed MR, writing nothing."""
+        active, self._active = self._active, None
+        if active is None:
+            return
+        if self.mode == "cprofile":
+            active.disable()
+        else:
+            active.stop()
+
+    def _top_cprofile(self, path: Path) -> List[Dict[str, Any]]:
+        stats = pstats.Stats(str(path))
+        rows = []
+        for (filename, line, func), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append(
+                {
+                    "function": f"{Path(filename).name}:{line}({func})",
+                    "ncalls": ncalls,
+                    "tottime_s": tottime,
+                    "cumtime_s": cumtime,
+                }
+            )
+        rows.sort(key=lambda row: -row["tottime_s"])
+        return rows[: self.top_n]
+
+    def _top_samples(self, stacks: Counter[str]) -> List[Dict[str, Any]]:
+        leaf: Counter[str] = Counter()
+        for stack, count in stacks.items():
+            leaf[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaf.values()) or 1
+        return [
+            {"function": label, "samples": count, "share": count / total}
+            for label, count in leaf.most_common(self.top_n)
+        ]
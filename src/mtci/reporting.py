@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 from xml.etree import ElementTree as ET
 
@@ -26,6 +27,10 @@ def write_junit(
         )
         status = result["status"]
         message = result.get("message", "")
+        if result.get("cut_short"):
+            ET.SubElement(
+                ET.SubElement(testcase, "properties"), "property", name="cut_short", value="true"
+            )
         if status == "fail":
             failure = ET.SubElement(testcase, "failure", message=message or "fail")
             failure.text = message
@@ -42,4 +47,118 @@ def write_junit(
 
     tree = ET.ElementTree(testsuite)
     out_dir.mkdir(parents=True, exist_ok=True)
-    tree.write(out_dir / "junit.xml", encoding="utf-8", xml_declaration=True)
+    # Rewritten after every MR: swap in atomically so a kill never truncates it.
+    tmp = out_dir / "junit.xml.tmp"
+    tree.write(tmp, encoding="utf-8", xml_declaration=True)
+    os.replace(tmp, out_dir / "junit.xml")
+
+
+EVENTS_FILE = "events.jsonl"
+
+
+class ReportStream:
+    """Writes results to ``events.jsonl`` as each MR finishes.
+
+    ``junit.xml`` is rewritten from slim per-MR rows after every result, so a
+    run killed at its deadline still leaves usable artifacts; failure payloads
+    live only on disk. :func:`assemble_report` builds ``report.json`` from the
+    event log.
+    """
+
+    def __init__(self, out_dir: Path, junit_flaky_as_failure: bool):
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.out_dir = out_dir
+        self.junit_flaky_as_failure = junit_flaky_as_failure
+        self._rows: list[dict] = []
+        # One stream per run directory; never append to an earlier run's log.
+        self._events = (out_dir / EVENTS_FILE).open("w", encoding="utf-8")
+
+    def _write(self, event: str, payload: dict) -> None:
+        self._events.write(json.dumps({"event": event, **payload}) + "\n")
+        self._events.flush()
+
+    def start(self, header: dict) -> None:
+        self._write("start", {"header": header})
+        write_junit(self.out_dir, self._rows, self.junit_flaky_as_failure)
+
+    def result(self, result: dict) -> None:
+        self._write("result", {"result": result})
+        self._rows.append(
+            {
+                "name": result["name"],
+                "status": result["status"],
+                "runtime_s": result.get("runtime_s", 0),
+                "message": result.get("message", ""),
+                "cut_short": result.get("cut_short", False),
+            }
+        )
+        write_junit(self.out_dir, self._rows, self.junit_flaky_as_failure)
+
+    def finish(self, footer: dict) -> Path:
+        self._write("finish", {"footer": footer})
+        self.close()
+        return assemble_report(self.out_dir)
+
+    def close(self) -> None:
+        if not self._events.closed:
+            self._events.close()
+
+    def abort(self) -> None:
+        """Close a stream whose run raised, leaving a partial ``report.json``."""
+        if self._events.closed:
+            return
+        self.close()
+        assemble_report(self.out_dir)
+
+
+def _iter_events(out_dir: Path):
+    with (out_dir / EVENTS_FILE).open(encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # A job killed mid-write leaves a truncated last line.
+                return
+
+
+def _write_member(handle, key: str, value, first: bool) -> None:
+    body = json.dumps(value, indent=2).replace("\n", "\n  ")
+    handle.write(("" if first else ",\n") + f"  {json.dumps(key)}: {body}")
+
+
+def assemble_report(out_dir: Path) -> Path:
+    """Write ``report.json`` from the event log without loading every result."""
+    header: dict = {}
+    footer: dict | None = None
+    for event in _iter_events(out_dir):
+        if event["event"] == "start":
+            header = event["header"]
+        elif event["event"] == "finish":
+            footer = event["footer"]
+
+    path = out_dir / "report.json"
+    tmp = out_dir / "report.json.tmp"
+    with tmp.open("w", encoding="utf-8") as handle:
+        handle.write("{\n")
+        first = True
+        for key, value in header.items():
+            _write_member(handle, key, value, first)
+            first = False
+        handle.write(("" if first else ",\n") + '  "results": [')
+        count = 0
+        for event in _iter_events(out_dir):
+            if event["event"] != "result":
+                continue
+            body = json.dumps(event["result"], indent=2).replace("\n", "\n    ")
+            handle.write(("\n" if count == 0 else ",\n") + f"    {body}")
+            count += 1
+        handle.write("\n  ]" if count else "]")
+        for key, value in (footer or {}).items():
+            _write_member(handle, key, value, False)
+        _write_member(handle, "partial", footer is None, False)
+        handle.write("\n}\n")
+    os.replace(tmp, path)
+    return path
@@ -12,6 +12,7 @@ class SelectionMetadata:
     score: float
     predicted_runtime_s: float
     reason: str
+    impact: float = 0.0
 
 
 def score_mr(stats: MRStats) -> float:
@@ -24,6 +25,8 @@ def select_mrs(
     budget_seconds: float,
     smoke_count: int = 2,
     default_runtime: float = 1.0,
+    impact: dict[str, float] | None = None,
+    unimpacted_budget_fraction: float = 1.0,
 ) -> List[SelectionMetadata]:
     names = list(mr_names)
     selections: List[SelectionMetadata] = []
@@ -49,23 +52,40 @@ def select_mrs(
 
     scored = []
     for name in names:
-        stats = stats_by_name.get(name) or MRStats()
+        stats = stats_by_name.get(name)
+        if stats is None:
+            stats = MRStats(median_runtime_s=default_runtime)
         runtime = stats.median_runtime_s if stats.median_runtime_s > 0 else default_runtime
-        scored.append((name, score_mr(stats), runtime))
+        mr_impact = impact.get(name, 0.0) if impact is not None else 0.0
+        scored.append((name, score_mr(stats), runtime, mr_impact))
 
-    scored.sort(key=lambda item: (-item[1], item[0]))
+    if impact is None:
+        scored.sort(key=lambda item: (-item[1], item[0]))
+    else:
+        # MRs that historically fail when these paths change go first.
+        scored.sort(key=lambda item: (-item[3], -item[1], item[0]))
 
-    for name, score, runtime in scored:
-        if runtime <= remaining:
-            selections.append(
-                SelectionMetadata(
-                    name=name,
-                    score=score,
-                    predicted_runtime_s=runtime,
-                    reason="score-ranked",
-                )
+    unimpacted_remaining = budget_seconds * unimpacted_budget_fraction - (
+        budget_seconds - remaining
+    )
+    for name, score, runtime, mr_impact in scored:
+        if runtime > remaining:
+            continue
+        impacted = impact is not None and mr_impact > 0
+        if impact is not None and not impacted:
+            if runtime > unimpacted_remaining:
+                continue
+            unimpacted_remaining -= runtime
+        selections.append(
+            SelectionMetadata(
+                name=name,
+                score=score,
+                predicted_runtime_s=runtime,
+                reason="change-impacted" if impacted else "score-ranked",
+                impact=mr_impact,
             )
-            remaining -= runtime
+        )
+        remaining -= runtime
 
     if not selections:
         name = names[0]
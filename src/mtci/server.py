@@ -18,7 +18,7 @@ class PredictResponse(BaseModel):
     scores: List[float]
 
 
-def _load_model():
+def _load_model(backend: str | None = None, runtime: str | None = None, quantize: bool = False):
     entrypoint = os.getenv("MTCI_MODEL_ENTRYPOINT")
     if entrypoint:
         return load_entrypoint(entrypoint)
@@ -29,6 +29,16 @@ def _load_model():
     except Exception:
         return SimpleSentimentModel()
 
+    backend = backend or os.getenv("MTCI_SERVE_BACKEND", "pipeline")
+    if backend == "bucketed":
+        from mtci.models.bucketed import DEFAULT_HF_MODEL, load_hf_bucketed
+
+        return load_hf_bucketed(
+            os.getenv("MTCI_HF_MODEL", DEFAULT_HF_MODEL),
+            runtime=runtime or os.getenv("MTCI_SERVE_RUNTIME", "torch"),
+            quantize=quantize or os.getenv("MTCI_SERVE_QUANTIZE") == "1",
+        )
+
     pipe = pipeline("sentiment-analysis")
 
     class HFModel:
@@ -44,14 +54,21 @@ def _load_model():
     return HFModel()
 
 
-def create_app() -> FastAPI:
+def create_app(
+    backend: str | None = None, runtime: str | None = None, quantize: bool = False
+) -> FastAPI:
     app = FastAPI()
-    model = _load_model()
+    model = _load_model(backend, runtime, quantize)
 
     @app.get("/health")
     def health():
         return {"status": "ok"}
 
+    @app.get("/stats")
+    def stats():
+        # Backends that track throughput (e.g. bucketed) report tokens/sec here.
+        return model.stats() if hasattr(model, "stats") else {}
+
     @app.post("/predict", response_model=PredictResponse)
     def predict(request: PredictRequest):
         scores = model.predict(request.inputs)
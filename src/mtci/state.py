@@ -1,13 +1,40 @@
 from __future__ import annotations
 
+import hashlib
 import json
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from pathlib import Path
 from statistics import median
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 STATE_DIR = ".mtci"
 STATE_FILE = "state.json"
+MAX_PATH_KEYS = 500
+MAX_EXAMPLE_KEYS = 5000
+MAX_MEMORY_SAMPLES = 20
+# Runs an MR may be refused by the memory budget before it is probed again.
+MEMORY_PROBE_AFTER = 3
+
+
+def example_key(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass
+class ExampleStats:
+    samples: int = 0
+    failures: int = 0
+    flaky: bool = False
+    last_index: int = -1
+
+    @property
+    def failure_rate(self) -> float:
+        return self.failures / self.samples if self.samples else 0.0
+
+    @property
+    def priority(self) -> float:
+        """Smoothed failure rate, boosted for examples that have flip-flopped."""
+        return (self.failures + 1) / (self.samples + 2) + (0.25 if self.flaky else 0.0)
 
 
 @dataclass
@@ -17,6 +44,56 @@ class MRStats:
     flaky_count: int = 0
     median_runtime_s: float = 1.0
     runtimes: List[float] | None = None
+    examples: Dict[str, ExampleStats] = field(default_factory=dict)
+    path_runs: Dict[str, int] = field(default_factory=dict)
+    path_fails: Dict[str, int] = field(default_factory=dict)
+    memory: List[List[int]] | None = None
+    memory_refusals: int = 0
+
+    def record_example(
+        self,
+        key: str,
+        samples: int,
+        failures: int,
+        flaky: bool = False,
+        index: int | None = None,
+    ) -> None:
+        entry = self.examples.setdefault(key, ExampleStats())
+        entry.samples += samples
+        entry.failures += failures
+        entry.flaky = entry.flaky or flaky or 0 < failures < samples
+        if index is not None:
+            entry.last_index = index
+        if len(self.examples) > MAX_EXAMPLE_KEYS:
+            # Trim to 90% so pruning is amortized; failing examples survive longest.
+            keep = sorted(
+                self.examples,
+                key=lambda k: (-self.examples[k].failures, -self.examples[k].samples),
+            )[: MAX_EXAMPLE_KEYS * 9 // 10]
+            self.examples = {k: self.examples[k] for k in keep}
+
+    def record_paths(self, keys: Iterable[str], failed: bool) -> None:
+        for key in set(keys):
+            self.path_runs[key] = self.path_runs.get(key, 0) + 1
+            if failed:
+                self.path_fails[key] = self.path_fails.get(key, 0) + 1
+        if len(self.path_runs) > MAX_PATH_KEYS:
+            keep = sorted(self.path_runs, key=lambda k: -self.path_runs[k])[:MAX_PATH_KEYS]
+            self.path_runs = {k: self.path_runs[k] for k in keep}
+            self.path_fails = {k: v for k, v in self.path_fails.items() if k in self.path_runs}
+
+    def impact(self, keys: Iterable[str]) -> float:
+        """Highest observed failure rate among runs that touched any of ``keys``."""
+        best = 0.0
+        for key in keys:
+            runs = self.path_runs.get(key, 0)
+            if runs:
+                best = max(best, self.path_fails.get(key, 0) / (runs + 1))
+        return best
+
+    def known_flaky(self, key: str) -> bool:
+        entry = self.examples.get(key)
+        return entry is not None and entry.flaky
 
     def update_runtime(self, runtime: float) -> None:
         if self.runtimes is None:
@@ -26,6 +103,46 @@ class MRStats:
             self.runtimes = self.runtimes[-50:]
         self.median_runtime_s = float(median(self.runtimes))
 
+    def record_memory(self, peak_bytes: int, examples: int) -> None:
+        if self.memory is None:
+            self.memory = []
+        self.memory.append([max(0, int(peak_bytes)), max(1, int(examples))])
+        if len(self.memory) > MAX_MEMORY_SAMPLES:
+            self.memory = self.memory[-MAX_MEMORY_SAMPLES:]
+
+    def memory_model(self) -> tuple[float, float] | None:
+        """``(fixed, per_example)`` peak bytes fitted to recent samples.
+
+        Peaks are reduced to their median per example count so a single spike
+        does not dominate. Until two different counts have been seen the fixed
+        cost cannot be separated and the whole peak is charged per example.
+        """
+        if not self.memory:
+            return None
+        by_count: Dict[int, List[int]] = {}
+        for peak, examples in self.memory:
+            by_count.setdefault(examples, []).append(peak)
+        from mtci.calibration import fit_latency
+
+        return fit_latency([(n, float(median(peaks))) for n, peaks in sorted(by_count.items())])
+
+    def predicted_memory(self, examples: int) -> float | None:
+        model = self.memory_model()
+        if model is None:
+            return None
+        fixed, per_example = model
+        return fixed + per_example * examples
+
+    def memory_allowance(self, budget_bytes: float, max_examples: int) -> int | None:
+        """Examples that fit ``budget_bytes`` by past peaks; None without history."""
+        model = self.memory_model()
+        if model is None:
+            return None
+        fixed, per_example = model
+        if per_example <= 0:
+            return max_examples if fixed <= budget_bytes else 0
+        return max(0, min(max_examples, int((budget_bytes - fixed) // per_example)))
+
 
 class StateStore:
     def __init__(self, root: Path):
@@ -46,6 +163,14 @@ class StateStore:
                 flaky_count=stats.get("flaky_count", 0),
                 median_runtime_s=stats.get("median_runtime_s", 1.0),
                 runtimes=stats.get("runtimes", None),
+                examples={
+                    key: ExampleStats(**entry)
+                    for key, entry in stats.get("examples", {}).items()
+                },
+                path_runs=stats.get("path_runs", {}),
+                path_fails=stats.get("path_fails", {}),
+                memory=stats.get("memory", None),
+                memory_refusals=stats.get("memory_refusals", 0),
             )
         self._data = data
         return data
@@ -59,6 +184,13 @@ class StateStore:
                     "flaky_count": stats.flaky_count,
                     "median_runtime_s": stats.median_runtime_s,
                     "runtimes": stats.runtimes,
+                    "examples": {
+                        key: asdict(entry) for key, entry in stats.examples.items()
+                    },
+                    "path_runs": stats.path_runs,
+                    "path_fails": stats.path_fails,
+                    "memory": stats.memory,
+                    "memory_refusals": stats.memory_refusals,
                 }
                 for name, stats in self._data.items()
             }
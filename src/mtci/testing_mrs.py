@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from mtci.mrs.base import BaseMR, MRResult
+from mtci.mrs.base import BaseMR, MRFailure, MRResult
 
 
 class FailThenPassMR(BaseMR):
@@ -21,3 +21,33 @@ class AlwaysFailMR(BaseMR):
 
     def run(self, model, inputs, max_examples, tolerance):
         return MRResult(self.name, False, "fail", [])
+
+
+class RaisingMR(BaseMR):
+    """Crashes after querying the model, like an MR with a bug."""
+
+    name = "raising"
+
+    def run(self, model, inputs, max_examples, tolerance):
+        model.predict(list(inputs)[:1])
+        raise RuntimeError("boom")
+
+
+class PerExampleFlakeMR(BaseMR):
+    """Fails "flaky" inputs on first sight only and "broken" inputs always."""
+
+    name = "per_example_flake"
+
+    def __init__(self):
+        self._seen: set[str] = set()
+
+    def run(self, model, inputs, max_examples, tolerance):
+        failures = []
+        for i, text in enumerate(list(inputs)[:max_examples]):
+            flaky = "flaky" in text and text not in self._seen
+            self._seen.add(text)
+            if flaky or "broken" in text:
+                failures.append(MRFailure(i, text, None, 0.0, 1.0, 1.0))
+                if self.reached_max_failures(failures):
+                    break
+        return self.result(failures)
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from mtci.adapters import entrypoint_module
+from mtci.cache import RunCache
+from mtci.config import LocalModelConfig
+from mtci.execution import load_mr, run_profile
+
+
+def _module_file(name: str) -> Path | None:
+    module = sys.modules.get(name)
+    origin = getattr(module, "__file__", None)
+    return Path(origin) if origin else None
+
+
+def _stamp(path: Path) -> int | None:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@dataclass
+class WatchCycle:
+    changes: List[str]
+    exit_code: int
+    out_dir: Path
+    mrs: List[str] | None
+    elapsed_s: float
+
+
+@dataclass
+class Watcher:
+    """Re-runs a profile when its config, dataset, model or MR modules change.
+
+    Changed modules are reloaded in place. Local-model predictions are memoized
+    per batch, so a dataset edit only sends new inputs to the model, and an MR
+    edit only re-runs the MRs defined in that module.
+    """
+
+    config_path: Path
+    profile: str
+    out: Path
+    cache: RunCache = field(default_factory=lambda: RunCache(memoize_predictions=True))
+    _stamps: Dict[Path, Tuple[str, str | None]] = field(default_factory=dict)
+    _seen: Dict[Path, int | None] = field(default_factory=dict)
+
+    def _watched(self) -> Dict[Path, Tuple[str, str | None]]:
+        config = self.cache.config(self.config_path)
+        watched: Dict[Path, Tuple[str, str | None]] = {
+            self.config_path.resolve(): ("config", None),
+            Path(config.dataset.path).resolve(): ("dataset", None),
+        }
+        if isinstance(config.model, LocalModelConfig):
+            name = entrypoint_module(config.model.entrypoint)
+            path = _module_file(name)
+            if path is not None:
+                watched[path.resolve()] = ("model", name)
+        for entry in config.profiles[self.profile].mrs:
+            name = entrypoint_module(entry)
+            path = _module_file(name)
+            if path is not None:
+                watched[path.resolve()] = ("mr", name)
+        return watched
+
+    def _snapshot(self) -> None:
+        self._stamps = self._watched()
+        self._mark_seen()
+
+    def _mark_seen(self) -> None:
+        self._seen = {path: _stamp(path) for path in self._stamps}
+
+    def changed(self) -> List[Tuple[Path, str, str | None]]:
+        return [
+            (path, kind, module)
+            for path, (kind, module) in self._stamps.items()
+            if _stamp(path) != self._seen.get(path)
+        ]
+
+    def _mr_names_in(self, modules: set[str]) -> set[str]:
+        config = self.cache.config(self.config_path)
+        return {
+            load_mr(entry).name
+            for entry in config.profiles[self.profile].mrs
+            if entrypoint_module(entry) in modules
+        }
+
+    def run(self, changes: List[Tuple[Path, str, str | None]] | None = None) -> WatchCycle:
+        changes = changes or []
+        kinds = {kind for _, kind, _ in changes}
+        only_mrs = None
+        if "config" in kinds:
+            self.cache.invalidate()
+        for _, kind, module in changes:
+            if module and module in sys.modules:
+                importlib.reload(sys.modules[module])
+        if "model" in kinds:
+            self.cache.drop_adapters()
+        if changes and kinds == {"mr"}:
+            only_mrs = self._mr_names_in({module for _, _, module in changes if module})
+
+        start = time.perf_counter()
+        config = self.cache.config(self.config_path)
+        exit_code, out_dir = run_profile(
+            config, self.profile, self.out, cache=self.cache, only_mrs=only_mrs, persist=False
+        )
+        elapsed = time.perf_counter() - start
+        self._snapshot()
+        return WatchCycle(
+            changes=[str(path) for path, _, _ in changes],
+            exit_code=exit_code,
+            out_dir=out_dir,
+            mrs=sorted(only_mrs) if only_mrs is not None else None,
+            elapsed_s=elapsed,
+        )
+
+    def poll(self) -> WatchCycle | None:
+        changes = self.changed()
+        if not changes:
+            return None
+        return self.run(changes)
+
+    def loop(
+        self,
+        on_cycle: Callable[[WatchCycle], None],
+        interval_s: float = 0.2,
+        on_error: Callable[[Exception], None] | None = None,
+    ) -> None:
+        on_cycle(self.run())
+        while True:
+            time.sleep(interval_s)
+            try:
+                cycle = self.poll()
+            except Exception as exc:
+                if on_error is None:
+                    raise
+                on_error(exc)
+                self._mark_seen()
+                continue
+            if cycle is not None:
+                on_cycle(cycle)
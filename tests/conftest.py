@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+import pytest
+import yaml
+
+LOCAL_MODEL = {"mode": "local", "entrypoint": "mtci.models.simple.SimpleSentimentModel"}
+
+
+@pytest.fixture
+def write_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Callable[..., Path]:
+    """Write ``data.jsonl`` and ``mtci.yml`` into ``tmp_path`` and chdir there.
+
+    ``profiles`` maps profile names to their settings; ``model`` defaults to the
+    simple local model and extra keyword arguments become top-level sections.
+    """
+
+    def write(
+        profiles: dict[str, dict[str, Any]],
+        rows: Iterable[str] = ("good", "bad"),
+        model: dict[str, Any] | None = None,
+        **sections: Any,
+    ) -> Path:
+        dataset = tmp_path / "data.jsonl"
+        dataset.write_text("".join(json.dumps({"text": row}) + "\n" for row in rows))
+        config = {
+            "profiles": profiles,
+            "dataset": {"path": str(dataset), "jsonl_field": "text"},
+            "model": model or LOCAL_MODEL,
+            **sections,
+        }
+        path = tmp_path / "mtci.yml"
+        path.write_text(yaml.safe_dump(config, sort_keys=False))
+        monkeypatch.chdir(tmp_path)
+        return path
+
+    return write
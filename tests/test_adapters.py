@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from mtci.adapters import AdaptiveBatcher, HedgePolicy, HTTPEndpointModel, RetryPolicy
+
+
+class _SyncTransport(httpx.BaseTransport):
+    """MockTransport also speaks async; this forces the threaded sync path."""
+
+    def __init__(self, handler):
+        self.mock = httpx.MockTransport(handler)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        return self.mock.handle_request(request)
+
+
+def _model(handler, sync: bool = False, **kwargs) -> HTTPEndpointModel:
+    return HTTPEndpointModel(
+        base_url="http://test",
+        predict_path="/predict",
+        timeout_s=1.0,
+        transport=_SyncTransport(handler) if sync else httpx.MockTransport(handler),
+        retry=RetryPolicy(max_retries=3, backoff_base_s=0.0),
+        **kwargs,
+    )
+
+
+def test_retries_transient_503_with_retry_after():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) < 3:
+            return httpx.Response(503, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"scores": [0.5]})
+
+    model = _model(handler)
+    assert model.predict(["good"]) == [0.5]
+    assert len(calls) == 3
+
+
+def test_adaptive_batch_shrinks_on_413_and_preserves_order():
+    sizes = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = httpx.Response(200, content=request.content).json()["inputs"]
+        sizes.append(len(inputs))
+        if len(inputs) > 2:
+            return httpx.Response(413)
+        return httpx.Response(200, json={"scores": [float(x) for x in inputs]})
+
+    model = _model(handler, batcher=AdaptiveBatcher(size=8, target_latency_s=1e-9))
+    assert model.predict(["1", "2", "3", "4", "5"]) == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert sizes[0] == 5
+    assert model.batcher.size == 2
+
+
+def test_batching_mr_sends_pairs_unsplit_after_shrink():
+    from mtci.adapters import MemoizedAdapter
+    from mtci.config import Tolerance
+    from mtci.mrs.batching import BatchingInvarianceMR
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = httpx.Response(200, content=request.content).json()["inputs"]
+        # Scores depend on batch composition, which the MR must detect.
+        return httpx.Response(200, json={"scores": [float(len(inputs))] * len(inputs)})
+
+    model = _model(handler, batcher=AdaptiveBatcher(size=1, max_size=1))
+    assert model.predict(["a", "b"]) == [1.0, 1.0]
+    for adapter in (model, MemoizedAdapter(model)):
+        result = BatchingInvarianceMR().run(adapter, ["a", "b", "c"], 3, Tolerance())
+        assert not result.passed
+        assert len(result.failures) == 2
+
+
+def test_retry_delay_honours_retry_after_and_caps():
+    policy = RetryPolicy(backoff_base_s=1.0, backoff_max_s=2.0)
+    response = httpx.Response(503, headers={"retry-after": "30"})
+    assert policy.delay(0, response) == 2.0
+    assert 0.0 <= policy.delay(5) <= 2.0
+
+
+def test_concurrent_chunks_preserve_order():
+    def handler(request: httpx.Request) -> httpx.Response:
+        inputs = httpx.Response(200, content=request.content).json()["inputs"]
+        return httpx.Response(200, json={"scores": [float(x) for x in inputs]})
+
+    model = _model(handler, batcher=AdaptiveBatcher(size=2, max_size=2), concurrency=4)
+    assert model.predict([str(i) for i in range(7)]) == [float(i) for i in range(7)]
+
+
+def _hedge(max_extra_fraction: float) -> HedgePolicy:
+    return HedgePolicy(
+        enabled=True,
+        percentile=50,
+        min_delay_s=0.01,
+        min_samples=2,
+        max_extra_fraction=max_extra_fraction,
+    )
+
+
+def _slow_third_call_handler(calls):
+    lock = threading.Lock()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        with lock:
+            calls.append(request)
+            n = len(calls)
+        if n == 3:
+            time.sleep(0.5)
+            return httpx.Response(200, json={"scores": [0.0]})
+        return httpx.Response(200, json={"scores": [1.0]})
+
+    return handler
+
+
+def _async_slow_third_call_handler(calls):
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 3:
+            await asyncio.sleep(0.5)
+            return httpx.Response(200, json={"scores": [0.0]})
+        return httpx.Response(200, json={"scores": [1.0]})
+
+    return handler
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_hedged_request_beats_slow_replica(asynchronous):
+    calls = []
+    hedge = _hedge(1.0)
+    if asynchronous:
+        model = _model(_async_slow_third_call_handler(calls), hedge=hedge)
+    else:
+        model = _model(_slow_third_call_handler(calls), sync=True, hedge=hedge)
+    model.predict(["a"])
+    model.predict(["a"])
+
+    start = time.perf_counter()
+    assert model.predict(["a"]) == [1.0]
+    assert time.perf_counter() - start < 0.4
+    assert hedge.stats() == {"requests": 3, "hedges": 1, "hedge_wins": 1, "capped": 0}
+
+    if not asynchronous:
+        # One hedge executor per adapter, shut down with it.
+        pool = model._hedge_pool
+        model.predict(["a"])
+        assert model._hedge_pool is pool
+        model.close()
+        assert model._hedge_pool is None and pool._shutdown
+
+
+def test_hedging_applies_to_each_attempt():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if len(calls) == 3:
+            return httpx.Response(503, headers={"retry-after": "0"})
+        return httpx.Response(200, json={"scores": [1.0]})
+
+    hedge = _hedge(1.0)
+    model = _model(handler, sync=True, hedge=hedge)
+    for _ in range(3):
+        assert model.predict(["a"]) == [1.0]
+    # The retried request is its own hedging decision, not part of one long call.
+    assert hedge.stats()["requests"] == 4
+    assert len(calls) == 4
+
+
+def test_unhedged_calls_and_cap_suppress_duplicates():
+    calls = []
+    hedge = _hedge(1.0)
+    model = _model(_slow_third_call_handler(calls), sync=True, hedge=hedge)
+    model.predict(["a"])
+    model.predict(["a"])
+    with model.unhedged():
+        assert model.predict(["a"]) == [0.0]
+    assert len(calls) == 3
+
+    hedge = _hedge(0.1)
+    calls.clear()
+    model = _model(_slow_third_call_handler(calls), sync=True, hedge=hedge)
+    for _ in range(3):
+        model.predict(["a"])
+    assert hedge.stats()["capped"] == 1
+    assert len(calls) == 3
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from mtci.artifacts import BlobStore, compact_failures
+from mtci.config import FailureCaptureConfig
+
+
+def _failure(index: int, text: str, diff: float) -> dict:
+    return {
+        "index": index,
+        "original": text,
+        "transformed": None,
+        "output_original": 0.0,
+        "output_transformed": diff,
+        "diff": diff,
+    }
+
+
+def test_compact_failures_dedupes_ranks_and_truncates(tmp_path):
+    long_text = "x" * 50
+    failures = [
+        _failure(0, "short", 0.1),
+        _failure(1, long_text, 0.9),
+        _failure(2, "short", 0.1),
+        _failure(3, "other", 0.5),
+    ]
+    blobs = BlobStore(tmp_path / "blobs")
+    config = FailureCaptureConfig(top_k=2, max_text_chars=10)
+
+    kept, summary = compact_failures(failures, config, blobs)
+
+    assert summary == {"total": 4, "unique": 3, "kept": 2}
+    assert [f["index"] for f in kept] == [1, 3]
+    assert kept[0]["original"] == "x" * 10 + "…"
+    assert kept[0]["original_len"] == 50
+    digest = kept[0]["original_sha256"]
+    assert (tmp_path / "blobs" / digest[:2] / f"{digest}.txt").read_text() == long_text
+
+    deduped, _ = compact_failures(failures, FailureCaptureConfig())
+    assert next(f for f in deduped if f["index"] == 0)["duplicate_indexes"] == [2]
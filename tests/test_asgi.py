@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from mtci.adapters import HTTPEndpointModel, build_adapter
+from mtci.config import EndpointModelConfig, load_config
+from mtci.execution import run_profile, run_profiles
+
+APPS: list = []
+
+
+def lifespan_app() -> FastAPI:
+    from contextlib import asynccontextmanager
+
+    @asynccontextmanager
+    async def lifespan(app):
+        app.state.events.append("startup")
+        yield
+        app.state.events.append("shutdown")
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.events = []
+    APPS.append(app)
+
+    @app.post("/predict")
+    def predict(body: dict):
+        return {"scores": [float(len(x)) for x in body["inputs"]]}
+
+    return app
+
+
+def test_in_process_app_runs_lifespan_and_http_semantics():
+    config = EndpointModelConfig(mode="endpoint", app=f"{__name__}:lifespan_app")
+    model = build_adapter(config)
+    assert isinstance(model, HTTPEndpointModel)
+    events = model.transport.app.state.events
+    assert events == ["startup"]
+
+    assert model.predict(["ab", "abcd"]) == [2.0, 4.0]
+    # Invalid JSON still goes through FastAPI validation (422, not a crash).
+    with pytest.raises(httpx.HTTPStatusError, match="422"):
+        model.post_raw("{not json")
+
+    model.close()
+    assert events == ["startup", "shutdown"]
+
+
+def test_run_profile_with_in_process_server(tmp_path, monkeypatch, write_config):
+    monkeypatch.setenv("MTCI_LIGHT_MODEL", "1")
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 2,
+                "mrs": [
+                    "mtci.mrs.idempotence.IdempotenceMR",
+                    "mtci.mrs.serialization.SerializationInvarianceMR",
+                ],
+            }
+        },
+        model={"mode": "endpoint", "app": "mtci.server:create_app"},
+    )
+
+    code, out_dir = run_profile(load_config(cfg_path), "pr", tmp_path / "out")
+    report = json.loads((out_dir / "report.json").read_text())
+
+    assert code == 0
+    assert [r["status"] for r in report["results"]] == ["pass", "pass"]
+
+
+def test_multi_profile_run_shuts_down_in_process_app(tmp_path, write_config):
+    idempotence = ["mtci.mrs.idempotence.IdempotenceMR"]
+    cfg_path = write_config(
+        {
+            "pr": {"budget_seconds": 10, "max_examples": 1, "mrs": idempotence},
+            "nightly": {"budget_seconds": 10, "max_examples": 2, "mrs": idempotence},
+        },
+        model={"mode": "endpoint", "app": f"{__name__}:lifespan_app"},
+    )
+    APPS.clear()
+
+    code, _ = run_profiles(load_config(cfg_path), ["pr", "nightly"], tmp_path / "out")
+
+    assert code == 0
+    assert len(APPS) == 1
+    assert APPS[0].state.events == ["startup", "shutdown"]
+    assert not [t for t in threading.enumerate() if t.name == "mtci-asgi"]
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from mtci.models.bucketed import BucketedClassifier
+
+
+def test_bucketed_predict_restores_order_and_pads_per_bucket():
+    tokenized = []
+    shapes = []
+
+    def tokenize(texts):
+        tokenized.extend(texts)
+        return [list(range(1, len(text.split()) + 1)) for text in texts]
+
+    def forward(input_ids, mask):
+        shapes.append((len(input_ids), len(input_ids[0])))
+        return [sum(row) / 100 for row in mask]
+
+    model = BucketedClassifier(tokenize, forward, buckets=(2, 4, 8), batch_size=2)
+    texts = ["a b c d e", "a", "a b c", "a b", "a b c d e f g h i j"]
+
+    assert model.predict(texts) == [0.05, 0.01, 0.03, 0.02, 0.08]
+    # Ten tokens are truncated to the largest bucket; each batch has one shape.
+    assert sorted(shapes) == [(1, 4), (2, 2), (2, 8)]
+
+    model.predict(["a", "a b"])
+    assert tokenized == texts
+    stats = model.stats()
+    assert stats["tokenize_cache_hits"] == 2
+    assert stats["tokens"] == 5 + 1 + 3 + 2 + 8 + 1 + 2
+    assert 0 < stats["padding_ratio"] < 1
+
+
+def test_serve_rejects_runtime_options_without_bucketed_backend(monkeypatch):
+    from typer.testing import CliRunner
+
+    from mtci.cli import app
+
+    monkeypatch.delenv("MTCI_SERVE_BACKEND", raising=False)
+    runner = CliRunner()
+    for args in (
+        ["serve", "--quantize"],
+        ["serve", "--backend", "pipeline", "--runtime", "onnx"],
+        ["serve", "--backend", "bucketed", "--runtime", "tensorrt"],
+    ):
+        result = runner.invoke(app, args)
+        assert result.exit_code == 2, args
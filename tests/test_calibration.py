@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+
+from mtci import calibration
+from mtci.adapters import AdaptiveBatcher, HTTPEndpointModel
+from mtci.calibration import (
+    apply_performance,
+    calibrate,
+    fit_latency,
+    load_performance,
+    save_performance,
+)
+from mtci.config import EndpointModelConfig
+from mtci.selection import select_mrs
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_fit_latency_recovers_linear_cost():
+    points = [(n, 0.05 + 0.002 * n) for n in (1, 2, 4, 8, 16)]
+    fixed, per_item = fit_latency(points)
+    assert fixed == pytest.approx(0.05)
+    assert per_item == pytest.approx(0.002)
+
+
+def test_calibrate_respects_target_latency(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(calibration.time, "perf_counter", clock)
+
+    def predict(batch):
+        clock.now += 0.05 + 0.01 * len(batch)
+        return [0.0] * len(batch)
+
+    perf = calibrate(predict, ["a", "b"], "key", max_batch=64, target_latency_s=0.3)
+
+    assert [int(size) for size, _ in perf.batch_points] == [1, 2, 4, 8, 16, 32]
+    assert perf.latency_fixed_s == pytest.approx(0.05)
+    # 32 overshoots the 0.3s target; 16 is the largest batch within it.
+    assert perf.best_batch_size == 16
+    assert perf.predict_runtime(40) == pytest.approx(3 * perf.latency(16))
+
+
+def test_performance_profile_tunes_endpoint_and_selection(tmp_path):
+    config = EndpointModelConfig(mode="endpoint", base_url="http://test")
+    perf = calibration.PerformanceProfile(
+        fingerprint=calibration.calibration_key(config),
+        measured_at=0.0,
+        latency_fixed_s=0.1,
+        latency_per_item_s=0.01,
+        best_batch_size=8,
+        best_concurrency=4,
+    )
+    save_performance(tmp_path, perf)
+    pinned = EndpointModelConfig(mode="endpoint", base_url="http://test", concurrency=2)
+    assert load_performance(tmp_path, pinned) == perf
+
+    model = HTTPEndpointModel("http://test", "/predict", 1.0)
+    apply_performance(model, config, perf)
+    assert (model.batcher.size, model.concurrency) == (8, 4)
+    model = HTTPEndpointModel("http://test", "/predict", 1.0, batcher=AdaptiveBatcher(size=32))
+    apply_performance(model, pinned, perf)
+    assert model.concurrency == 1
+
+    selection = select_mrs(["a", "b", "c"], {}, 10.0, smoke_count=1, default_runtime=4.0)
+    assert [item.predicted_runtime_s for item in selection] == [4.0, 4.0]
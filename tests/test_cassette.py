@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import json
+
+import httpx
+import pytest
+
+from mtci import execution
+from mtci.adapters import HTTPEndpointModel
+from mtci.cassette import (
+    Cassette,
+    CassetteMissError,
+    Interaction,
+    attach_cassette,
+    request_key,
+)
+from mtci.config import load_config
+from mtci.execution import run_profile
+
+
+def _handler(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        inputs = json.loads(request.content)["inputs"]
+        return httpx.Response(200, json={"scores": [0.9 if "good" in x else 0.1 for x in inputs]})
+
+    return handler
+
+
+def test_request_key_canonicalizes_json_bodies():
+    a = request_key("POST", "/predict", b'{"inputs": ["x"], "v": 1}')
+    b = request_key("post", "/predict", b'{"v":1,"inputs":["x"]}')
+    assert a == b
+    assert a != request_key("POST", "/other", b'{"v":1,"inputs":["x"]}')
+
+
+def test_record_then_replay_offline(tmp_path):
+    calls = []
+    path = tmp_path / "run.cassette"
+    model = HTTPEndpointModel(
+        "http://test", "/predict", 1.0, transport=httpx.MockTransport(_handler(calls))
+    )
+    cassette, restore = attach_cassette(model, path, "record")
+    assert model.predict(["good", "bad"]) == [0.9, 0.1]
+    cassette.save()
+    restore()
+    assert len(calls) == 1
+
+    offline = HTTPEndpointModel("http://test", "/predict", 1.0)
+    cassette, _ = attach_cassette(offline, path, "replay")
+    assert offline.post_raw('{ "inputs" : ["good", "bad"] }') == [0.9, 0.1]
+    with pytest.raises(CassetteMissError):
+        offline.predict(["unseen"])
+    assert cassette.stats() == {"interactions": 1, "recorded": 0, "hits": 1, "misses": 1}
+    assert Cassette(path).interactions.keys() == cassette.interactions.keys()
+
+
+ENDPOINT_PROFILES = {
+    "pr": {
+        "budget_seconds": 10,
+        "max_examples": 3,
+        "mrs": [
+            "mtci.mrs.idempotence.IdempotenceMR",
+            "mtci.mrs.serialization.SerializationInvarianceMR",
+        ],
+    }
+}
+
+
+def _write_config(write_config):
+    return write_config(
+        ENDPOINT_PROFILES,
+        rows=["good", "bad", "ok"],
+        model={"mode": "endpoint", "base_url": "http://test"},
+    )
+
+
+def test_run_profile_replays_recorded_endpoint_run(tmp_path, monkeypatch, write_config):
+    cfg_path = _write_config(write_config)
+    config = load_config(cfg_path)
+    cassette = tmp_path / "pr.cassette"
+    calls = []
+    real_build = execution.build_adapter
+    monkeypatch.setattr(
+        execution,
+        "build_adapter",
+        lambda cfg: HTTPEndpointModel(
+            cfg.base_url, cfg.predict_path, 1.0, transport=httpx.MockTransport(_handler(calls))
+        ),
+    )
+    code, recorded_dir = run_profile(
+        config, "pr", tmp_path / "rec", cassette_path=cassette, cassette_mode="record"
+    )
+    assert code == 0 and calls
+
+    monkeypatch.setattr(execution, "build_adapter", real_build)
+    recorded_calls = len(calls)
+    code, replay_dir = run_profile(config, "pr", tmp_path / "replay", cassette_path=cassette)
+    report = json.loads((replay_dir / "report.json").read_text())
+
+    assert code == 0
+    assert len(calls) == recorded_calls
+    assert report["cassette"]["misses"] == 0
+    assert report["cassette"]["hits"] > 0
+    assert [r["status"] for r in report["results"]] == ["pass", "pass"]
+
+
+def test_failed_recording_keeps_responses_and_restores_transport(
+    tmp_path, monkeypatch, write_config
+):
+    config = load_config(_write_config(write_config))
+    calls = []
+    record = _handler(calls)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if len(calls) >= 2:
+            raise RuntimeError("endpoint crashed")
+        return record(request)
+
+    transport = httpx.MockTransport(handler)
+    model = HTTPEndpointModel(config.model.base_url, "/predict", 1.0, transport=transport)
+    monkeypatch.setattr(execution, "build_adapter", lambda cfg: model)
+    cassette = tmp_path / "pr.cassette"
+
+    with pytest.raises(RuntimeError):
+        run_profile(config, "pr", tmp_path / "rec", cassette_path=cassette, cassette_mode="record")
+
+    # Idempotence sends the same request twice; both answers share one key.
+    assert len(calls) == 2
+    assert len(Cassette(cassette).interactions) == 1
+    assert model.transport is transport
+
+
+def test_cli_replay_miss_exits_with_hint(tmp_path, write_config):
+    from typer.testing import CliRunner
+
+    from mtci.cli import app
+
+    cfg_path = _write_config(write_config)
+    cassette = Cassette(tmp_path / "empty.cassette")
+    cassette.add("unrelated", Interaction("POST", "/other", 200, {}, b"{}"))
+    cassette.save()
+
+    result = CliRunner().invoke(
+        app, ["run", "--config", str(cfg_path), "--profile", "pr", "--replay", str(cassette.path)]
+    )
+
+    assert result.exit_code == 2
+    assert "re-record with --record" in result.output
+
+
+def test_replay_matches_recording_made_against_slow_endpoint(tmp_path):
+    import time
+
+    from mtci.adapters import AdaptiveBatcher
+
+    def slow(request: httpx.Request) -> httpx.Response:
+        time.sleep(0.02)
+        return _handler([])(request)
+
+    def batcher() -> AdaptiveBatcher:
+        return AdaptiveBatcher(size=2, max_size=8, target_latency_s=0.03)
+
+    path = tmp_path / "run.cassette"
+    inputs = [f"good {i}" for i in range(8)]
+    model = HTTPEndpointModel(
+        "http://test", "/predict", 1.0, transport=httpx.MockTransport(slow), batcher=batcher()
+    )
+    cassette, restore = attach_cassette(model, path, "record")
+    expected = model.predict(inputs)
+    cassette.save()
+    restore()
+
+    # Replay answers instantly; an unpinned batcher would grow and miss.
+    offline = HTTPEndpointModel("http://test", "/predict", 1.0, batcher=batcher())
+    attach_cassette(offline, path, "replay")
+    assert offline.predict(inputs) == expected
+    assert offline.predict(inputs) == expected
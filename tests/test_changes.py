@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import subprocess
+
+from mtci.changes import changed_paths
+
+
+def _git(root, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+        cwd=root,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _commit(root, name: str, text: str) -> None:
+    (root / name).write_text(text)
+    _git(root, "add", name)
+    _git(root, "commit", "-q", "-m", name)
+
+
+def test_changed_paths_diff_from_merge_base(tmp_path):
+    _git(tmp_path, "init", "-q", "-b", "main")
+    _commit(tmp_path, "base.py", "a")
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    _commit(tmp_path, "feature.py", "b")
+    _git(tmp_path, "checkout", "-q", "main")
+    _commit(tmp_path, "upstream.py", "c")  # landed after the branch point
+    _git(tmp_path, "checkout", "-q", "feature")
+    (tmp_path / "base.py").write_text("edited")
+
+    assert changed_paths("main", tmp_path) == ["base.py", "feature.py"]
+
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+from pathlib import Path
+
+from mtci.daemon import MTCIDaemon, delegate, request, socket_path
+
+
+def test_daemon_serves_runs_with_resident_model(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr-fast": {
+                "budget_seconds": 10,
+                "max_examples": 2,
+                "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"],
+            }
+        }
+    )
+    assert delegate(tmp_path, {"cmd": "ping"}) is None
+
+    daemon = MTCIDaemon(tmp_path)
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if socket_path(tmp_path).exists():
+            break
+        time.sleep(0.01)
+
+    payload = {
+        "cmd": "run",
+        "config": str(cfg_path),
+        "profile": "pr-fast",
+        "out": str(tmp_path / "out"),
+    }
+    first = delegate(tmp_path, payload)
+    adapter = daemon.cache.adapter(daemon.cache.config(cfg_path).model)
+    second = delegate(tmp_path, payload)
+
+    assert first["ok"] and first["exit_code"] == 0
+    assert second["ok"] and second["exit_code"] == 0
+    assert daemon.cache.adapter(daemon.cache.config(cfg_path).model) is adapter
+    report = json.loads((Path(second["out_dir"]) / "report.json").read_text())
+    assert report["results"][0]["status"] == "pass"
+
+    request(tmp_path, {"cmd": "shutdown"}, timeout=5.0)
+    thread.join(timeout=5.0)
+    assert not socket_path(tmp_path).exists()
+
+
+MR_SOURCE = """
+from mtci.mrs.base import BaseMR, MRResult
+
+RUNS = 0
+VERDICT = {verdict}
+
+
+class EditableMR(BaseMR):
+    name = "editable"
+
+    def run(self, model, inputs, max_examples, tolerance):
+        global RUNS
+        RUNS += 1
+        return MRResult(self.name, VERDICT and RUNS == 1, "", [])
+"""
+
+
+def test_daemon_reloads_mr_modules(tmp_path, monkeypatch, write_config):
+    monkeypatch.setattr("sys.dont_write_bytecode", True)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module = tmp_path / "editable_mr.py"
+    module.write_text(MR_SOURCE.format(verdict="True"))
+    cfg_path = write_config(
+        {"pr": {"budget_seconds": 10, "retries_on_fail": 0, "mrs": ["editable_mr:EditableMR"]}},
+        rows=["good"],
+    )
+    daemon = MTCIDaemon(tmp_path)
+    payload = {"cmd": "run", "config": str(cfg_path), "profile": "pr", "out": "out"}
+
+    # Module globals start fresh on every run, as with a new `mtci run`.
+    assert daemon.handle(payload)["exit_code"] == 0
+    assert daemon.handle(payload)["exit_code"] == 0
+
+    module.write_text(MR_SOURCE.format(verdict="False"))
+    assert daemon.handle({"cmd": "reload"}) == {"ok": True}
+    assert daemon.handle(payload)["exit_code"] == 1
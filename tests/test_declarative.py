@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from mtci.adapters import LocalModelAdapter
+from mtci.config import Tolerance
+from mtci.models.simple import SimpleSentimentModel
+from mtci.mrs.declarative import DeclarativeMR, fuse_predictions
+from mtci.mrs.transforms import FunctionTransformation
+from mtci.mrs.whitespace import WhitespaceInvarianceMR
+
+
+class CountingModel(SimpleSentimentModel):
+    def __init__(self):
+        self.calls: list[list[str]] = []
+
+    def predict(self, xs):
+        self.calls.append(list(xs))
+        return super().predict(xs)
+
+
+class ShoutMR(DeclarativeMR):
+    name = "shout_non_decreasing"
+    transformation = FunctionTransformation("shout", lambda text: text + "!", version="1")
+    relation = "non_decreasing"
+
+
+def test_fused_plan_dedupes_inputs_across_mrs():
+    model = CountingModel()
+    adapter = LocalModelAdapter(model)
+    inputs = ["good", "bad", "nice day"]
+    mrs = [WhitespaceInvarianceMR(), ShoutMR()]
+
+    shared, plan = fuse_predictions(adapter, [(mr, inputs) for mr in mrs])
+    assert plan.requested_inputs == 12
+    assert plan.unique_inputs == 9
+    assert plan.requests == 1
+
+    for mr in mrs:
+        mr.shared_predictions = shared
+        assert mr.run(adapter, inputs, 3, Tolerance()).passed
+    assert len(model.calls) == 1
+
+
+def _run(tmp_path, write_config, mrs: list[str], fail_fast: bool = False) -> dict:
+    import json
+
+    from mtci.config import load_config
+    from mtci.execution import run_profile
+
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 2,
+                "retries_on_fail": 0,
+                "fail_fast": fail_fast,
+                "mrs": mrs,
+            }
+        },
+        rows=["good", "bad day"],
+    )
+    _, out_dir = run_profile(load_config(cfg_path), "pr", tmp_path / "out")
+    return json.loads((out_dir / "report.json").read_text())
+
+
+def test_fused_cost_is_charged_to_declarative_mrs(tmp_path, write_config):
+    report = _run(
+        tmp_path,
+        write_config,
+        ["mtci.mrs.whitespace.WhitespaceInvarianceMR", f"{__name__}:ShoutMR"],
+    )
+    plan = report["fused_plan"]
+    assert plan["mrs"] == ["whitespace_invariance", "shout_non_decreasing"]
+    for result in report["results"]:
+        assert result["runtime_s"] >= plan["runtime_s"] / 2
+
+
+def test_skipped_declarative_mrs_are_not_fused(tmp_path, write_config):
+    report = _run(
+        tmp_path,
+        write_config,
+        ["mtci.testing_mrs.AlwaysFailMR", "mtci.mrs.whitespace.WhitespaceInvarianceMR"],
+        fail_fast=True,
+    )
+    assert [r["status"] for r in report["results"]] == ["fail", "skipped"]
+    assert report["fused_plan"] is None
+
+
+class PaddingSensitiveModel(CountingModel):
+    def predict(self, xs):
+        self.calls.append(list(xs))
+        return [float(text.startswith("\n")) for text in xs]
+
+
+def test_flake_sampling_predicts_every_copy():
+    import time
+
+    from mtci.config import FlakeConfig
+    from mtci.flake import estimate_flakes
+
+    model = PaddingSensitiveModel()
+    estimates, _ = estimate_flakes(
+        WhitespaceInvarianceMR(),
+        LocalModelAdapter(model),
+        ["good", "bad"],
+        [0, 1],
+        Tolerance(),
+        FlakeConfig(samples=10, batch_size=4),
+        deadline=time.perf_counter() + 10,
+    )
+    assert [(e.samples, e.status) for e in estimates] == [(10, "fail"), (10, "fail")]
+    # Nine repeats of two examples, each a source and a transformed input.
+    assert sum(len(call) for call in model.calls) == 2 * 9 * 2
+
+
+class RecordingModel(SimpleSentimentModel):
+    seen: list[str] = []
+
+    def predict(self, xs):
+        RecordingModel.seen.extend(xs)
+        return super().predict(xs)
+
+
+def test_fusion_plans_prioritized_examples(tmp_path, write_config):
+    import json
+
+    from mtci.config import load_config
+    from mtci.execution import run_profile
+    from mtci.state import MRStats, StateStore, example_key
+
+    rows = [f"row {i}" for i in range(10)]
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 3,
+                "retries_on_fail": 0,
+                "example_selection": {"strategy": "prioritized"},
+                "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"],
+            }
+        },
+        rows=rows,
+        model={"mode": "local", "entrypoint": f"{__name__}.RecordingModel"},
+    )
+    store = StateStore(tmp_path)
+    stats = store.load()
+    entry = stats.setdefault("whitespace_invariance", MRStats())
+    for i in (7, 8, 9):
+        entry.record_example(example_key(rows[i]), 2, 2, index=i)
+    store.save()
+    RecordingModel.seen = []
+
+    _, out_dir = run_profile(load_config(cfg_path), "pr", tmp_path / "out")
+    result = json.loads((out_dir / "report.json").read_text())["results"][0]
+
+    assert result["prioritized_examples"] == [7, 8, 9]
+    assert {" ".join(text.split()) for text in RecordingModel.seen} == {"row 7", "row 8", "row 9"}
@@ -0,0 +1,91 @@
+import json
+from array import array
+
+from mtci.config import DatasetConfig, DedupConfig
+from mtci.data import load_dataset
+from mtci.dedup import cache_path, deduplicate, minhash, similarity
+
+
+def test_minhash_similarity_tracks_overlap():
+    base = "the service was quick and the staff were friendly"
+    near = "the service was quick and the staff were very friendly"
+    other = "shipping took three weeks and the box arrived crushed"
+    sig = minhash(base, 64, 5)
+    assert similarity(sig, minhash(near, 64, 5)) > 0.6
+    assert similarity(sig, minhash(other, 64, 5)) < 0.2
+
+
+def test_deduplicate_clusters_exact_and_near_duplicates():
+    texts = [
+        "The food was great and the service was excellent tonight",
+        "the food was great and  the service was excellent tonight",
+        "The food was great and the service was excellent tonight!",
+        "Terrible parking, we circled the block for half an hour",
+        "short",
+    ]
+    kept, index = deduplicate(texts, DedupConfig(threshold=0.7))
+    assert kept == [texts[0], texts[3], texts[4]]
+    assert index.assignment == [0, 0, 0, 3, 4]
+    assert index.exact_duplicates == 1
+    assert index.near_duplicates == 1
+
+
+def test_load_dataset_caches_assignment_per_version(tmp_path):
+    dataset = tmp_path / "data.jsonl"
+    rows = ["alpha beta gamma delta", "Alpha beta gamma delta", "unrelated text here"]
+    dataset.write_text("".join(json.dumps({"text": row}) + "\n" for row in rows))
+    config = DatasetConfig(path=str(dataset), jsonl_field="text", dedup=DedupConfig(enabled=True))
+
+    assert load_dataset(config) == [rows[0], rows[2]]
+    cached = json.loads(cache_path(dataset).read_text())
+    assert cached["index"]["representatives"] == [0, 2]
+
+    # A cached assignment is reused for the same content...
+    cached["index"]["representatives"] = [2]
+    cache_path(dataset).write_text(json.dumps(cached))
+    assert load_dataset(config) == [rows[2]]
+
+    # ...and recomputed when the dataset changes.
+    with dataset.open("a") as handle:
+        handle.write(json.dumps({"text": "fresh row"}) + "\n")
+    assert load_dataset(config) == [rows[0], rows[2], "fresh row"]
+
+
+def test_lsh_bucket_keeps_every_candidate(monkeypatch):
+    # Rows "b" and "c" share a band with "a" but only "c" is close to "b";
+    # a bucket holding just its first row would never compare them.
+    signatures = {"a": [1, 2, 3, 4], "b": [1, 2, 9, 9], "c": [1, 2, 9, 8]}
+    monkeypatch.setattr(
+        "mtci.dedup.minhash", lambda text, num_perm, shingle: array("I", signatures[text])
+    )
+    config = DedupConfig(threshold=0.75, num_perm=4, bands=2)
+    kept, index = deduplicate(["a", "b", "c"], config)
+    assert kept == ["a", "b"]
+    assert index.assignment == [0, 1, 1]
+
+
+def test_run_reports_source_rows(tmp_path, write_config):
+    from mtci.config import load_config
+    from mtci.execution import run_profile
+    from mtci.state import StateStore, example_key
+
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "retries_on_fail": 0,
+                "example_selection": {"strategy": "prioritized"},
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            }
+        },
+        rows=["fine", "Fine", "broken"],
+    )
+    config = load_config(cfg_path)
+    config.dataset.dedup.enabled = True
+
+    _, out_dir = run_profile(config, "pr", tmp_path / "out")
+    result = json.loads((out_dir / "report.json").read_text())["results"][0]
+    assert [f["index"] for f in result["failures"]] == [2]
+    assert sorted(result["prioritized_examples"]) == [0, 2]
+    examples = StateStore(tmp_path).load()["per_example_flake"].examples
+    assert examples[example_key("broken")].last_index == 2
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+
+from mtci.config import load_config
+from mtci.execution import run_profile
+
+
+def test_fail_fast_and_max_failures(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr-fast": {
+                "budget_seconds": 10,
+                "max_examples": 4,
+                "retries_on_fail": 0,
+                "fail_fast": True,
+                "max_failures": 2,
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR", "mtci.testing_mrs.AlwaysFailMR"],
+            }
+        },
+        rows=["broken a", "broken b", "broken c", "fine"],
+    )
+
+    exit_code, out_dir = run_profile(load_config(cfg_path), "pr-fast", tmp_path / "out")
+    report = json.loads((out_dir / "report.json").read_text())
+    results = {r["name"]: r for r in report["results"]}
+
+    assert exit_code == 1
+    assert report["fail_fast"]["decided_by"] == "per_example_flake"
+    assert results["per_example_flake"]["status"] == "fail"
+    assert results["per_example_flake"]["cut_short"]
+    assert len(results["per_example_flake"]["failures"]) == 2
+    assert results["always_fail"]["status"] == "skipped"
+    assert results["always_fail"]["cut_short"]
@@ -46,3 +46,93 @@ def test_flake_classification(tmp_path, monkeypatch):
     assert results["fail_then_pass"]["status"] == "flaky"
     assert results["always_fail"]["status"] == "fail"
     assert exit_code == 1
+
+
+def test_retry_reruns_only_failing_examples(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr-fast": {
+                "budget_seconds": 10,
+                "max_examples": 5,
+                "retries_on_fail": 2,
+                "fail_on_flake": True,
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            }
+        },
+        rows=["fine", "flaky one", "fine too", "broken", "also fine"],
+    )
+
+    exit_code, out_dir = run_profile(load_config(cfg_path), "pr-fast", tmp_path / "out")
+    report = json.loads((out_dir / "report.json").read_text())
+    result = report["results"][0]
+
+    assert result["status"] == "fail"
+    assert result["attempts"] == 3
+    assert result["examples_retried"] == 3
+    assert result["flaky_examples"] == [1]
+    assert [f["index"] for f in result["failures"]] == [3]
+    assert exit_code == 1
+
+
+def test_statistical_flake_engine(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "nightly": {
+                "budget_seconds": 10,
+                "max_examples": 3,
+                "retries_on_fail": 0,
+                "fail_on_flake": False,
+                "flake": {"samples": 10, "batch_size": 4},
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            }
+        },
+        rows=["fine", "flaky one", "broken"],
+    )
+
+    exit_code, out_dir = run_profile(load_config(cfg_path), "nightly", tmp_path / "out")
+    report = json.loads((out_dir / "report.json").read_text())
+    result = report["results"][0]
+    estimates = {e["index"]: e for e in result["flake_estimates"]}
+
+    assert result["status"] == "fail"
+    assert estimates[1]["status"] == "flaky"
+    assert estimates[1]["samples"] == 10
+    assert estimates[1]["failures"] == 1
+    assert estimates[1]["ci_high"] < 0.5
+    assert estimates[2]["status"] == "fail"
+    assert estimates[2]["samples"] == 10
+    assert estimates[2]["ci_low"] > 0.6
+    assert result["flaky_examples"] == [1]
+    assert exit_code == 1
+
+    state = json.loads((tmp_path / ".mtci" / "state.json").read_text())
+    examples = state["mrs"]["per_example_flake"]["examples"]
+    assert sorted(e["flaky"] for e in examples.values()) == [False, True]
+    # Unprioritized runs record every flake sample, including the first attempt.
+    hard = next(e for e in examples.values() if not e["flaky"])
+    assert (hard["samples"], hard["failures"], hard["last_index"]) == (10, 10, 2)
+
+
+def test_flake_sampling_ignores_max_failures(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "nightly": {
+                "budget_seconds": 10,
+                "max_examples": 3,
+                "max_failures": 2,
+                "retries_on_fail": 1,
+                "fail_on_flake": False,
+                "flake": {"samples": 20, "batch_size": 4},
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            }
+        },
+        rows=["broken a", "broken b", "broken c"],
+    )
+
+    exit_code, out_dir = run_profile(load_config(cfg_path), "nightly", tmp_path / "out")
+    result = json.loads((out_dir / "report.json").read_text())["results"][0]
+
+    assert result["status"] == "fail"
+    assert result["cut_short"] is True
+    assert {e["index"]: e["status"] for e in result["flake_estimates"]} == {0: "fail", 1: "fail"}
+    assert exit_code == 1
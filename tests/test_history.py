@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from mtci.history import HistoryStore, MRRecord
+
+
+def test_history_records_aggregates_and_retention(tmp_path):
+    store = HistoryStore(tmp_path, max_runs=3)
+    for i in range(5):
+        store.record_run(
+            run_key=f"run-{i}",
+            profile="pr-fast",
+            fingerprint="abc",
+            exit_code=1 if i == 4 else 0,
+            records=[
+                MRRecord("mr_a", "fail" if i == 4 else "pass", 1.0 + i, 1, 5),
+                MRRecord("mr_b", "flaky", 0.5, 2, 7),
+            ],
+        )
+
+    summaries = {item.mr: item for item in store.summary()}
+    assert summaries["mr_a"].runs == 3
+    assert summaries["mr_a"].fails == 1
+    assert summaries["mr_a"].max_runtime_s == 5.0
+    assert summaries["mr_b"].flaky == 3
+
+    recent = store.runs_for("mr_a", limit=2)
+    assert [rec.run_key for rec in recent] == ["run-4", "run-3"]
+
+
+def test_compact_defaults_to_configured_max_runs(tmp_path, write_config):
+    from typer.testing import CliRunner
+
+    from mtci.cli import app
+
+    write_config(
+        {"pr": {"budget_seconds": 10, "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"]}},
+        history={"max_runs": 2},
+    )
+    store = HistoryStore(tmp_path, max_runs=10)
+    for i in range(5):
+        store.record_run(
+            run_key=f"run-{i}",
+            profile="pr",
+            fingerprint="abc",
+            exit_code=0,
+            records=[MRRecord("mr_a", "pass", 1.0, 1, 1)],
+        )
+
+    result = CliRunner().invoke(app, ["history", "--compact"])
+    assert result.exit_code == 0, result.output
+    assert "Removed 3 runs" in result.output
+    assert store.summary()[0].runs == 2
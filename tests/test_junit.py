@@ -1,8 +1,13 @@
 from __future__ import annotations
 
+import json
 from xml.etree import ElementTree as ET
 
-from mtci.reporting import write_junit
+import pytest
+
+from mtci.config import load_config
+from mtci.execution import run_profile
+from mtci.reporting import ReportStream, assemble_report, write_junit
 
 
 def test_junit_generation(tmp_path):
@@ -17,3 +22,75 @@ def test_junit_generation(tmp_path):
     names = [case.attrib["name"] for case in root.findall("testcase")]
     assert "mr_pass" in names
     assert root.find(".//failure") is not None
+
+
+def test_stream_leaves_partial_artifacts(tmp_path):
+    stream = ReportStream(tmp_path, junit_flaky_as_failure=True)
+    stream.start({"profile": "pr-fast"})
+    stream.result(
+        {
+            "name": "mr_fail",
+            "status": "fail",
+            "runtime_s": 0.2,
+            "message": "x",
+            "failures": [{"index": 0}],
+        }
+    )
+    stream.close()
+
+    root = ET.parse(tmp_path / "junit.xml").getroot()
+    assert [case.attrib["name"] for case in root.findall("testcase")] == ["mr_fail"]
+
+    with (tmp_path / "events.jsonl").open("a") as handle:
+        handle.write('{"event": "resu')
+    report = json.loads(assemble_report(tmp_path).read_text())
+    assert report["partial"] is True
+    assert report["results"][0]["failures"] == [{"index": 0}]
+
+
+def test_run_that_raises_leaves_partial_report(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "mrs": [
+                    "mtci.mrs.whitespace.WhitespaceInvarianceMR",
+                    "mtci.testing_mrs.RaisingMR",
+                ],
+            }
+        }
+    )
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_profile(load_config(cfg_path), "pr", tmp_path / "out")
+
+    (out_dir,) = (tmp_path / "out").iterdir()
+    report = json.loads((out_dir / "report.json").read_text())
+    assert report["partial"] is True
+    assert [r["name"] for r in report["results"]] == ["whitespace_invariance"]
+    ET.parse(out_dir / "junit.xml")
+    assert not (out_dir / "junit.xml.tmp").exists()
+
+
+def test_runs_in_the_same_second_keep_separate_reports(tmp_path, write_config, monkeypatch):
+    cfg_path = write_config(
+        {"pr": {"budget_seconds": 10, "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"]}}
+    )
+    monkeypatch.setattr("time.strftime", lambda fmt: "20260101-000000")
+    config = load_config(cfg_path)
+
+    _, first = run_profile(config, "pr", tmp_path / "out")
+    _, second = run_profile(config, "pr", tmp_path / "out")
+
+    assert first != second
+    for out_dir in (first, second):
+        report = json.loads((out_dir / "report.json").read_text())
+        assert [r["name"] for r in report["results"]] == ["whitespace_invariance"]
+
+
+def test_stream_replaces_existing_event_log(tmp_path):
+    (tmp_path / "events.jsonl").write_text('{"event": "result", "result": {"name": "old"}}\n')
+    stream = ReportStream(tmp_path, junit_flaky_as_failure=True)
+    stream.start({"profile": "pr"})
+    report = json.loads(stream.finish({}).read_text())
+    assert report["results"] == []
@@ -0,0 +1,149 @@
+import json
+from pathlib import Path
+
+from mtci.adapters import LocalModelAdapter
+from mtci.config import load_config
+from mtci.execution import run_profile
+from mtci.memory import MemoryTracker
+from mtci.mrs.declarative import DeclarativeMR
+from mtci.mrs.transforms import FunctionTransformation
+from mtci.state import MRStats, StateStore
+
+
+class HungryModel:
+    def predict(self, xs):
+        scratch = [bytearray(1024) for _ in range(256 * len(xs))]
+        return [float(len(scratch) > 0) for _ in xs]
+
+
+def test_tracker_attributes_adapter_peak():
+    adapter = LocalModelAdapter(model=HungryModel())
+    tracker = MemoryTracker()
+    tracker.start()
+    restore = tracker.instrument(adapter)
+    try:
+        tracker.mr_start()
+        adapter.predict(["a", "b", "c", "d"])
+        usage = tracker.mr_stop()
+    finally:
+        restore()
+        tracker.stop()
+
+    assert "predict" not in vars(adapter)
+    assert usage["adapter_peak_bytes"] >= 1024 * 1024
+    assert usage["peak_bytes"] >= usage["adapter_peak_bytes"]
+
+
+def test_memory_samples_round_trip(tmp_path):
+    store = StateStore(tmp_path)
+    stats = store.load()
+    entry = stats.setdefault("mr", MRStats())
+    for _ in range(25):
+        entry.record_memory(4000, 4)
+    entry.record_memory(1000, 0)
+    store.save()
+
+    loaded = StateStore(tmp_path).load()["mr"]
+    assert len(loaded.memory) == 20
+    assert loaded.memory_model() == (0.0, 1000.0)
+
+
+def test_memory_model_separates_fixed_cost_and_ignores_spikes():
+    stats = MRStats(memory=[[5_000_000, 10], [3_000_000, 2], [5_000_000, 10], [10**9, 10]])
+    assert stats.memory_model() == (2_500_000.0, 250_000.0)
+    assert stats.memory_allowance(4_000_000, 10) == 6
+    assert stats.memory_allowance(2_000_000, 10) == 0
+
+
+def _config(write_config, budget_mb: float | None = None):
+    memory = {"budget_mb": budget_mb} if budget_mb else {"track": True}
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 10,
+                "memory": memory,
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            }
+        },
+        rows=[f"row {i}" for i in range(10)],
+    )
+    return load_config(cfg_path)
+
+
+def _report(out_dir: Path) -> dict:
+    return json.loads((out_dir / "report.json").read_text())
+
+
+def test_budget_downsizes_and_refuses_from_history(tmp_path, write_config):
+    exit_code, out_dir = run_profile(_config(write_config), "pr", "a")
+    result = _report(out_dir)["results"][0]
+    assert exit_code == 0
+    assert result["memory"]["peak_bytes"] >= 0
+    assert len(StateStore(tmp_path).load()["per_example_flake"].memory) == 1
+
+    store = StateStore(tmp_path)
+    stats = store.load()
+    stats["per_example_flake"].memory = [[4 * 2**20, 10]]  # 0.4 MB per example
+    store.save()
+    _, out_dir = run_profile(_config(write_config, 1.0), "pr", "b")
+    report = _report(out_dir)
+    assert report["results"][0]["examples_evaluated"] == 2
+    assert report["results"][0]["memory"]["max_examples"] == 2
+    assert report["memory"]["downsized"] == {"per_example_flake": 2}
+
+    stats = store.load()
+    stats["per_example_flake"].memory = [[8 * 2**20, 1]]
+    store.save()
+    exit_code, out_dir = run_profile(_config(write_config, 1.0), "pr", "c")
+    report = _report(out_dir)
+    assert report["results"][0]["status"] == "skipped"
+    assert report["results"][0]["message"].startswith("memory budget")
+    assert report["memory"]["refused"] == ["per_example_flake"]
+    assert exit_code == 0
+
+    for run in ("d", "e"):
+        run_profile(_config(write_config, 1.0), "pr", run)
+    _, out_dir = run_profile(_config(write_config, 1.0), "pr", "f")
+    result = _report(out_dir)["results"][0]
+    # After MEMORY_PROBE_AFTER refusals the MR is probed with one example.
+    assert result["status"] == "pass"
+    assert result["examples_evaluated"] == 1
+    entry = StateStore(tmp_path).load()["per_example_flake"]
+    assert entry.memory_refusals == 0
+    assert len(entry.memory) == 2
+
+
+class UpperCaseMR(DeclarativeMR):
+    name = "upper_case"
+    transformation = FunctionTransformation("upper", str.upper, version="1")
+
+
+def test_fused_predictions_are_tracked_and_respect_budget(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 10,
+                "retries_on_fail": 0,
+                "memory": {"budget_mb": 1.0},
+                "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR", f"{__name__}:UpperCaseMR"],
+            }
+        },
+        rows=[f"row {i}" for i in range(10)],
+        model={"mode": "local", "entrypoint": f"{__name__}.HungryModel"},
+    )
+    store = StateStore(tmp_path)
+    store.load()["upper_case"] = MRStats(memory=[[4 * 2**20, 10]])  # 0.4 MB per example
+    store.save()
+
+    _, out_dir = run_profile(load_config(cfg_path), "pr", "out")
+    report = _report(out_dir)
+    plan = report["fused_plan"]
+    # Whitespace plans 10 examples, the downsized MR only 2; a fused call
+    # carries at most the downsized MR's 2 pairs.
+    assert plan["requested_inputs"] == 2 * 10 + 2 * 2
+    assert plan["requests"] == -(-plan["unique_inputs"] // 4)
+    assert report["memory"]["downsized"] == {"upper_case": 2}
+    first = next(r for r in report["results"] if r["name"] == plan["mrs"][0])
+    assert first["memory"]["adapter_peak_bytes"] >= 1024 * 1024
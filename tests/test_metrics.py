@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import json
+import urllib.request
+
+from mtci.adapters import LocalModelAdapter
+from mtci.metrics import MetricsExporter, RunMetrics
+from mtci.models.simple import SimpleSentimentModel
+
+
+def test_metrics_instrument_snapshot_and_endpoint(tmp_path):
+    metrics = RunMetrics("pr-fast", budget_seconds=8)
+    adapter = LocalModelAdapter(SimpleSentimentModel())
+    restore = metrics.instrument(adapter)
+    metrics.mr_started("whitespace_invariance")
+    adapter.predict(["good", "bad"])
+    adapter.predict_items(["nice"])
+    metrics.mr_finished("whitespace_invariance", "pass", 0.01, examples=3)
+    restore()
+    adapter.predict(["ignored"])
+
+    snap = metrics.snapshot()
+    assert snap["requests_total"] == 2
+    assert snap["inputs_predicted"] == 3
+    assert snap["examples_evaluated"] == 3
+    assert snap["mrs"]["whitespace_invariance"]["status"] == "pass"
+
+    exporter = MetricsExporter(metrics, tmp_path / "live.json", interval_s=60, port=0)
+    exporter.start()
+    try:
+        body = urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/metrics").read().decode()
+    finally:
+        exporter.stop()
+    assert 'mtci_requests_total{profile="pr-fast"} 2' in body
+    assert json.loads((tmp_path / "live.json").read_text())["inputs_predicted"] == 3
+
+
+def test_failed_run_releases_port_and_adapter(tmp_path, write_config):
+    import socket
+
+    import pytest
+
+    from mtci.cache import RunCache
+    from mtci.config import load_config
+    from mtci.execution import run_profile
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    cfg_path = write_config(
+        {"pr": {"budget_seconds": 10, "mrs": ["mtci.testing_mrs.RaisingMR"]}},
+        metrics={"enabled": True, "port": port},
+    )
+    cache = RunCache()
+    config = load_config(cfg_path)
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_profile(config, "pr", tmp_path / "out", cache=cache)
+
+    assert "predict" not in vars(cache.adapter(config.model))
+    with socket.socket() as again:
+        again.bind(("127.0.0.1", port))
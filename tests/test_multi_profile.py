@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import json
+
+from mtci.cache import RunCache
+from mtci.config import load_config
+from mtci.execution import run_profiles
+
+
+def test_multi_profile_run_shares_predictions(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "small": {
+                "budget_seconds": 10,
+                "max_examples": 2,
+                "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"],
+            },
+            "large": {
+                "budget_seconds": 10,
+                "max_examples": 3,
+                "mrs": [
+                    "mtci.mrs.whitespace.WhitespaceInvarianceMR",
+                    "mtci.testing_mrs.AlwaysFailMR",
+                ],
+            },
+        },
+        rows=["good", "bad", "nice"],
+    )
+
+    cache = RunCache(memoize_predictions=True)
+    cfg = load_config(cfg_path)
+    exit_code, out_dirs = run_profiles(cfg, ["small", "large"], tmp_path / "out", cache=cache)
+
+    assert exit_code == 1
+    assert [d.name.split("-")[0] for d in out_dirs] == ["small", "large"]
+    small = json.loads((out_dirs[0] / "report.json").read_text())
+    assert [r["status"] for r in small["results"]] == ["pass"]
+    adapter = cache.adapter(cfg.model)
+    assert adapter.misses == 6
+    assert adapter.hits == 4
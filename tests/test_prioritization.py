@@ -0,0 +1,75 @@
+import json
+
+from mtci.config import ExampleSelectionConfig, load_config
+from mtci.execution import _record_outcomes, run_profile
+from mtci.mrs.base import MRResult
+from mtci.prioritization import prioritize_examples
+from mtci.state import MRStats, example_key
+
+
+def test_prioritize_prefers_failures_and_unseen_examples():
+    data = ["alpha one", "beta two", "gamma three", "delta four", "epsilon five"]
+    stats = MRStats()
+    stats.record_example(example_key(data[0]), 5, 0, index=0)
+    stats.record_example(example_key(data[1]), 5, 0, index=1)
+    stats.record_example(example_key(data[4]), 3, 3, index=4)
+
+    order = prioritize_examples(data, stats, 3, ExampleSelectionConfig(pool_size=2))
+
+    # Index 4 lies outside the pool but is recalled by its last known index;
+    # unseen index 2 outranks examples that have only ever passed.
+    assert order == [4, 2, 0]
+    order = prioritize_examples(data, stats, 3, ExampleSelectionConfig(pool_size=5))
+    assert order == [4, 2, 3]
+
+
+def test_prioritize_spreads_over_similar_examples():
+    data = ["same a", "same b", "same c", "other d"]
+    config = ExampleSelectionConfig(diversity=0.9)
+    assert prioritize_examples(data, MRStats(), 2, config) == [0, 3]
+    assert prioritize_examples(data, MRStats(), 2, ExampleSelectionConfig(diversity=0)) == [0, 1]
+
+
+def test_unattributed_failure_records_nothing():
+    stats = MRStats()
+    failed = MRResult("mr", False, "fail", [])
+    _record_outcomes(stats, ["a", "b"], None, [0, 1], failed, retried=False)
+    assert stats.examples == {}
+    passed = MRResult("mr", True, "ok", [])
+    _record_outcomes(stats, ["a", "b"], None, [0, 1], passed, retried=False)
+    assert [e.samples for e in stats.examples.values()] == [1, 1]
+
+
+def test_prioritized_run_revisits_failing_examples(tmp_path, write_config):
+    prioritized = {"strategy": "prioritized"}
+    cfg_path = write_config(
+        {
+            "pr": {
+                "budget_seconds": 10,
+                "max_examples": 2,
+                "retries_on_fail": 0,
+                "example_selection": {**prioritized, "pool_size": 2},
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            },
+            "nightly": {
+                "budget_seconds": 10,
+                "max_examples": 5,
+                "retries_on_fail": 0,
+                "example_selection": prioritized,
+                "mrs": ["mtci.testing_mrs.PerExampleFlakeMR"],
+            },
+        },
+        rows=["fine", "ok", "broken", "good", "nice"],
+    )
+    config = load_config(cfg_path)
+
+    exit_code, _ = run_profile(config, "pr", tmp_path / "out")
+    assert exit_code == 0
+    exit_code, _ = run_profile(config, "nightly", tmp_path / "out")
+    assert exit_code == 1
+
+    exit_code, out_dir = run_profile(config, "pr", tmp_path / "rerun")
+    result = json.loads((out_dir / "report.json").read_text())["results"][0]
+    assert result["prioritized_examples"][0] == 2
+    assert [f["index"] for f in result["failures"]] == [2]
+    assert exit_code == 1
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import pstats
+import time
+
+from mtci.profiling import MRProfiler
+
+
+def _busy(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_cprofile_writes_pstats_and_summary(tmp_path):
+    profiler = MRProfiler("cprofile", tmp_path, top_n=3)
+    profiler.start("mr_a")
+    _busy(0.01)
+    summary = profiler.stop("mr_a")
+    assert pstats.Stats(summary["file"]).total_calls > 0
+    assert len(summary["top"]) <= 3
+
+
+def test_sampling_writes_collapsed_stacks(tmp_path):
+    profiler = MRProfiler("sample", tmp_path, interval_s=0.001)
+    profiler.start("mr_b")
+    _busy(0.05)
+    summary = profiler.stop("mr_b")
+    assert summary["samples"] > 0
+    assert "_busy" in (tmp_path / "profiles" / "mr_b.collapsed").read_text()
+
+
+def test_failed_run_stops_profiler(tmp_path, write_config):
+    import threading
+
+    import pytest
+
+    from mtci.config import load_config
+    from mtci.execution import run_profile
+
+    cfg_path = write_config({"pr": {"budget_seconds": 10, "mrs": ["mtci.testing_mrs.RaisingMR"]}})
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_profile(load_config(cfg_path), "pr", tmp_path / "out", profile_mrs="sample")
+
+    assert not [t for t in threading.enumerate() if t.name == "mtci-sampler"]
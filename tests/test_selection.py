@@ -20,3 +20,28 @@ def test_cold_start_smoke():
     selection = select_mrs(["mr_x", "mr_y", "mr_z"], {}, budget_seconds=2)
     assert selection[0].reason == "cold-start smoke MR"
     assert selection[0].name == "mr_x"
+
+
+def test_change_impacted_mrs_first_and_unimpacted_capped():
+    stats = {
+        "mr_a": MRStats(runs=5, fails=3, median_runtime_s=1.0),
+        "mr_b": MRStats(runs=5, fails=0, median_runtime_s=1.0),
+        "mr_c": MRStats(runs=5, fails=0, median_runtime_s=1.0),
+    }
+    selection = select_mrs(
+        ["mr_a", "mr_b", "mr_c"],
+        stats,
+        budget_seconds=4,
+        impact={"mr_a": 0.0, "mr_b": 0.0, "mr_c": 0.5},
+        unimpacted_budget_fraction=0.25,
+    )
+    assert [item.name for item in selection] == ["mr_c", "mr_a"]
+    assert selection[0].reason == "change-impacted"
+
+
+def test_path_history_impact():
+    stats = MRStats()
+    stats.record_paths(["src/prep/clean.py", "src/prep/"], failed=True)
+    stats.record_paths(["docs/index.md", "docs/"], failed=False)
+    assert stats.impact(["src/prep/other.py", "src/prep/"]) > 0
+    assert stats.impact(["docs/index.md", "docs/"]) == 0
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+IMPORT_BUDGET_MS = float(os.getenv("MTCI_IMPORT_BUDGET_MS", "400"))
+HEAVY_MODULES = ("httpx", "fastapi", "uvicorn", "mtci.server", "sqlite3")
+
+
+def _python(*args: str) -> subprocess.CompletedProcess:
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def test_local_run_path_does_not_import_web_stack():
+    code = (
+        "import sys, mtci.cli, mtci.execution, mtci.mrs.whitespace;"
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    assert _python("-c", code).stdout.strip() == ""
+
+
+def test_cli_import_time_budget():
+    proc = _python("-X", "importtime", "-c", "import mtci.cli")
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) == 3 and parts[2] == "mtci.cli":
+            cumulative_us = int(parts[1])
+    assert cumulative_us is not None
+    assert cumulative_us / 1000 < IMPORT_BUDGET_MS
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from mtci.mrs.transforms import FunctionTransformation, TransformStore
+
+
+def test_transform_store_computes_once_and_persists(tmp_path):
+    calls: list[list[str]] = []
+
+    def upper(text: str) -> str:
+        return text.upper()
+
+    class Counting(FunctionTransformation):
+        def transform(self, inputs):
+            calls.append(list(inputs))
+            return super().transform(inputs)
+
+    transformation = Counting("upper", upper, version="1")
+    store = TransformStore(tmp_path)
+    assert store.apply(transformation, ["a", "b", "a"]) == ["A", "B", "A"]
+    assert store.apply(transformation, ["b", "c"]) == ["B", "C"]
+    assert calls == [["a", "b"], ["c"]]
+    store.flush()
+
+    reloaded = TransformStore(tmp_path)
+    assert reloaded.apply(transformation, ["a", "b", "c"]) == ["A", "B", "C"]
+    assert len(calls) == 2
+    assert reloaded.hits == 3
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import os
+
+from mtci.adapters import LocalModelAdapter, MemoizedAdapter
+from mtci.models.simple import SimpleSentimentModel
+from mtci.watch import Watcher
+
+
+def test_memoized_adapter_keys_on_whole_batch():
+    adapter = MemoizedAdapter(LocalModelAdapter(SimpleSentimentModel()))
+    adapter.predict(["good"])
+    adapter.predict(["good", "bad"])
+    adapter.predict(["good"])
+    assert (adapter.hits, adapter.misses) == (1, 2)
+
+
+def test_watch_reruns_on_dataset_change_with_cached_predictions(tmp_path, write_config):
+    cfg_path = write_config(
+        {
+            "pr-fast": {
+                "budget_seconds": 10,
+                "max_examples": 3,
+                "mrs": ["mtci.mrs.whitespace.WhitespaceInvarianceMR"],
+            }
+        }
+    )
+    dataset = tmp_path / "data.jsonl"
+
+    watcher = Watcher(cfg_path, "pr-fast", tmp_path / "out")
+    first = watcher.run()
+    assert first.exit_code == 0
+    assert watcher.poll() is None
+
+    dataset.write_text('{"text": "good"}\n{"text": "bad"}\n{"text": "nice"}\n')
+    stat = dataset.stat()
+    os.utime(dataset, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    cycle = watcher.poll()
+    assert cycle is not None
+    assert cycle.changes == [str(dataset.resolve())]
+
+    adapter = watcher.cache.adapter(watcher.cache.config(cfg_path).model)
+    assert adapter.hits == 4
+    assert adapter.misses == 6
+    # Watch cycles never persist state or run history.
+    assert not (tmp_path / ".mtci" / "state.json").exists()
+    assert not (tmp_path / ".mtci" / "history.sqlite3").exists()